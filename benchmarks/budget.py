@@ -0,0 +1,81 @@
+"""
+Latency of `DateDetector.find_all` on pathological messages, with and without a time budget.
+
+Messages grow from a few tokens to hundreds: a paste of numbers, a word repeated, dates one after the
+other and sentences of the synthetic corpus joined together, see `benchmarks.corpus`. For each one the
+seconds, the number of dates found and whether the result was truncated are reported, once without a
+budget and once with it, see `utils.budget`. Without a budget the seconds grow linearly with the size,
+a paste of 1000 numbers takes about half a second, ex:
+    python -m benchmarks.budget --budget 0.05 --sizes 10,100,1000
+    python -m benchmarks.budget --no-fallback --max-tokens 500
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+from benchmarks.corpus import CorpusGenerator, parse_lengths
+from utils.budget import Budget
+from utils.date_detector import DateDetector
+
+REFERENCE_TIME = datetime(2021, 6, 24, 21, 48, 1)
+
+
+def messages(size, seed):
+    """
+    :param size: (int) number of tokens of each message, about that many for the corpus
+    :return: (dict) kind of message to the message
+    """
+    rng = random.Random(seed)
+    generator = CorpusGenerator(seed)
+    return {
+        "number paste": " ".join(str(rng.randint(0, 99999)) for _ in range(size)),
+        "repeated word": " ".join(["yarın"] * size),
+        "dates": " ".join(rng.choice(("3 gün sonra", "ocak", "bir iki üç", "15 mayıs 2020"))
+                          for _ in range(size // 2)),
+        "corpus": " ".join(generator.sentences(20, max(1, size // 20))),
+    }
+
+
+def timed_find_all(detector, text, budget):
+    """
+    :return: (tuple) seconds of the call, number of dates found or 'error' and whether the result was truncated
+    """
+    detector.cache_clear()
+    start = time.perf_counter()
+    try:
+        found = detector.find_all(text, REFERENCE_TIME, None if budget is None else Budget(budget))
+    except ValueError:
+        # Invalid dates raise, ex: a day out of range for its month
+        return time.perf_counter() - start, "error", False
+    return time.perf_counter() - start, len(found), found.truncated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure find_all on pathological messages with a time budget.")
+    parser.add_argument("--budget", type=float, default=0.05, help="seconds of each call")
+    parser.add_argument("--sizes", type=parse_lengths, default=[10, 100, 1000],
+                        help="comma separated message sizes in tokens")
+    parser.add_argument("--max-tokens", type=int, help="tokens of a message that are searched, see DateDetector")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-fallback", dest="fallback", action="store_false",
+                        help="do not pass expressions that no rule matches to dateparser")
+    args = parser.parse_args(argv)
+
+    detector = DateDetector(fallback=args.fallback, max_tokens=args.max_tokens)
+    # Compilation is measured by `benchmarks.startup`
+    detector.rule_matcher().compile()
+    detector.find_all("yarın sabah 9da", REFERENCE_TIME)
+
+    print("{:<15}{:>7}{:>11}{:>7}{:>11}{:>7}{:>11}".format("message", "size", "full_s", "dates", "budget_s",
+                                                           "dates", "truncated"))
+    for size in args.sizes:
+        for kind, text in messages(size, args.seed).items():
+            full_seconds, full, _ = timed_find_all(detector, text, None)
+            budget_seconds, limited, truncated = timed_find_all(detector, text, args.budget)
+            print("{:<15}{:>7}{:>11.4f}{:>7}{:>11.4f}{:>7}{:>11}".format(
+                kind, size, full_seconds, full, budget_seconds, limited, str(truncated)))
+
+
+if __name__ == "__main__":
+    main()
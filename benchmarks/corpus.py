@@ -0,0 +1,171 @@
+"""
+Seeded generator of Turkish sentences with temporal expressions, for the benchmarks.
+
+Expressions are built from the vocabularies of `DateDetector`, ex: its day, month and relative
+expressions, and number words, and are mixed with filler words up to a given sentence length. The same
+seed always gives the same corpus, ex:
+    python -m benchmarks.corpus --lengths 10,40 --count 100 --seed 1 > corpus.txt
+"""
+import argparse
+import random
+import sys
+
+from utils.date_detector import DateDetector
+from utils.number_detector import NumberDetector
+from utils.rule_analysis import exact_strings, parse
+
+# Words that are neither numbers nor temporal expressions
+FILLER_WORDS = ("toplantı", "rapor", "müşteri", "proje", "için", "ile", "hazırla", "gönder", "lütfen", "ekip",
+                "dosya", "kontrol", "et", "yeni", "sunum", "adres", "bilgi", "fatura", "ödeme", "sipariş", "kargo",
+                "teslim", "edilecek", "mesaj", "cevap", "ver", "arkadaşlar", "çok", "güzel", "oldu", "hakkında",
+                "konuşalım", "planı", "güncelle", "tablo", "kişi", "geldi", "şirket", "ofis", "ders", "sınav",
+                "kitap", "okul", "ama", "de", "mi", "bunu", "şunu", "neden", "nasıl")
+
+# Holidays the rules know about
+HOLIDAYS = ("yılbaşında", "yıl başında", "sevgililer günü", "cumhuriyet bayramında", "çocuk bayramı",
+            "işçi bayramında")
+
+SEASONS = ("yaz", "kış", "bahar", "sonbahar")
+
+
+def vocabulary(expression):
+    """
+    :param expression: (string) a regex of `DateDetector` with a small set of matches, ex: `DAYS_EXPRESSION`
+    :return: (tuple) the strings it matches, in a stable order
+    """
+    return tuple(sorted(exact_strings(parse(expression))))
+
+
+def number_words(value):
+    """
+    Writes a positive integer in words, ex: 1250 -> 'bin iki yüz elli'
+    """
+    names = {number: word for word, number in NumberDetector.TEXT_NUMBER_MAP.items()}
+    words = []
+    for scale in (10 ** 12, 10 ** 9, 10 ** 6, 1000):
+        count, value = divmod(value, scale)
+        if count:
+            # 'bin' is not preceded by 'bir'
+            if not (count == 1 and scale == 1000):
+                words.append(number_words(count))
+            words.append(names[scale])
+    hundreds, value = divmod(value, 100)
+    if hundreds:
+        if hundreds > 1:
+            words.append(names[hundreds])
+        words.append(names[100])
+    tens, ones = divmod(value, 10)
+    if tens:
+        words.append(names[tens * 10])
+    if ones:
+        words.append(names[ones])
+    return " ".join(words)
+
+
+class CorpusGenerator(object):
+    """
+    Builds temporal expressions and sentences from a seeded random generator.
+    """
+    DAYS = vocabulary(DateDetector.DAYS_EXPRESSION)
+    MONTHS = vocabulary(DateDetector.MONTHS_EXPRESSION)
+    BEFORE = ("önce", "evvel")
+    LATER = ("sonra",)
+    PRECEDING = ("geçen", "geçtiğimiz")
+    NEXT = ("önümüzdeki", "gelecek")
+    AM = vocabulary(DateDetector.AM_EXPRESSION)
+    PM = vocabulary(DateDetector.PM_EXPRESSION)
+
+    def __init__(self, seed=0, expression_rate=0.1, word_rate=0.3):
+        """
+        :param seed: (int) seed of the random generator
+        :param expression_rate: (float) share of the tokens of a sentence that belong to temporal expressions
+        :param word_rate: (float) share of the numbers that are written in words
+        """
+        self.random = random.Random(seed)
+        self.expression_rate = expression_rate
+        self.word_rate = word_rate
+        self.templates = (
+            lambda: "{} gün {}".format(self.number(1, 30), self.choice(self.BEFORE + self.LATER)),
+            lambda: "{} hafta {} {}".format(self.number(1, 9), self.choice(self.BEFORE + self.LATER),
+                                            self.choice(self.DAYS)),
+            lambda: "{} {}".format(self.choice(self.PRECEDING + self.NEXT), self.choice(self.DAYS)),
+            lambda: self.choice(self.DAYS),
+            lambda: "{} {}".format(self.random.randint(1, 28), self.choice(self.MONTHS)),
+            lambda: "{} {} {}".format(self.random.randint(1, 28), self.choice(self.MONTHS),
+                                      self.random.randint(1990, 2029)),
+            lambda: "{} {}".format(self.choice(self.MONTHS), self.choice(("başı", "sonu", "ayında"))),
+            lambda: "{} ve {} arasında".format(self.choice(self.MONTHS), self.choice(self.MONTHS)),
+            lambda: "{} ay önce".format(self.number(1, 11)),
+            lambda: "son {} {}".format(self.number(2, 12), self.choice(("gün", "hafta", "ay", "yıl"))),
+            lambda: "saat {}:{:02d}".format(self.random.randint(0, 23), self.random.randint(0, 59)),
+            lambda: "{} {}".format(self.choice(self.AM + self.PM), self.random.randint(1, 11)),
+            lambda: "{} {}".format(self.choice(("geçen", "bu")), self.choice(SEASONS)),
+            lambda: "ayın {}sında".format(self.random.randint(1, 28)),
+            lambda: self.choice(HOLIDAYS),
+            lambda: self.choice(("bugün", "dün", "yarın", "şimdi", "geçen hafta", "bu ay", "gelecek ay")),
+        )
+
+    def choice(self, values):
+        return values[self.random.randrange(len(values))]
+
+    def number(self, low, high):
+        """
+        A number between low and high, in digits or in words.
+        """
+        value = self.random.randint(low, high)
+        return number_words(value) if self.random.random() < self.word_rate else str(value)
+
+    def expression(self):
+        """
+        :return: (string) a temporal expression, ex: '3 hafta önce salı'
+        """
+        return self.choice(self.templates)()
+
+    def expressions(self, count):
+        return [self.expression() for _ in range(count)]
+
+    def sentence(self, length):
+        """
+        A sentence of about the given number of tokens, temporal expressions are placed between filler words.
+        :param length: (int) number of tokens
+        :return: (string)
+        """
+        tokens = []
+        while len(tokens) < length:
+            if self.random.random() < self.expression_rate:
+                tokens.extend(self.expression().split(" "))
+            else:
+                tokens.append(self.choice(FILLER_WORDS))
+        return " ".join(tokens[:length])
+
+    def sentences(self, length, count):
+        return [self.sentence(length) for _ in range(count)]
+
+
+def parse_lengths(value):
+    return [int(length) for length in value.split(",") if length]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a seeded corpus of sentences with temporal expressions.")
+    parser.add_argument("--lengths", type=parse_lengths, default=[5, 10, 20, 40, 80],
+                        help="comma separated sentence lengths in tokens")
+    parser.add_argument("--count", type=int, default=100, help="number of sentences of each length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--expression-rate", type=float, default=0.1,
+                        help="share of the tokens that belong to temporal expressions")
+    parser.add_argument("--expressions", action="store_true", help="write bare temporal expressions instead")
+    args = parser.parse_args(argv)
+
+    generator = CorpusGenerator(args.seed, args.expression_rate)
+    if args.expressions:
+        lines = generator.expressions(args.count)
+    else:
+        lines = [sentence for length in args.lengths for sentence in generator.sentences(length, args.count)]
+    for line in lines:
+        sys.stdout.write(line + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
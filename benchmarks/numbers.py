@@ -0,0 +1,111 @@
+"""
+Compares how `NUMBER_SEARCH_REGEX` and the linear time `NumberScanner` of `NumberDetector` scale on
+adversarial texts, ex: a digit run that ends with a letter, where the regex tries every way of splitting
+the digits into numbers.
+
+Each kind of text is grown until the regex takes longer than a limit, the regex runs in a separate
+process that is stopped at the limit, after that only the scanner is timed. Wherever both run, their
+spans have to be the same, and so they have to be on random texts of number pieces, ex:
+    python -m benchmarks.numbers
+    python -m benchmarks.numbers --limit 5 --fuzz 100000
+Exits with 1 when the spans differ.
+"""
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+from utils.number_detector import NumberDetector
+
+# Name to a function building a text of a size
+ADVERSARIAL_TEXTS = {
+    "digits": lambda size: "1" * size + "x",
+    "spaced digits": lambda size: "saat " + "1" * size + "x",
+    "decimal points": lambda size: "1," * size + "x",
+    "dot separated": lambda size: "1.000" * size + "x",
+    "number words": lambda size: "bir" * size + "x",
+    "spaced numbers": lambda size: " 1" * size + "x",
+    "separators": lambda size: " " * size,
+    "plain text": lambda size: "ab " * size,
+}
+
+SIZES = (4, 8, 12, 14, 16, 20, 100, 1000, 10000, 100000)
+
+FUZZ_PIECES = list(NumberDetector.TEXT_NUMBER_MAP) + ["BİR", "Iki", "x", "a", "saat", "1.0", ",5", "1/4", "0/1",
+                                                     "  "] + list("0123456789-,./ ;:\n")
+
+
+def regex_spans(text):
+    return [match.span(2) for match in NumberDetector.NUMBER_SEARCH_REGEX.finditer(text)]
+
+
+def timed(function, text):
+    """
+    :return: (tuple) result of the function and its seconds
+    """
+    start = time.perf_counter()
+    result = function(text)
+    return result, time.perf_counter() - start
+
+
+def timed_regex_spans(text):
+    return timed(regex_spans, text)
+
+
+def fuzz(count, seed):
+    """
+    :return: (List(string)) random texts of at most 6 number pieces whose spans differ
+    """
+    rng = random.Random(seed)
+    scanner = NumberDetector.SCANNER
+    differ = []
+    for _ in range(count):
+        text = "".join(rng.choice(FUZZ_PIECES) for _ in range(rng.randint(0, 6)))
+        if regex_spans(text) != scanner.spans(text):
+            differ.append(text)
+    return differ
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the number regex and the number scanner.")
+    parser.add_argument("--limit", type=float, default=2.0,
+                        help="seconds after which the regex is stopped and no longer run on longer texts of a kind")
+    parser.add_argument("--fuzz", type=int, default=20000, help="number of random texts to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    scanner = NumberDetector.SCANNER
+    failed = False
+    pool = multiprocessing.Pool(1)
+    print("{:<16}{:>8}{:>12}{:>12}".format("text", "size", "regex_s", "scanner_s"))
+    for kind, build in ADVERSARIAL_TEXTS.items():
+        stopped = False
+        for size in SIZES:
+            text = build(size)
+            spans, scanner_seconds = timed(scanner.spans, text)
+            if stopped:
+                regex_column = "-"
+            else:
+                try:
+                    expected, regex_seconds = pool.apply_async(timed_regex_spans, (text,)).get(args.limit)
+                    failed = failed or expected != spans
+                    regex_column = "{:.6f}".format(regex_seconds)
+                except multiprocessing.TimeoutError:
+                    # The regex can not be interrupted, its process is
+                    pool.terminate()
+                    pool = multiprocessing.Pool(1)
+                    stopped = True
+                    regex_column = ">{:g}".format(args.limit)
+            print("{:<16}{:>8}{:>12}{:>12.6f}".format(kind, size, regex_column, scanner_seconds))
+    pool.terminate()
+
+    differ = fuzz(args.fuzz, args.seed)
+    print("random texts: {}, differ: {}".format(args.fuzz, len(differ)))
+    for text in differ[:10]:
+        sys.stderr.write("differs: {!r}\n".format(text))
+    return 1 if failed or differ else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
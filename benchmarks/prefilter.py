@@ -0,0 +1,136 @@
+"""
+Checks that the sentence prefilter of `DateDetector` never drops a date and measures what it saves.
+
+Sentences are run through a detector with the prefilter and one without it, their results have to be
+the same. Besides the sentences of a corpus file, or the synthetic corpus of `benchmarks.corpus`, the
+check uses sentences without dates and sentences built from random strings each rule matches, mixed
+with number words, upper cased and abbreviated months and punctuation. The words the dateparser fallback
+knows are checked with `prefilter.check_words`, every way of writing them has to keep a sentence and
+words that only start like them must not, ex:
+    python -m benchmarks.prefilter --count 500
+    python -m benchmarks.prefilter --corpus messages.txt --no-fallback
+Exits with 1 when a result differs or a word check fails.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.corpus import FILLER_WORDS, CorpusGenerator, number_words
+from utils.date_detector import DateDetector
+from utils.pre_processing import tokenize, turkish_upper
+from utils.prefilter import check_words
+from utils.rule_order import rule_samples
+
+REFERENCE_TIME = datetime(2021, 6, 24, 21, 48, 1)
+
+
+def rule_sentences(detector, count, seed):
+    """
+    Sentences built from strings the rules match, with their numbers, case and months written differently.
+    :param detector: (DateDetector)
+    :param count: (int) number of sentences
+    :param seed: (int)
+    :return: (List(string))
+    """
+    rng = random.Random(seed)
+    samples = [sample for own in rule_samples(detector.regex_list, 10, rng) for sample in own if sample.strip()]
+    abbreviations = {month: form for form, month in DateDetector.MONTH_FORMS.items() if form != month}
+
+    def vary(token):
+        if token.isdigit() and len(token) < 7 and rng.random() < 0.5:
+            return number_words(int(token)) if int(token) else "sıfır"
+        if token in abbreviations and rng.random() < 0.5:
+            return abbreviations[token]
+        if rng.random() < 0.2:
+            return turkish_upper(token)
+        if rng.random() < 0.1:
+            return rng.choice(("(", "\"")) + token + rng.choice((",", ")", "\"", "."))
+        return token
+
+    sentences = []
+    for _ in range(count):
+        tokens = [rng.choice(FILLER_WORDS) for _ in range(rng.randint(0, 6))]
+        position = rng.randint(0, len(tokens))
+        sample = " ".join(vary(token) for token in rng.choice(samples).split(" "))
+        sentences.append(" ".join(tokens[:position] + [sample] + tokens[position:]))
+    return sentences
+
+
+def compare(texts, detector_options):
+    """
+    :return: (tuple) texts whose results differ, texts the prefilter skipped and the seconds of both detectors
+    """
+    filtered = DateDetector(prefilter=True, **detector_options)
+    unfiltered = DateDetector(prefilter=False, **detector_options)
+    # Compilation is measured by `benchmarks.startup`
+    filtered.rule_matcher().compile()
+    prefilter = filtered.sentence_filter()
+    fallback = filtered.fallback_tokens != 0
+    # Both detectors share the rules, a warm up pass fills the token caches of the rule matcher for both
+    for text in texts:
+        try:
+            unfiltered.find_all(text, REFERENCE_TIME)
+        except ValueError:
+            pass
+
+    results, seconds = [], []
+    for detector in (filtered, unfiltered):
+        found = []
+        start = time.perf_counter()
+        for text in texts:
+            try:
+                found.append(detector.find_all(text, REFERENCE_TIME))
+            except ValueError as e:
+                found.append(repr(e))
+        seconds.append(time.perf_counter() - start)
+        results.append(found)
+
+    differ = [text for text, first, second in zip(texts, *results) if first != second]
+    skipped = [text for text in texts if not prefilter.may_match([token for token, _, _ in tokenize(text)], fallback)]
+    return differ, skipped, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the sentence prefilter against the full detector.")
+    parser.add_argument("--corpus", help="text file with a sentence per line, a synthetic corpus by default")
+    parser.add_argument("--count", type=int, default=300, help="number of sentences of each kind")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-fallback", dest="fallback", action="store_false",
+                        help="do not pass expressions that no rule matches to dateparser")
+    args = parser.parse_args(argv)
+
+    detector_options = {"fallback": args.fallback, "cache_size": 0, "fallback_cache_size": 0}
+    generator = CorpusGenerator(args.seed)
+    if args.corpus:
+        with open(args.corpus, encoding="utf8") as corpus:
+            corpus_texts = [line.rstrip("\r\n") for line in corpus if line.strip()]
+    else:
+        corpus_texts = generator.sentences(20, args.count)
+    kinds = {
+        "corpus": corpus_texts,
+        "no dates": [" ".join(generator.choice(FILLER_WORDS) for _ in range(20)) for _ in range(args.count)],
+        "rule samples": rule_sentences(DateDetector(**detector_options), args.count, args.seed),
+    }
+
+    failed = False
+    print("{:<14}{:>8}{:>10}{:>8}{:>14}{:>14}".format("sentences", "count", "skipped", "differ",
+                                                     "filtered_s", "unfiltered_s"))
+    for kind, texts in kinds.items():
+        differ, skipped, seconds = compare(texts, detector_options)
+        print("{:<14}{:>8}{:>10}{:>8}{:>14.3f}{:>14.3f}".format(kind, len(texts), len(skipped), len(differ),
+                                                               *seconds))
+        for text in differ[:10]:
+            sys.stderr.write("differs: {}\n".format(text))
+        failed = failed or bool(differ)
+
+    skipped_forms, kept_words = check_words(DateDetector(**detector_options).sentence_filter())
+    print("fallback word forms skipped: {}, non date words kept: {}".format(len(skipped_forms), len(kept_words)))
+    for word in skipped_forms + kept_words:
+        sys.stderr.write("word check: {}\n".format(word))
+    return 1 if failed or skipped_forms or kept_words else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Compares the regex backends of `DateDetector` on its rules, see `utils.regex_backend`.
+
+For each installed backend the rules it can not match like the standard library are listed with their
+constructs, those rules stay on the standard library. Then the seconds to check and compile the rules
+and the merged regex of `RuleMatcher`, to search every rule on strings the rules match, to match the
+merged regex on them and of `find_all` on a corpus are reported. Matches and results have to be the
+same as the ones of the standard library. Substitutions with the groups of every rule, the dates the rules
+resolve their strings to and the dates of `UNANCHORED_RULES`, rules that are not anchored and resolve
+their groups with substitutions, are compared as well, ex:
+    python -m benchmarks.regex_backends
+    python -m benchmarks.regex_backends --backends re,re2 --corpus messages.txt
+
+`NumberDetector` finds numbers with a linear time scanner and not with `NUMBER_SEARCH_REGEX`, the
+other engines fold the 'i' of its number words differently, so the regex is only timed on a digit run
+that ends with a letter, where the standard library backtracks exponentially.
+Exits with 1 when a result differs.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.corpus import CorpusGenerator
+from utils.date_detector import DateDetector, RuleSet
+from utils.number_detector import NumberDetector
+from utils.regex_backend import BACKENDS, RegexBackend, available_backends, get_backend
+from utils.rule_order import rule_samples
+
+REFERENCE_TIME = datetime(2021, 6, 24, 21, 48, 1)
+
+# Rules that are not anchored at both ends, their groups are resolved with `sub` on the whole expression
+UNANCHORED_RULES = {"rules": [
+    {"name": "DAYS_BEFORE_REGEX", "type": "datetime", "pattern": "([0-9]+) gün önce$", "resolve": {"dday": "-\\1"}},
+    {"name": "HOURS_LATER_REGEX", "type": "datetime", "pattern": "^([0-9]+) saat sonra",
+     "resolve": {"dhour": "\\1"}},
+]}
+
+UNANCHORED_TEXTS = ("3 gün önce", "toplantı 12 gün önce", "2 saat sonra", "2 saat sonra gel", "yarın 5 saat sonra")
+
+
+def rule_set(name):
+    """
+    Rules compiled with a backend, a new rule set and not the one the detectors of this process share.
+    :param name: (string) name of the backend
+    :return: (RuleSet)
+    """
+    rule_file = DateDetector.load_rules().rule_file
+    backend = None if name == RegexBackend.name else get_backend(name)
+    return RuleSet(rule_file, DateDetector.SPAN_SEPARATOR, DateDetector.HOLIDAY_CALENDAR, backend)
+
+
+def timed(function, *args):
+    """
+    :return: (tuple) result of the function and its seconds
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def compiled(name):
+    # The standard library and `regex` keep the patterns they compiled, they are compiled again instead
+    module = get_backend(name).load()
+    if hasattr(module, "purge"):
+        module.purge()
+    rules = rule_set(name)
+    rules.matcher().compile()
+    return rules
+
+
+def search_rules(rules, strings):
+    """
+    :return: (List) span of the match of every rule on every string, None where it does not match
+    """
+    spans = []
+    for _, _, rule_regex, _ in rules.regex_list:
+        for string in strings:
+            rule_match = rule_regex.search(string)
+            spans.append(rule_match and rule_match.span())
+    return spans
+
+
+def match_merged(rules, strings):
+    """
+    :return: (List) group of the rule the merged regex matches on each string, None where none matches
+    """
+    regex = rules.matcher().regex
+    return [combined_match and combined_match.lastgroup for combined_match in map(regex.match, strings)]
+
+
+def outcome(function, *args):
+    """
+    :return: the result of the function, or the representation of the exception it raises
+    """
+    try:
+        return function(*args)
+    except Exception as e:
+        return repr(e)
+
+
+def substitute_rules(rules, strings):
+    """
+    :return: (List) every rule substituted on every string with a template of all of its groups
+    """
+    results = []
+    for _, _, rule_regex, _ in rules.regex_list:
+        template = "<{}>".format("|".join("\\{}".format(group) for group in range(1, rule_regex.groups + 1)))
+        results.extend(outcome(rule_regex.subn, template, string) for string in strings)
+    return results
+
+
+def resolve(name, strings, rules_path=None):
+    """
+    :return: (List) date each string resolves to with the rules, the error for strings that fail, see `outcome`
+    """
+    detector = DateDetector(rules_path=rules_path, regex_backend=name, fallback=False, cache_size=0)
+    return [outcome(detector.parse_date, string, REFERENCE_TIME) for string in strings]
+
+
+def find_unanchored(name, directory):
+    """
+    :return: (List) results of `find_all` on `UNANCHORED_TEXTS` with `UNANCHORED_RULES`
+    """
+    rules_path = os.path.join(directory, "unanchored_rules.json")
+    if not os.path.exists(rules_path):
+        with open(rules_path, "w", encoding="utf8") as rule_file:
+            json.dump(UNANCHORED_RULES, rule_file, ensure_ascii=False)
+    detector = DateDetector(rules_path=rules_path, regex_backend=name, fallback=False, cache_size=0)
+    return [outcome(detector.find_all, text, REFERENCE_TIME) for text in UNANCHORED_TEXTS]
+
+
+def find_all(name, texts):
+    detector = DateDetector(regex_backend=name, fallback=False, cache_size=0)
+    found = []
+    for text in texts:
+        try:
+            found.append(detector.find_all(text, REFERENCE_TIME))
+        except ValueError as e:
+            found.append(repr(e))
+    return found
+
+
+def time_numbers(name, digits):
+    """
+    :return: (float) seconds of `NUMBER_SEARCH_REGEX` compiled with a backend on a digit run ending with a letter
+    """
+    number_regex = NumberDetector.NUMBER_SEARCH_REGEX
+    regex = get_backend(name).compile(number_regex.pattern, number_regex.flags)
+    _, seconds = timed(list, regex.finditer("1" * digits + "x"))
+    return seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the regex backends on the date rules.")
+    parser.add_argument("--backends", default=",".join(available_backends()),
+                        help="comma separated backends, the installed ones of {} by default".format(
+                            ", ".join(BACKENDS)))
+    parser.add_argument("--corpus", help="text file with a sentence per line, a synthetic corpus by default")
+    parser.add_argument("--count", type=int, default=300, help="number of corpus sentences")
+    parser.add_argument("--samples", type=int, default=10, help="number of strings generated for each rule")
+    parser.add_argument("--digits", type=int, default=12, help="length of the digit run the number regex is timed on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf8") as corpus:
+            texts = [line.rstrip("\r\n") for line in corpus if line.strip()]
+    else:
+        texts = CorpusGenerator(args.seed).sentences(20, args.count)
+    reference = compiled(RegexBackend.name)
+    strings = [sample for own in rule_samples(reference.regex_list, args.samples, random.Random(args.seed))
+               for sample in own]
+    directory = tempfile.mkdtemp()
+    expected = (search_rules(reference, strings), match_merged(reference, strings),
+                find_all(RegexBackend.name, texts), substitute_rules(reference, strings),
+                resolve(RegexBackend.name, strings), find_unanchored(RegexBackend.name, directory))
+
+    failed = False
+    print("{:<8}{:>14}{:>12}{:>11}{:>11}{:>13}{:>12}{:>8}".format("backend", "incompatible", "compile_s", "search_s",
+                                                                  "merged_s", "find_all_s", "numbers_s", "differ"))
+    for name in args.backends.split(","):
+        rules, compile_seconds = timed(compiled, name)
+        spans, search_seconds = timed(search_rules, rules, strings)
+        groups, merged_seconds = timed(match_merged, rules, strings)
+        found, find_all_seconds = timed(find_all, name, texts)
+        checked = (spans, groups, found, substitute_rules(rules, strings), resolve(name, strings),
+                   find_unanchored(name, directory))
+        differ = sum(first != second for results, reference_results in zip(checked, expected)
+                     for first, second in zip(results, reference_results))
+        print("{:<8}{:>14}{:>12.4f}{:>11.4f}{:>11.4f}{:>13.4f}{:>12.4f}{:>8}".format(
+            name, len(rules.incompatible), compile_seconds, search_seconds, merged_seconds, find_all_seconds,
+            time_numbers(name, args.digits), differ))
+        for rule_name, issues in rules.incompatible.items():
+            print("    {}: {}".format(rule_name, ", ".join("{} {} {}".format(issue.kind, issue.construct, issue.detail)
+                                                      for issue in issues)))
+        failed = failed or bool(differ)
+    shutil.rmtree(directory)
+    print("rules: {}, strings: {}, sentences: {}".format(len(reference.regex_list), len(strings), len(texts)))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
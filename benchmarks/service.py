@@ -0,0 +1,99 @@
+"""
+Latency of the detection service on a seeded synthetic corpus, see `utils.service` and `benchmarks.corpus`.
+
+A service with its worker processes is started on a local port and the corpus is sent over a single
+connection, all requests at once. The latency percentiles of the clients and the counts of the service
+are reported. Before that, request lines that are not valid are sent and each of them has to get
+exactly one error response, ex:
+    python -m benchmarks.service --count 200 --workers 2
+Exits with 1 when a request line is not answered with an error.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks.corpus import CorpusGenerator
+from utils.service import DetectionService, ServiceClient, percentile
+from utils.serialization import dumps
+
+# Request lines that are not valid, ex: JSON that is not an object, a budget that is not a number of seconds
+INVALID_REQUESTS = ('[1, 2]', '"str"', '{"text": "x", "budget": "a"}', '{"text": "x", "budget": true}',
+                    '{"text": "x", "budget": -1}', '{"budget": 1}', '{"text": "x"')
+
+
+async def check_invalid(port, timeout=5.0):
+    """
+    Sends the invalid request lines and reads their responses.
+    :return: (List(string)) lines that are not answered with exactly one error response
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    failed = []
+    try:
+        for line in INVALID_REQUESTS:
+            writer.write((line + "\n").encode("utf8"))
+            await writer.drain()
+            try:
+                response = await asyncio.wait_for(reader.readline(), timeout)
+            except asyncio.TimeoutError:
+                response = b""
+            if b'"error"' not in response:
+                failed.append(line)
+        # Nothing more may come, every line is answered once
+        try:
+            extra = await asyncio.wait_for(reader.readline(), 0.1)
+        except asyncio.TimeoutError:
+            extra = b""
+        if extra:
+            failed.append(extra.decode("utf8"))
+    finally:
+        writer.close()
+    return failed
+
+
+async def run(texts, workers, budget):
+    service = DetectionService(workers=workers, budget=budget, detector_options={"fallback": False})
+    server = await service.serve(port=0)
+    try:
+        port = server.sockets[0].getsockname()[1]
+        failed = await check_invalid(port)
+        client = await ServiceClient.connect(port=port)
+
+        async def timed(text):
+            start = time.perf_counter()
+            response = await client.find_all(text)
+            return response, time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(timed(text) for text in texts))
+        seconds = time.perf_counter() - start
+        stats = await client.stats()
+        await client.close()
+    finally:
+        server.close()
+        await service.stop()
+    return failed, [latency for _, latency in results], seconds, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the detection service and check its error responses.")
+    parser.add_argument("--count", type=int, default=200, help="number of corpus sentences")
+    parser.add_argument("--length", type=int, default=20, help="number of tokens of a sentence")
+    parser.add_argument("--workers", type=int, default=2, help="number of worker processes")
+    parser.add_argument("--budget", type=float, default=5.0, help="latency budget of a request in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    texts = CorpusGenerator(args.seed).sentences(args.length, args.count)
+    failed, latencies, seconds, stats = asyncio.run(run(texts, args.workers, args.budget))
+    print("requests: {}, seconds: {:.3f}, p50_ms: {:.3f}, p99_ms: {:.3f}".format(
+        len(texts), seconds, percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000))
+    print("service: {}".format(dumps(stats)))
+    print("invalid requests not answered with an error: {}".format(len(failed)))
+    for line in failed:
+        sys.stderr.write("not answered: {}\n".format(line))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Measures cold start, the import time of the detectors and the latency of their first calls.
+
+Every run starts a fresh interpreter, so nothing is shared between runs but the bytecode and rule
+snapshot caches on disk, and reports the time of each phase in milliseconds, ex:
+    python -m benchmarks.startup --runs 20
+    python -m benchmarks.startup --no-snapshot --no-fallback --json
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEXT = "iki gün önce saat 3te ve 5 hafta sonra salı yirmi beş bin kişi geldi"
+REFERENCE_TIME = "2021-06-24T21:48:01"
+
+# Runs in the fresh interpreter, the phases are timed in order and printed as JSON
+NUMBERS_SCENARIO = """
+import json, sys, time
+timings = {}
+start = time.perf_counter()
+from utils.number_detector import NumberDetector
+timings["import"] = time.perf_counter() - start
+
+start = time.perf_counter()
+detector = NumberDetector()
+timings["construct"] = time.perf_counter() - start
+
+for phase in ("first_call", "second_call"):
+    start = time.perf_counter()
+    detector.find_all(sys.argv[1])
+    timings[phase] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+DATES_SCENARIO = """
+import json, sys, time
+from datetime import datetime
+timings = {}
+start = time.perf_counter()
+from utils.date_detector import DateDetector
+timings["import"] = time.perf_counter() - start
+
+start = time.perf_counter()
+detector = DateDetector(fallback=sys.argv[3] == "1")
+timings["construct"] = time.perf_counter() - start
+
+reference_time = datetime.fromisoformat(sys.argv[2])
+for phase in ("first_call", "second_call"):
+    start = time.perf_counter()
+    detector.find_all(sys.argv[1], reference_time)
+    timings[phase] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+SCENARIOS = {"numbers": NUMBERS_SCENARIO, "dates": DATES_SCENARIO}
+
+
+def clear_snapshots():
+    """
+    Removes the rule snapshots, so that the next run validates and analyses the rules again.
+    """
+    for path in glob.glob(os.path.join(ROOT, "utils", "__pycache__", "*.json.*.pickle")):
+        os.remove(path)
+
+
+def run_once(scenario, text, reference_time, fallback):
+    """
+    Runs a scenario in a fresh interpreter.
+    :return: (dict) phase to its time in seconds, "process" is the wall time of the whole interpreter
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", SCENARIOS[scenario], text, reference_time,
+                                "1" if fallback else "0"], cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError("{} run failed:\n{}".format(scenario, completed.stderr))
+    timings = json.loads(completed.stdout)
+    timings["process"] = elapsed
+    return timings
+
+
+def summarize(runs):
+    """
+    :param runs: (List(dict)) timings of each run
+    :return: (dict) phase to its median, min and max in milliseconds
+    """
+    summary = {}
+    for phase in runs[0]:
+        values = [run[phase] * 1000 for run in runs]
+        summary[phase] = {"median": round(statistics.median(values), 3), "min": round(min(values), 3),
+                          "max": round(max(values), 3)}
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and first call latency in fresh processes.")
+    parser.add_argument("--runs", type=int, default=10, help="number of measured runs of each scenario")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="unmeasured runs before the measured ones, they write the bytecode and rule caches")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="scenario to run, can be repeated, all of them by default")
+    parser.add_argument("--text", default=TEXT, help="text of the first and second calls")
+    parser.add_argument("--reference-time", default=REFERENCE_TIME, help="ISO time the dates are resolved against")
+    parser.add_argument("--no-fallback", dest="fallback", action="store_false",
+                        help="build the date detector without the dateparser fallback")
+    parser.add_argument("--no-snapshot", dest="snapshot", action="store_false",
+                        help="remove the rule snapshots before each run")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for scenario in args.scenario or sorted(SCENARIOS):
+        runs = []
+        for index in range(args.warmup + args.runs):
+            if not args.snapshot:
+                clear_snapshots()
+            timings = run_once(scenario, args.text, args.reference_time, args.fallback)
+            if index >= args.warmup:
+                runs.append(timings)
+        results[scenario] = summarize(runs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print("{:<10}{:<14}{:>12}{:>12}{:>12}".format("scenario", "phase", "median ms", "min ms", "max ms"))
+    for scenario, summary in results.items():
+        for phase, values in summary.items():
+            print("{:<10}{:<14}{:>12.3f}{:>12.3f}{:>12.3f}".format(scenario, phase, values["median"], values["min"],
+                                                                 values["max"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
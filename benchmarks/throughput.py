@@ -0,0 +1,119 @@
+"""
+Throughput and latency of the detectors on a seeded synthetic corpus, see `benchmarks.corpus`.
+
+`NumberDetector.find_all` and `DateDetector.find_all` are run on sentences of growing length and
+`DateDetector.parse_date` on bare temporal expressions, grouped by their number of tokens. Each group
+reports calls per second, tokens per second and latency percentiles in microseconds, ex:
+    python -m benchmarks.throughput --lengths 10,40,160 --count 300
+    python -m benchmarks.throughput --benchmark find_all --no-cache --no-fallback --json
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.corpus import CorpusGenerator, parse_lengths
+from utils.date_detector import DateDetector
+from utils.number_detector import NumberDetector
+from utils.service import percentile
+
+REFERENCE_TIME = datetime(2021, 6, 24, 21, 48, 1)
+
+BENCHMARKS = ("numbers", "parse_date", "find_all")
+
+
+def measure(func, inputs):
+    """
+    Calls the function on each input.
+    :return: (dict) calls, tokens, seconds, calls and tokens per second and latency percentiles in microseconds
+    """
+    latencies = []
+    tokens = 0
+    for text in inputs:
+        start = time.perf_counter()
+        func(text)
+        latencies.append(time.perf_counter() - start)
+        tokens += text.count(" ") + 1
+
+    total = sum(latencies)
+    result = {"calls": len(inputs), "tokens": tokens, "seconds": round(total, 6),
+              "calls_per_s": round(len(inputs) / total, 1) if total else None,
+              "tokens_per_s": round(tokens / total, 1) if total else None}
+    for name, fraction in (("p50_us", 0.5), ("p90_us", 0.9), ("p99_us", 0.99), ("max_us", 1.0)):
+        result[name] = round(percentile(latencies, fraction) * 1e6, 1)
+    return result
+
+
+def run(benchmarks, lengths, count, seed, detector_options, warmup=50):
+    """
+    :param benchmarks: (iterable(string)) names of the benchmarks to run, see `BENCHMARKS`
+    :param lengths: (List(int)) sentence lengths in tokens
+    :param count: (int) number of sentences of each length, or of expressions for parse_date
+    :param seed: (int) seed of the corpus
+    :param detector_options: (dict) `DateDetector` arguments
+    :param warmup: (int) number of unmeasured calls before each benchmark
+    :return: (dict) benchmark name to group to its measurements, see `measure`
+    """
+    number_detector = NumberDetector()
+    date_detector = DateDetector(**detector_options)
+    # Compilation is measured by `benchmarks.startup`
+    date_detector.rule_matcher().compile()
+    funcs = {"numbers": number_detector.find_all,
+             "parse_date": lambda text: date_detector.parse_date(text, REFERENCE_TIME),
+             "find_all": lambda text: date_detector.find_all(text, REFERENCE_TIME)}
+
+    results = {}
+    for name in benchmarks:
+        # Every benchmark gets the same corpus and warm up inputs from another seed
+        generator = CorpusGenerator(seed)
+        warmup_generator = CorpusGenerator(seed + 1)
+        if name == "parse_date":
+            warmup_inputs = warmup_generator.expressions(warmup)
+            groups = {}
+            for expression in generator.expressions(count * len(lengths)):
+                groups.setdefault(expression.count(" ") + 1, []).append(expression)
+        else:
+            warmup_inputs = warmup_generator.sentences(max(lengths), warmup)
+            groups = {length: generator.sentences(length, count) for length in lengths}
+
+        for text in warmup_inputs:
+            funcs[name](text)
+        results[name] = {str(group): measure(funcs[name], inputs) for group, inputs in sorted(groups.items())}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure detector throughput and latency on a synthetic corpus.")
+    parser.add_argument("--benchmark", choices=BENCHMARKS, action="append",
+                        help="benchmark to run, can be repeated, all of them by default")
+    parser.add_argument("--lengths", type=parse_lengths, default=[5, 10, 20, 40, 80],
+                        help="comma separated sentence lengths in tokens")
+    parser.add_argument("--count", type=int, default=200, help="number of sentences of each length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured calls before each benchmark")
+    parser.add_argument("--no-cache", dest="cache", action="store_false", help="disable the parse caches")
+    parser.add_argument("--no-fallback", dest="fallback", action="store_false",
+                        help="do not pass expressions that no rule matches to dateparser")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    detector_options = {"fallback": args.fallback}
+    if not args.cache:
+        detector_options.update(cache_size=0, fallback_cache_size=0)
+    results = run(args.benchmark or BENCHMARKS, args.lengths, args.count, args.seed, detector_options, args.warmup)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    columns = ("calls", "calls_per_s", "tokens_per_s", "p50_us", "p90_us", "p99_us", "max_us")
+    print("{:<12}{:>8}".format("benchmark", "tokens") + "".join("{:>14}".format(column) for column in columns))
+    for name, groups in results.items():
+        for group, result in groups.items():
+            print("{:<12}{:>8}".format(name, group) + "".join("{:>14}".format(result[column]) for column in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
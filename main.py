@@ -1,12 +1,153 @@
-from pprint import pprint
+"""
+Detects dates and numbers in a stream of texts.
+
+Reads one text per line, plain text or JSON objects, from a file or stdin and writes one JSON object
+per line with the found expressions. Dates are written in ISO format. ex:
+    cat messages.txt | python main.py > found.jsonl
+    python main.py messages.jsonl --format jsonl --field body --workers 4 -o found.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
 
 from utils.date_detector import DateDetector
+from utils.number_detector import NumberDetector
+from utils.parallel import imap_bounded
+from utils.regex_backend import BACKENDS
+from utils.serialization import dumps
+
+# Detectors of the current process, see `init_detectors`
+_date_detector = None
+_number_detector = None
+_reference_time = None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Detect dates and numbers in Turkish texts, one text per line.")
+    parser.add_argument("input", nargs="?", default="-", help="input file, stdin by default")
+    parser.add_argument("-o", "--output", default="-", help="output file, stdout by default")
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text",
+                        help="input format, plain text or a JSON object per line")
+    parser.add_argument("--field", default="text", help="field of the JSON objects or output holding the text")
+    parser.add_argument("--detect", choices=["all", "dates", "numbers"], default="all")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=64, help="number of lines sent to a worker at once")
+    parser.add_argument("--reference-time", type=datetime.fromisoformat,
+                        help="ISO time relative dates are resolved against, the start time by default")
+    parser.add_argument("--fallback-tokens", type=int,
+                        help="only pass expressions of up to this many tokens to dateparser, 0 disables it")
+    parser.add_argument("--regex-backend", choices=list(BACKENDS), default="re",
+                        help="engine the date rules are matched with, see utils/regex_backend.py")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not report throughput")
+    return parser.parse_args(argv)
+
+
+def init_detectors(detect, date_options, reference_time):
+    global _date_detector, _number_detector, _reference_time
+    _date_detector = DateDetector(**date_options) if detect in ("all", "dates") else None
+    _number_detector = NumberDetector() if detect in ("all", "numbers") else None
+    _reference_time = reference_time
+
+
+def read_records(lines, input_format, field):
+    """
+    Turns input lines into records, blank lines are skipped.
+    :param lines: (iterable(string))
+    :param input_format: (string) "text" or "jsonl"
+    :param field: (string) name of the text field
+    :return: (generator(dict))
+    """
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if input_format == "text":
+            yield {field: line}
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = {"error": "invalid JSON: {}".format(e)}
+            yield record if isinstance(record, dict) else {"error": "not a JSON object"}
+
+
+def detect_record(record, field="text"):
+    """
+    Adds found dates and numbers to a record, errors are reported in the record instead of stopping the stream.
+    :param record: (dict)
+    :param field: (string) name of the text field
+    :return: (dict)
+    """
+    text = record.get(field)
+    if "error" in record and text is None:
+        return record
+    if not isinstance(text, str):
+        record["error"] = "missing text field: {}".format(field)
+        return record
+
+    try:
+        if _date_detector is not None:
+            record["dates"] = _date_detector.find_all(text, _reference_time)
+        if _number_detector is not None:
+            record["numbers"] = _number_detector.find_all(text)
+    except ValueError as e:
+        record["error"] = str(e)
+    return record
+
+
+def _detect_item(item):
+    return detect_record(*item)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    date_options = {"regex_backend": args.regex_backend}
+    if args.fallback_tokens is not None:
+        date_options["fallback"] = args.fallback_tokens
+    reference_time = args.reference_time or datetime.now()
+    init_args = (args.detect, date_options, reference_time)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf8")
+    items = ((record, args.field) for record in read_records(source, args.format, args.field))
+
+    pool = None
+    if args.workers > 1:
+        from multiprocessing import Pool
+        pool = Pool(args.workers, initializer=init_detectors, initargs=init_args)
+        results = imap_bounded(pool, _detect_item, items, args.chunksize)
+    else:
+        init_detectors(*init_args)
+        results = map(_detect_item, items)
+
+    count, errors = 0, 0
+    start = time.perf_counter()
+    try:
+        for record in results:
+            target.write(dumps(record) + "\n")
+            count += 1
+            errors += "error" in record
+    except BrokenPipeError:
+        # The reader stopped early, ex: `| head`, silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), target.fileno())
+        return 1
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
 
-detector = DateDetector()
+    if not args.quiet:
+        elapsed = time.perf_counter() - start
+        sys.stderr.write("{} lines, {} errors in {:.2f}s, {:.1f} lines/s\n".format(
+            count, errors, elapsed, count / elapsed if elapsed else 0.0))
+    return 0
 
-while True:
-    x = input(">")
-    if x == 'stop':
-        break
 
-    pprint(detector.find_all(x))
+if __name__ == "__main__":
+    sys.exit(main())
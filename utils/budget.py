@@ -0,0 +1,57 @@
+"""
+Time budget of a detection call, see `DateDetector.find_all`.
+
+As the budget runs out the detector degrades in stages instead of running past it. First the
+expressions no rule matches are no longer passed to dateparser, then only short windows are evaluated,
+and once the budget is spent no more windows are evaluated, ex:
+    detector.find_all(text, budget=0.05).truncated -> True when a stage dropped work
+A window or a dateparser call that is already running is not interrupted, so a call can overrun its
+budget by the time of a single window.
+"""
+import time
+
+
+class Budget(object):
+    """
+    Seconds a call can take, counted from when the budget is created.
+    """
+    # Stages of degradation, in order
+    FULL = 0
+    NO_FALLBACK = 1
+    SHORT_WINDOWS = 2
+    EXHAUSTED = 3
+
+    def __init__(self, seconds, no_fallback_at=0.25, short_windows_at=0.5, clock=time.perf_counter):
+        """
+        :param seconds: (float) budget, a budget of 0 or less is spent from the start
+        :param no_fallback_at: (float) share of the budget after which dateparser is no longer used
+        :param short_windows_at: (float) share of the budget after which only short windows are evaluated
+        :param clock: (callable) seconds of a monotonic clock
+        """
+        self.clock = clock
+        start = clock()
+        self.deadline = start + seconds
+        self.no_fallback_from = start + max(seconds, 0) * no_fallback_at
+        self.short_windows_from = start + max(seconds, 0) * short_windows_at
+        # Set by the detector when a stage dropped work
+        self.truncated = False
+
+    @classmethod
+    def until(cls, deadline, clock=time.perf_counter, **shares):
+        """
+        A budget that runs out at a time of the clock, ex: the deadline of a request.
+        """
+        return cls(deadline - clock(), clock=clock, **shares)
+
+    def stage(self):
+        """
+        :return: (int) stage of degradation at this time, one of FULL, NO_FALLBACK, SHORT_WINDOWS, EXHAUSTED
+        """
+        now = self.clock()
+        if now >= self.deadline:
+            return self.EXHAUSTED
+        if now >= self.short_windows_from:
+            return self.SHORT_WINDOWS
+        if now >= self.no_fallback_from:
+            return self.NO_FALLBACK
+        return self.FULL
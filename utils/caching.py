@@ -0,0 +1,53 @@
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LRUCache(object):
+    """
+    A bounded mapping that drops the least recently used entry when it is full.
+    Keeps hit and miss counts, similar to `functools.lru_cache`.
+    """
+
+    def __init__(self, maxsize):
+        """
+        :param maxsize: (int) maximum number of entries
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None, is_valid=None):
+        """
+        Get the value of a key and mark it as recently used.
+        :param key: cache key
+        :param default: returned when the key is missing or its value is not valid
+        :param is_valid: (callable) optional check for values that go stale
+        :return: the value or the default
+        """
+        value = self.entries.get(key, self)
+        if value is self or (is_valid is not None and not is_valid(value)):
+            self.misses += 1
+            return default
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
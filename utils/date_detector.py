@@ -1,14 +1,41 @@
+import copy
+import os
 import re
 from calendar import monthrange
-from datetime import timedelta, date, datetime
-
-import dateparser
+from collections import namedtuple
+from datetime import timedelta, datetime
 
+from utils.budget import Budget
+from utils.caching import CacheInfo, LRUCache
 from utils.common_regexes import (CASE_SUFFIXES, GENITIVE_SUFFIXES,
                                   NATURAL_NUMBERS, CONJUNCTIONS, PRONOUN_SUFFIX, PLURALITY_SUFFIXES,
                                   POSSESSIVE_SUFFIXES)
+from utils.holidays import HolidayCalendar
+from utils.instrumentation import instrument as instrument_detector
+from utils.lazy import LazyAttribute, LazyRegex, lazy_regex
 from utils.number_detector import NumberDetector
-from utils.pre_processing import turkish_lower
+from utils.parallel import imap_bounded
+from utils.pre_processing import tokenize, turkish_lower
+from utils.prefilter import TemporalPrefilter
+from utils.regex_backend import RegexBackend, get_backend
+from utils.rule_analysis import exact_strings, parse
+from utils.rule_loader import GROUP_REFERENCE_REGEX, load_rule_file
+from utils.rule_matcher import RuleMatcher
+from utils.rule_order import check_order, find_overlaps, load_order
+
+# Imported on first use, see `load_dateparser`
+dateparser = None
+
+
+def load_dateparser():
+    """
+    Import dateparser, it is only needed by the fallback of `DateDetector.parse_date` and is slow to import.
+    """
+    global dateparser
+    if dateparser is None:
+        import dateparser as dateparser_module
+        dateparser = dateparser_module
+    return dateparser
 
 
 def date_creator(year=None, month=None, day=None, hour=None, minute=None, second=None,
@@ -16,7 +43,10 @@ def date_creator(year=None, month=None, day=None, hour=None, minute=None, second
                  dweek=None, round_year=False, week_day=None, month_str=None):
     """
     A higher order function for creating date objects. Regex matched groups are parsed by the
-    inner function, `regex_group_helper`.
+    inner function, `regex_group_helper`. Missing values are taken from the reference time passed to
+    it, the current time by default. Group backed values are templates, ex: '-\\1', they are parsed
+    into a plan of literals and group numbers once, so they are read from the match of the rule
+    instead of running the rule again.
     """
     day_offset_map = {
         "pazartesi": 0, "salı": 1, "çarşamba": 2, "perşembe": 3, "cuma": 4, "cumartesi": 5, "pazar": 6
@@ -28,7 +58,24 @@ def date_creator(year=None, month=None, day=None, hour=None, minute=None, second
     }
     month_to_num_map = {month: num for num, month in num_to_month_map.items()}
 
-    def regex_group_helper(rule_regex, input_expr):
+    plans = {value: template_plan(value) for value in (year, month, day, hour, minute, second, dyear, dmonth, dday,
+                                                       dhour, dminute, dsecond, dweek, week_day, month_str)
+             if isinstance(value, str)}
+
+    def regex_group_helper(rule_regex, input_expr, reference_time=None, rule_match=None):
+        """
+        :param rule_regex: (compiled regex) regex of the rule
+        :param input_expr: (String) the expression the rule matched
+        :param reference_time: (datetime) time relative expressions are resolved against, defaults to now
+        :param rule_match: (match object) match of the rule on the expression, used when the rule is
+        anchored to the start, see `single_match`, the rule is run again without it
+        """
+        now = reference_time if reference_time is not None else datetime.now()
+        single_match = rule_match is not None and regex_group_helper.single_match
+        if single_match:
+            # Substitution keeps the text after the match, an anchored rule matches only once
+            tail = input_expr[rule_match.end():]
+
         def parse_value(val, default=0, value_map=None):
             """
             Helper method for evaluating group values
@@ -36,7 +83,12 @@ def date_creator(year=None, month=None, day=None, hour=None, minute=None, second
             if val is None:
                 return default
             elif isinstance(val, str):
-                group_val = re.sub(rule_regex, val, input_expr)
+                plan = plans[val]
+                if single_match and plan is not None:
+                    group_val = ''.join([part if isinstance(part, str) else rule_match.group(part) or ''
+                                         for part in plan]) + tail
+                else:
+                    group_val = rule_regex.sub(val, input_expr)
                 if not value_map:
                     return int(group_val)
                 else:
@@ -44,12 +96,12 @@ def date_creator(year=None, month=None, day=None, hour=None, minute=None, second
             else:
                 return val
 
-        year_val = parse_value(year, default=date.today().year)
-        month_val = parse_value(month_str, default=date.today().month, value_map=month_to_num_map)
+        year_val = parse_value(year, default=now.year)
+        month_val = parse_value(month_str, default=now.month, value_map=month_to_num_map)
         if not month_str:
-            month_val = parse_value(month, default=date.today().month)
+            month_val = parse_value(month, default=now.month)
 
-        if round_year and (date.today().month < month_val):
+        if round_year and (now.month < month_val):
             year_val -= 1
 
         if dyear:
@@ -73,10 +125,10 @@ def date_creator(year=None, month=None, day=None, hour=None, minute=None, second
         if day == 'last':
             day_val = monthrange(year_val, month_val)[1]
         else:
-            day_val = parse_value(day, default=date.today().day)
-        hour_val = parse_value(hour, default=datetime.now().hour)
-        minute_val = parse_value(minute, default=datetime.now().minute)
-        second_val = parse_value(second, default=datetime.now().second)
+            day_val = parse_value(day, default=now.day)
+        hour_val = parse_value(hour, default=now.hour)
+        minute_val = parse_value(minute, default=now.minute)
+        second_val = parse_value(second, default=now.second)
 
         date_obj = datetime(year_val, month_val, day_val, hour_val, minute_val, second_val)
 
@@ -87,7 +139,7 @@ def date_creator(year=None, month=None, day=None, hour=None, minute=None, second
             date_obj += timedelta(days=parse_value(dday))
 
         if week_day is not None:
-            week_day_offset = parse_value(week_day, value_map=day_offset_map) - date.today().weekday()
+            week_day_offset = parse_value(week_day, value_map=day_offset_map) - now.weekday()
             date_obj += timedelta(days=week_day_offset)
 
         if dhour:
@@ -101,9 +153,170 @@ def date_creator(year=None, month=None, day=None, hour=None, minute=None, second
 
         return date_obj
 
+    # Expressions whose time of day is not fixed depend on the current time, not just the current day
+    regex_group_helper.uses_clock = hour is None or minute is None or second is None
+    # Set for rules whose matches start at the beginning of the expression, see `RuleSet`
+    regex_group_helper.single_match = False
     return regex_group_helper
 
 
+def holiday_creator(calendar, name, round_year=False, end=False):
+    """
+    Creates the start or the end of a holiday from the holiday calendar, see `holidays`. It is called
+    like the inner function of `date_creator`.
+    :param calendar: (HolidayCalendar)
+    :param name: (String) holiday name, ex: 'RAMAZAN_BAYRAMI'
+    :param round_year: (bool) whether the last holiday starting in or before the current month is meant,
+    the one of the current year otherwise
+    :param end: (bool) whether the last second of the holiday is created instead of its first
+    """
+    day_time = datetime.max.time().replace(microsecond=0) if end else datetime.min.time()
+
+    def holiday_helper(rule_regex, input_expr, reference_time=None, rule_match=None):
+        now = reference_time if reference_time is not None else datetime.now()
+        if round_year:
+            span = calendar.latest(name, now.year, now.month)
+        else:
+            span = calendar.spans(name, now.year)[0]
+        return datetime.combine(span[end], day_time)
+
+    holiday_helper.uses_clock = False
+    holiday_helper.single_match = False
+    return holiday_helper
+
+
+def template_plan(template):
+    """
+    Splits a substitution template into literals and group numbers, ex: '-\\1' -> ['-', 1]
+    :param template: (String)
+    :return: (List) None for templates with other escapes, they are left to `re.sub`
+    """
+    plan = []
+    for index, part in enumerate(GROUP_REFERENCE_REGEX.split(template)):
+        if index % 2:
+            plan.append(int(part))
+        elif '\\' in part:
+            return None
+        elif part:
+            plan.append(part)
+    return plan
+
+
+# Names of the `date_creator` arguments, the resolution parameters of the rules
+DATE_CREATOR_PARAMETERS = date_creator.__code__.co_varnames[:date_creator.__code__.co_argcount]
+
+
+ParseCacheInfo = namedtuple("ParseCacheInfo", CacheInfo._fields + ("negative_hits",))
+
+
+class TagConstruct(list):
+    """
+    Dates found by `DateDetector.find_all`. `truncated` is set when the time budget or the input size
+    guards cut the search short, dates can be missing then.
+    """
+
+    def __init__(self, values=(), truncated=False):
+        list.__init__(self, values)
+        self.truncated = truncated
+
+
+class RuleSet(object):
+    """
+    Compiled rules of a rule file with their `date_creator` resolutions, see `rule_loader`.
+    """
+
+    def __init__(self, rule_file, span_separator, calendar, backend=None):
+        """
+        :param rule_file: (RuleFile) loaded rule file
+        :param span_separator: (string) separator of the unit and value of date-period resolutions
+        :param calendar: (HolidayCalendar) calendar of the holiday resolutions
+        :param backend: (RegexBackend) engine the rules are matched with, see `regex_backend`. Rules the
+        backend can not match like the standard library are matched with it instead.
+        """
+        self.rule_file = rule_file
+        self.backend = backend
+        # Rule name to the constructs the backend does not support, only for the rules that have any
+        self.incompatible = {}
+        # Rules as tuples of (rule_name, rule_type, rule_regex, date_func)
+        self.regex_list = []
+        for rule, analysis in zip(rule_file.rules, rule_file.analysis):
+            resolution = rule["resolve"]
+            if isinstance(resolution, list):
+                date_func = [date_creator(**end) for end in resolution]
+            elif "holiday" in resolution:
+                date_func = [holiday_creator(calendar, resolution["holiday"], resolution.get("round_year", False), end)
+                             for end in (False, True)]
+            elif "unit" in resolution:
+                date_func = span_separator.join((resolution["unit"], str(resolution.get("group", resolution.get("value")))))
+            else:
+                date_func = date_creator(**resolution)
+            # Values of rules that match only at the start of an expression are read from their match
+            for func in (date_func if isinstance(date_func, list) else [date_func]):
+                if callable(func):
+                    func.single_match = analysis["anchored"] and not rule["flags"] & re.MULTILINE
+            rule_backend = backend
+            if backend is not None:
+                issues = backend.check(rule["pattern"], rule["flags"])
+                if issues:
+                    self.incompatible[rule["name"]] = issues
+                    rule_backend = None
+            self.regex_list.append((rule["name"], rule["type"], LazyRegex(rule["pattern"], rule["flags"], rule_backend),
+                                    date_func))
+
+        self.analysis = rule_file.analysis
+        self.spans = {rule["name"]: analysis["span"] for rule, analysis in zip(rule_file.rules, rule_file.analysis)}
+        self._matcher = None
+        self._prefilter = None
+        self._overlaps = None
+
+    def names(self):
+        return [rule[0] for rule in self.regex_list]
+
+    def reordered(self, order):
+        """
+        The same rules in another order, see `rule_order`.
+        :param order: (List(string)) rule names
+        :return: (RuleSet)
+        """
+        position = {name: index for index, name in enumerate(self.names())}
+        ordered = copy.copy(self)
+        ordered.regex_list = [self.regex_list[position[name]] for name in order]
+        ordered.analysis = [self.analysis[position[name]] for name in order]
+        ordered._matcher = None
+        return ordered
+
+    def overlaps(self):
+        """
+        Pairs of rules that can match the same string, found on first use, see `rule_order.find_overlaps`.
+        Rule order does not change them.
+        :return: (set) pairs of rule names
+        """
+        if self._overlaps is None:
+            self._overlaps = find_overlaps(self.regex_list)
+        return self._overlaps
+
+    def matcher(self):
+        """
+        Single pass matcher over the rules, built on first use.
+        :return: (RuleMatcher)
+        """
+        if self._matcher is None:
+            self._matcher = RuleMatcher(self.regex_list, self.analysis, self.backend)
+        return self._matcher
+
+    def prefilter(self, month_forms, is_number):
+        """
+        Sentence prefilter of the rules, built on first use, rule order does not change it.
+        :param month_forms: (dict) month expression to its month name, see `DateDetector.MONTH_FORMS`
+        :param is_number: (callable) see `NumberDetector.is_number`
+        :return: (TemporalPrefilter)
+        """
+        if self._prefilter is None:
+            self._prefilter = TemporalPrefilter([analysis["requirements"] for analysis in self.analysis],
+                                                month_forms, is_number)
+        return self._prefilter
+
+
 class DateDetector(object):
     lan = 'tr'
     lan_locale = 'tr-CY'
@@ -147,612 +360,568 @@ class DateDetector(object):
     YEAR_DD_MM_YYYY = r"(?:([0-3][0-9]){}([01][0-9]){}({}))".format(DATE_SEPARATORS, DATE_SEPARATORS,
                                                                     YEAR_ONLY_EXPRESSION),
 
-    YEAR_ONLY_REGEX = re.compile(r"^(?:({})(?:(?:{})|(?: {}{}))?)$"
+    YEAR_ONLY_REGEX = lazy_regex(r"^(?:({})(?:(?:{})|(?: {}{}))?)$"
                                  .format(YEAR_ONLY_EXPRESSION, CASE_SUFFIXES, YEAR_EXPRESSION, CASE_SUFFIXES),
                                  re.UNICODE)
 
-    """
-    Holds the list of regexes a a list of tuples.
-    Each tuple has the format:
-    (regex_name, regex, replacement, type)
-    """
-    regex_list = [
-        # ########### Date Times ###########
-        ("NOW_REGEX", TYPE_DATETIME,
-         re.compile(r"^((şuan)|(şimdi)|(hemen)|(acil)|(birazdan)|(tez( zaman)?)|(derhal)){}?$"
-                    .format(CASE_SUFFIXES), re.UNICODE),
-         date_creator()),
-
-        # minute before
-        ("MINUTE_BEFORE_REGEX", TYPE_DATETIME,
-         re.compile(r"^([0-9]+) {}( {})$".format(MINUTE_EXPRESSION, BEFORE_EXPRESSION), re.UNICODE),
-         date_creator(dminute='-\\1')),
-
-        # minute after; ex: 1 dkye
-        ("MINUTE_AFTER_REGEX", TYPE_DATETIME,
-         re.compile(r"^([0-9]+) {}((y[ae])|( {}))$".format(MINUTE_EXPRESSION, LATER_EXPRESSION), re.UNICODE),
-         date_creator(dminute='\\1')),
-
-        # hour expressions; ex: 12:59
-        ("HOUR_REGEX", TYPE_DATETIME,
-         re.compile(r"^([012][0-9])[: ,.]([0-6][0-9])$"),
-         date_creator(hour='\\1', minute='\\2')),
-
-        # pm with hour; ex: akşamüstü 1
-        ("PM_REGEX_1", TYPE_DATETIME,
-         re.compile("^{} ([01]?[0-9])$".format(PM_EXPRESSION), re.UNICODE),
-         date_creator(hour='\\1', dhour=12, minute=0, second=0)),
-
-        # pm without hour # TODO 4-6 arası span
-        ("PM_REGEX_2", TYPE_DATETIME,
-         re.compile(r"^{}$".format(PM_EXPRESSION), re.UNICODE),
-         date_creator(hour=17, minute=0, second=0)),
-
-        # am with hour; ex: sabah 8
-        ("AM_REGEX_1", TYPE_DATETIME,
-         re.compile(r"^{} ([01]?[0-9])$".format(AM_EXPRESSION), re.UNICODE),
-         date_creator(hour='\\1', minute=0, second=0)),
-
-        # am without hour; ex: sabah  # TODO 4-6 arası span
-        ("AM_REGEX_2", TYPE_DATETIME,
-         re.compile(r"^{}$".format(AM_EXPRESSION), re.UNICODE),
-         date_creator(hour=8, minute=0, second=0)),
-
-        # 2 days later; ex: öbürsü gün # TODO span
-        ("THE_DAY_AFTER_TOMORROW_REGEX", TYPE_DATETIME,
-         re.compile(r"^öbür(sü)? gün$", re.UNICODE),
-         date_creator(dday=2)),
-
-        # next date; ex: önümüzdeki salı # TODO span
-        ("NEXT_DATE_REGEX", TYPE_DATETIME,
-         re.compile(r"^{} ({})$".format(LATER_EXPRESSION, DAYS_EXPRESSION), re.UNICODE),
-         date_creator(week_day="\\1", dweek=1)),
-
-        # preceding date; ex: geçen salı # TODO span
-        ("PRECEDING_DATE_REGEX", TYPE_DATETIME,
-         re.compile(r"^{} ({})$".format(BEFORE_EXPRESSION, DAYS_EXPRESSION), re.UNICODE),
-         date_creator(week_day="\\1", dweek=-1)),
-
-        # n days later; ex: 10 gün sonra
-        ("LATER_DAY_REGEX", TYPE_DATETIME,
-         re.compile(r"^(?:([0-9]+) (gün ((içinde)|(boyunca)|(sonra(sı(nda)?)?))))$", re.UNICODE),
-         date_creator(dday="\\1")),
-
-        # n days before; ex: 4 gün önce
-        ("BEFORE_DAY_REGEX", TYPE_DATETIME,
-         re.compile(r"^([0-9]+) gün {}$".format(BEFORE_EXPRESSION), re.UNICODE),
-         date_creator(dday="-\\1")),
-
-        # dd-month; 19 ağustostaki # TODO
-        ("MONTH_REGEX", TYPE_DATETIME,
-         re.compile(r"^([0-3]?[0-9]){}({})(?:{})$".format(DATE_SEPARATORS, MONTHS_EXPRESSION, CASE_SUFFIXES),
-                    re.UNICODE),
-         date_creator(month_str="\\2", day="\\1")),
-
-        # end of month; ex: ağustos sonu, ağustos ayı sonu # TODO span
-        ("EO_MONTH_REGEX", TYPE_DATETIME,
-         re.compile(r"^({})(?:(?:{})|(?: ayı))? sonu(ndaki)?$".format(MONTHS_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         date_creator(month_str="\\1", day="last")),
-
-        # start of month; ex: ekim başı # TODO span
-        ("SO_MONTH_REGEX", TYPE_DATETIME,
-         re.compile(r"^({})(?:{})? ((ilk günü(ndeki)?)|(başı(nda(ki)?)?))$"
-                    .format(MONTHS_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         date_creator(month_str="\\1", day=1)),
-
-        # start of this month; bu ayın ilk günü # TODO span
-        ("SO_THIS_MONTH_REGEX", TYPE_DATETIME,
-         re.compile(r"^(?:bu )?{} (?:(?:{} günü(?:{})?)|(?:başı(?:nda(?:ki)?)?)|(?:biri))$"
-                    .format(MONTH, FIRST_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         date_creator(day=1)),
-
-        # start of last month; ex: geçen ayın birinci günü # TODO span
-        ("SO_PRECEDING_MONTH_REGEX", TYPE_DATETIME,
-         re.compile(r"^{} {} (?:(?:(?:ilk|birinci) günü(?:ndeki)?)|(?:başı(?:nda(?:ki)?)?)|(?:biri))$"
-                    .format(BEFORE_EXPRESSION, MONTH), re.UNICODE),
-         date_creator(dmonth=-1, day=1)),
-
-        # end of this month; ex: bu ayın sonu
-        ("EO_THIS_MONTH_REGEX", TYPE_DATETIME,
-         re.compile(r"^(?:bu )?{} (?:(?:sonu(?:ndaki)?)|(?:son günü))$".format(MONTH), re.UNICODE),
-         date_creator(day='last')),
-
-        # date of month; ex: ayın 16sında
-        ("DATE_OF_MONTH_REGEX", TYPE_DATETIME,
-         re.compile(r"^(?:bu )?{} ([0-3]?[0-9])[ '.]?{}{}$"
-                    .format(MONTH, GENITIVE_SUFFIXES, CASE_SUFFIXES), re.UNICODE),
-         date_creator(day='\\1')),
-
-        # date of month; ex: geçen ayın 16sında
-        ("PRECEDING_DAY_OF_MONTH_REGEX", TYPE_DATETIME,
-         re.compile(r"^{} {} ([0-3]?[0-9])[ '.]?{}{}$"
-                    .format(BEFORE_EXPRESSION, MONTH, GENITIVE_SUFFIXES, CASE_SUFFIXES), re.UNICODE),
-         date_creator(day='\\1', dmonth=-1)),
-
-        # n weeks later at a precise day, ex: 2 hafta sonra pazartesi
-        ("N_WEEKS_LATER_AT_DAY", TYPE_DATETIME,
-         re.compile(r"^([0-9]+) {} {} ({})$".format(WEEK_EXPRESSION, LATER_EXPRESSION, DAYS_EXPRESSION), re.UNICODE),
-         date_creator(dweek='\\1', week_day='\\2')),
-
-        # ex: 3 hafta önce pazartesi
-        ("N_WEEKS_BEFORE_AT_DAY", TYPE_DATETIME,
-         re.compile(r"^([0-9]+) {} {} ({})$".format(WEEK_EXPRESSION, BEFORE_EXPRESSION, DAYS_EXPRESSION), re.UNICODE),
-         date_creator(dweek='-\\1', week_day='\\2')),
-
-        # day month year; ex: 19 ocak 2005 teki TODO span
-        ("DAY_MONTH_YEAR_REGEX", TYPE_DATETIME,
-         re.compile(r"^([0-3]?[0-9]) ({}) ({}){}?$"
-                    .format(MONTHS_EXPRESSION, YEAR_ONLY_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         date_creator(day='\\1', month_str='\\2', year='\\3')),
-
-        # month year; ex: ocak 2005 teki TODO span
-        ("MONTH_YEAR_REGEX", TYPE_DATETIME,
-         re.compile(r"^({}) ({}){}?$"
-                    .format(MONTHS_EXPRESSION, YEAR_ONLY_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         date_creator(month_str='\\1', year='\\2')),
-
-        # ########### Date Spans ##########
-        # today
-        ("TODAY_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:bu ?gün(?:{})?)|(?:gün (?:{})))$".format(PRONOUN_SUFFIX, SPAN_IMPLYING), re.UNICODE),
-         [date_creator(hour=0, minute=0, second=0), date_creator(hour=23, minute=59, second=59)]),
-
-        # yesterday
-        ("YESTERDAY_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:dün(?:{})?)|(?:{} gün))$".format(PRONOUN_SUFFIX, BEFORE_EXPRESSION), re.UNICODE),
-         [date_creator(dday=-1, hour=0, minute=0, second=0), date_creator(dday=-1, hour=23, minute=59, second=59)]),
-
-        # TODO tomorrow
-
-        # New years; ex: yılbaşında, yıl başında, yılbaşı
-        ("NEW_YEARS", TYPE_DATESPAN,
-         re.compile(r"^yıl ?ba[sş][iı](?:{})?$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=1, day=1, hour=0, minute=0, second=0),
-          date_creator(month=1, day=1, hour=23, minute=59, second=59)]),
-
-        # Valentines day; sevgililer günü
-        ("VALENTINES_DAY", TYPE_DATESPAN,
-         re.compile(r"^sevgililer g[uü]n[uü](?:{})?$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=2, day=14, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=2, day=14, hour=23, minute=59, second=59, round_year=True)]),
-
-        # Cumhuriyet bayramında
-        ("CUMHURIYET_BAYRAMI", TYPE_DATESPAN,
-         re.compile(r"^cumhuriyet bayram[iı](?:{})?$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=10, day=29, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=10, day=29, hour=23, minute=59, second=59, round_year=True)]),
-
-        # çocuk bayramında
-        ("COCUK_BAYRAMI", TYPE_DATESPAN,
-         re.compile(r"^[çc]ocuk (?:(?:bayram[iı])|(?:[şs]enli[ğg]i))(?:{})?$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=4, day=23, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=4, day=23, hour=23, minute=59, second=59, round_year=True)]),
-
-        # may day, international workers day, labour Day
-        ("LABOUR_DAY", TYPE_DATESPAN,
-         re.compile(r"^i[şs][çc]i bayram[iı](?:{})?$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=5, day=1, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=5, day=1, hour=23, minute=59, second=59, round_year=True)]),
-
-        # this week
-        ("THIS_WEEK_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:bu hafta(?:{})?)$".format(PRONOUN_SUFFIX), re.UNICODE),
-         [date_creator(week_day=0, hour=0, minute=0, second=0), date_creator()]),
-
-        # last week; ex: geçen hafta
-        ("LAST_WEEK_REGEX", TYPE_DATESPAN,
-         re.compile(r"^{} {}$".format(BEFORE_EXPRESSION, WEEK_EXPRESSION), re.UNICODE),
-         [date_creator(dweek=-1, week_day=0), date_creator(dweek=-1, week_day=6)]),
-
-        # last n weeks; ex: son 3 hafta
-        ("LAST_N_WEEKS_REGEX", TYPE_DATESPAN,
-         re.compile(r"^{} ({}) {}$".format(BEFORE_EXPRESSION, NATURAL_NUMBERS, WEEK_EXPRESSION), re.UNICODE),
-         [date_creator(dweek='-\\1'), date_creator()]),
-
-        # last n gün; ex: son 3 gün içinde
-        ("LAST_N_DAYS_REGEX", TYPE_DATESPAN,
-         re.compile(r"^{} ({}) gün(?:(?:{})|(?: {}))?$".format(BEFORE_EXPRESSION, NATURAL_NUMBERS,
-                                                               PRONOUN_SUFFIX, SPAN_IMPLYING), re.UNICODE),
-         [date_creator(dday='-\\1'), date_creator()]),
-
-        # weekday
-        ("WEEKDAY_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:bu )?hafta ?içi(?:{})?)$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(week_day=0, hour=0, minute=0, second=0),
-          date_creator(week_day=4, hour=23, minute=59, second=59)]),
-
-        # weekend
-        ("WEEKEND_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:{} )?hafta ?sonu(?:{})?)$".format(BEFORE_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(dweek=-1, week_day=5, hour=0, minute=0, second=0),
-          date_creator(dweek=-1, week_day=6, hour=23, minute=59, second=59)]),
-
-        # this year; ex: bu yıl, du yıldaki
-        ("THIS_YEAR_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:bu {}(?:{})?)$".format(YEAR_EXPRESSION, PRONOUN_SUFFIX), re.UNICODE),
-         [date_creator(month=1, day=1, hour=0, minute=0, second=0), date_creator()]),
-
-        # last year; ex: geçen yılki, 1 sene öncesi, son bir yılki
-        ("LAST_YEAR_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:{}(?: 0*1)? {}(?:{}|{})?)|(?:0*1 {} {}))$"
-                    .format(BEFORE_EXPRESSION, YEAR_EXPRESSION, CASE_SUFFIXES, PRONOUN_SUFFIX,
-                            YEAR_EXPRESSION, BEFORE_EXPRESSION), re.UNICODE),
-         [date_creator(dyear=-1, hour=0, minute=0, second=0), date_creator()]),
-
-        # ex: geçen yıl eylül ayında
-        ("LAST_YEAR_MONTH_REGEX", TYPE_DATESPAN,
-         re.compile(r"^{} {} ({}) ayında$".format(BEFORE_EXPRESSION, YEAR_EXPRESSION, MONTHS_EXPRESSION), re.UNICODE),
-         [date_creator(dyear=-1, month_str='\\1', day=1, hour=0, minute=0, second=0),
-          date_creator(dyear=-1, month_str='\\1', day='last', hour=23, minute=59, second=59)]),
-
-        # one year later; ex: 1 yıl sonra, seneye kadar, 1 yıla kadar, önümüzdeki sene, gelecek yıl
-        ("ONE_YEAR_LATER_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:((bir)|(0*1)) {}({})?)( kadar)?( sonra([sk][ıi])?)?)|(?:(?:{} {}({})?)|(?:seneye))$"
-                    .format(YEAR_EXPRESSION, CASE_SUFFIXES, LATER_EXPRESSION, YEAR_EXPRESSION, CASE_SUFFIXES),
-                    re.UNICODE),
-         [date_creator(), date_creator(dyear=1)]),
-
-        ("N_YEAR_BEFORE_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:({}) {}({})? {})$"
-                    .format(NATURAL_NUMBERS, YEAR_EXPRESSION, CASE_SUFFIXES, BEFORE_EXPRESSION), re.UNICODE),
-         [date_creator(dyear='-\\1', hour=0, minute=0, second=0), date_creator()]),
-
-        # this month
-        ("THIS_MONTH_REGEX", TYPE_DATESPAN,
-         re.compile(r"^bu {}(?: {})?$".format(MONTH, SPAN_IMPLYING), re.UNICODE),
-         [date_creator(day=1, hour=0, minute=0, second=0), date_creator()]),
-
-        # next month; ex: gelecek ay
-        ("NEXT_MONTH_REGEX", TYPE_DATESPAN,
-         re.compile(r"^{} {}({})?$".format(LATER_EXPRESSION, MONTH, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(dmonth=1, day=1, hour=0, minute=0, second=0),
-          date_creator(dmonth=1, day='last', hour=23, minute=59, second=59)]),
-
-        # preceding month; ex: geçtiğimiz ay
-        ("PRECEDING_MONTH_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:{} {}({})?)|(?:geçenlerde))?$"
-                    .format(BEFORE_EXPRESSION, MONTH, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(dmonth=-1, day=1, hour=0, minute=0, second=0),
-          date_creator(dmonth=-1, day='last', hour=23, minute=59, second=59)]),
-
-        # N months before; ex: 1 ay önce, iki ay önce
-        ("N_MONTHS_BEFORE_REGEX", TYPE_DATESPAN,
-         re.compile(r"^({}) {} {}$".format(NATURAL_NUMBERS, MONTH, BEFORE_EXPRESSION), re.UNICODE),
-         [date_creator(dmonth='-\\1', day=1, hour=0, minute=0, second=0),
-          date_creator(dmonth='-\\1', day='last', hour=23, minute=59, second=59)]),
-
-        # last n months; ex: son altı ay
-        ("LAST_N_MONTHS_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:{} ([01]?[0-9]) {}(?:{})?(?: {})?)$"
-                    .format(BEFORE_EXPRESSION, MONTH, CASE_SUFFIXES, SPAN_IMPLYING), re.UNICODE),
-         [date_creator(dmonth='-\\1', day=1, hour=0, minute=0, second=0), date_creator()]),
-
-        # eylül ayında
-        ("IN_THE_MONTH", TYPE_DATESPAN,
-         re.compile(r"^(?:({}) {}(?:{})?)$".format(MONTHS_EXPRESSION, MONTH, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month_str='\\1', day=1, hour=0, minute=0, second=0),
-          date_creator(month_str='\\1', day='last', hour=23, minute=59, second=59)]),
-
-        # month + suffix; ex: ocak, ocakta
-        ("JUST_MONTH", TYPE_DATESPAN,
-         re.compile(r"^(?:({})(?:{})?)$".format(MONTHS_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month_str='\\1', day=1, hour=0, minute=0, second=0),
-          date_creator(month_str='\\1', day='last', hour=23, minute=59, second=59)]),
-
-        # from month till today; ex: ocaktan beri
-        ("START_FROM_MONTH", TYPE_DATESPAN,
-         re.compile(r"^({})(?:{})? (?:(?:{}{})|(?:tarihinden) )?(?:(?:bu(?:güne)|(?: yana))|(?:beri)|(?:sonra))$"
-                    .format(MONTHS_EXPRESSION, CASE_SUFFIXES, MONTH, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month_str='\\1', day=1, hour=0, minute=0, second=0, round_year=True), date_creator()]),
-
-        # from month till today; ex: 12 aralıktan beri
-        ("START_FROM_DM", TYPE_DATESPAN,
-         re.compile(r"^([1-3][0-9]) ({})(?:{})? "
-                    r"(?:(?:{}{})|(?:tarihinden) )?(?:(?:bu(?:güne)|(?: yana))|(?:beri)|(?:sonra))$"
-                    .format(MONTHS_EXPRESSION, CASE_SUFFIXES, MONTH, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month_str='\\2', day='\\1', hour=0, minute=0, second=0, round_year=True), date_creator()]),
-
-        # from last month to today; geçen aydan bugüne
-        ("LAST_MONTH_TODAY_REGEX", TYPE_DATESPAN,
-         re.compile(r"^{} {}({})? bu((güne)|( yana))$".format(BEFORE_EXPRESSION, MONTH, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(dmonth=-1, day=1, hour=0, minute=0, second=0), date_creator()]),
-
-        # between two months; ex: mayıs ve temmuz arasında
-        ("BETWEEN_TWO_MONTHS_REGEX", TYPE_DATESPAN,
-         re.compile(rf"^({MONTHS_EXPRESSION}){CONJUNCTIONS}({MONTHS_EXPRESSION})(?: {MONTH}(?:{PLURALITY_SUFFIXES})?"
-                    rf"(?:{POSSESSIVE_SUFFIXES}|{CASE_SUFFIXES})?)? {SPAN_IMPLYING}$", re.UNICODE),
-         [date_creator(month_str='\\1', day=1, hour=0, minute=0, second=0),
-          date_creator(month_str='\\2', day='last', hour=23, minute=59, second=59)]),
-
-        # from day month to day month; ex: 10 Ocak ile 12 Mayıs arasında
-        ("FROM_DM_TO_DM_REGEX", TYPE_DATESPAN,
-         re.compile(r"^([0-3]?[0-9]) ({})(?:{}|{})([0-3]?[0-9]) ({})(?: tarihleri)? arası(?:{})?$"
-                    .format(MONTHS_EXPRESSION, DATE_SEPARATORS, CONJUNCTIONS, MONTHS_EXPRESSION,
-                            CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month_str='\\2', day='\\1', hour=0, minute=0, second=0),
-          date_creator(month_str='\\4', day='\\3', hour=23, minute=59, second=59)]),
-
-        # dd-mm-yyyy dd-mm-yyyy # TODO test this
-        ("FROM_TO_DATE_SPAN_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:{})(?:{}|{})?(?:{})(?: (?:tarihleri)? arası(?:{})?)?$"
-                    .format(YEAR_DD_MM_YYYY, DATE_SEPARATORS, CONJUNCTIONS, YEAR_DD_MM_YYYY, CASE_SUFFIXES),
-                    re.UNICODE),
-         [date_creator(year='\\3', month='\\2', day='\\1', hour=0, minute=0, second=0),
-          date_creator(year='\\6', month='\\5', day='\\4', hour=23, minute=59, second=59)]),
-
-        # from day month year to day month year; ex: 12 aralık 2017 ve 13 ocak 2018 arasında
-        ("FROM_DMY_TO_DMY_REGEX", TYPE_DATESPAN,
-         re.compile(r"^([0-3]?[0-9]) ({}) ({})(?:{}|{})([0-3]?[0-9]) ({}) ({})(?: tarihleri)? arası(?:{})?$"
-                    .format(MONTHS_EXPRESSION, YEAR_ONLY_EXPRESSION, DATE_SEPARATORS, CONJUNCTIONS,
-                            MONTHS_EXPRESSION, YEAR_ONLY_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(year='\\3', month_str='\\2', day='\\1', hour=0, minute=0, second=0),
-          date_creator(year='\\6', month_str='\\5', day='\\4', hour=23, minute=59, second=59)]),
-
-        # from day to day within month; ex: 10 15 Şubat 2017 tarihleri arasında
-        ("FROM_D_TO_DMY_REGEX", TYPE_DATESPAN,
-         re.compile(r"^([0-3]?[0-9])(?:{}|{}| )([0-3]?[0-9]) ({}) ({})(?: tarihleri)? arası(?:{})?$"
-                    .format(DATE_SEPARATORS, CONJUNCTIONS, MONTHS_EXPRESSION, YEAR_ONLY_EXPRESSION,
-                            CASE_SUFFIXES), re.UNICODE),
-         [date_creator(year='\\4', month_str='\\3', day='\\1', hour=0, minute=0, second=0),
-          date_creator(year='\\4', month_str='\\3', day='\\2', hour=23, minute=59, second=59)]),
-
-        # from day to day within month; ex: 10 15 Şubat tarihleri arasında
-        ("FROM_D_TO_DM_REGEX", TYPE_DATESPAN,
-         re.compile(r"^([0-3]?[0-9])(?:{}|{}| )([0-3]?[0-9]) ({})(?: tarihleri)? arası(?:{})?$"
-                    .format(DATE_SEPARATORS, CONJUNCTIONS, MONTHS_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month_str='\\3', day='\\1', hour=0, minute=0, second=0),
-          date_creator(month_str='\\3', day='\\2', hour=23, minute=59, second=59)]),
-
-        # DMY to DM; ex: 21 Mart 2017 ve 29 Mart arasında
-        # from day month year to day month year
-        ("FROM_DMY_TO_DM_REGEX", TYPE_DATESPAN,
-         re.compile(r"^([0-3]?[0-9]) ({}) ({})(?:{}|{})([0-3]?[0-9]) ({})(?: tarihleri)? arası(?:{})?$"
-                    .format(MONTHS_EXPRESSION, YEAR_ONLY_EXPRESSION, DATE_SEPARATORS, CONJUNCTIONS,
-                            MONTHS_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(year='\\3', month_str='\\2', day='\\1', hour=0, minute=0, second=0),
-          date_creator(year='\\3', month_str='\\5', day='\\4', hour=23, minute=59, second=59)]),
-
-        # DM to DMY; ex: 21 Mart ve 29 Mart 2017 arasında
-        # from day month year to day month year
-        ("FROM_DM_TO_DMY_REGEX", TYPE_DATESPAN,
-         re.compile(r"^([0-3]?[0-9]) ({})(?:{}|{})([0-3]?[0-9]) ({}) ({})(?: tarihleri)? arası(?:{})?$"
-                    .format(MONTHS_EXPRESSION, DATE_SEPARATORS, CONJUNCTIONS,
-                            MONTHS_EXPRESSION, YEAR_ONLY_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(year='\\5', month_str='\\2', day='\\1', hour=0, minute=0, second=0),
-          date_creator(year='\\5', month_str='\\4', day='\\3', hour=23, minute=59, second=59)]),
-
-        # first n months of the year; yılın ilk 3 ayı
-        ("FIST_N_NONTHS_THIS_YEAR_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:bu )?{}(?:{})? ilk (1?[0-9]) {}(?:{})?$"
-                    .format(YEAR_EXPRESSION, CASE_SUFFIXES, MONTH, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=1, day=1, hour=0, minute=0, second=0),
-          date_creator(month='\\1', day='last', hour=23, minute=59, second=59)]),
-
-        # last n months of the year yılın son 3 ayı
-        ("LAST_N_NONTHS_THIS_YEAR_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:bu )?{}(?:{})? son ([0-9]) {}(?:{})?$"
-                    .format(YEAR_EXPRESSION, CASE_SUFFIXES, MONTH, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=12, dmonth='-\\1', day=1, hour=0, minute=0, second=0),
-          date_creator(month=12, day='last', hour=23, minute=59, second=59)]),
-
-        # first week of month; ex: ocak ayının birinci haftası
-        ("FIRST_WEEK_OF_MONTH", TYPE_DATESPAN,
-         re.compile(r"^(?:({}) {}(?:{}) (?:ilk|birinci) {})$"
-                    .format(MONTHS_EXPRESSION, MONTH, CASE_SUFFIXES, WEEK_EXPRESSION), re.UNICODE),
-         [date_creator(month_str='\\1', day=1, hour=0, minute=0, second=0),
-          date_creator(month_str='\\1', day=7, hour=23, minute=59, second=59)]),
-
-        # only year ex: 2017
-        ("WHOLE_YEAR_REGEX", TYPE_DATESPAN,
-         YEAR_ONLY_REGEX,
-         [date_creator(year='\\1', month=1, day=1, hour=0, minute=0, second=0),
-          date_creator(year='\\1', month=12, day='last', hour=23, minute=59, second=59)]),
-
-        # last n years ex: geçen 4 yılda
-        ("LAST_N_YEARS_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:{} ({}) {}(?:{})?(?: {})?)$"
-                    .format(BEFORE_EXPRESSION, NATURAL_NUMBERS, YEAR_EXPRESSION, CASE_SUFFIXES, SPAN_IMPLYING),
-                    re.UNICODE),
-         [date_creator(dyear='-\\1', hour=0, minute=0, second=0), date_creator()]),
-
-        # last summer; ex: geçen yaz
-        ("LAST_SUMMER_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:{} yaz(?:{})?)$".format(BEFORE_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=6, day=1, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=8, day='last', hour=23, minute=59, second=59, round_year=True)]),
-
-        # this summer; ex: bu yaz
-        ("THIS_SUMMER_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:bu )?yaz(?:{})?)$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=6, day=1, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=8, day='last', hour=23, minute=59, second=59, round_year=True)]),
-
-        # last winter; ex: geçen kış
-        ("LAST_WINTER_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:{} kı[şs](?:{})?)$".format(BEFORE_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=12, day=1, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=2, day='last', hour=23, minute=59, second=59, round_year=True)]),
-
-        # this winter; ex: bu kış
-        ("THIS_WINTER_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:bu )?kı[şs](?:{})?)$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=12, day=1, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=2, day='last', hour=23, minute=59, second=59, round_year=True)]),
-
-        # last spirng; ex: geçen bahar
-        ("LAST_SPRING_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:{} bahar(?:{})?)$"
-                    .format(r"(?:(?:geçen(?:ki)?)|(?:önce(?:[sk]i)?)|(?:evvel(?:[sk]i)?)|(?:geçtiğimiz))",
-                            CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=3, day=1, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=5, day='last', hour=23, minute=59, second=59, round_year=True)]),
-
-        # this spring; ex: bu bahar
-        ("THIS_SPRING_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:bu )?(?:ilk ?)?bahar(?:{})?)$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=3, day=1, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=5, day='last', hour=23, minute=59, second=59, round_year=True)]),
-
-        # last autumn; ex: geçen sonbahar
-        ("LAST_FALL_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:{} son ?bahar(?:{})?)$".format(BEFORE_EXPRESSION, CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=9, day=1, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=11, day='last', hour=23, minute=59, second=59, round_year=True)]),
-
-        # this autumn; ex: bu sonbahar
-        ("THIS_FALL_REGEX", TYPE_DATESPAN,
-         re.compile(r"^(?:(?:bu )?son ?bahar(?:{})?)$".format(CASE_SUFFIXES), re.UNICODE),
-         [date_creator(month=9, day=1, hour=0, minute=0, second=0, round_year=True),
-          date_creator(month=11, day='last', hour=23, minute=59, second=59, round_year=True)]),
-
-        # ########### Date Period ##########
-
-        ("EVERY_DAY_OF_WEEK_REGEX", TYPE_PERIOD,
-         re.compile(r"^her (?:{} )?({})$".format(WEEK_EXPRESSION, DAYS_EXPRESSION), re.UNICODE),
-         "week{}1".format(SPAN_SEPARATOR)),
-
-        ("EVERY_WEEK_REGEX", TYPE_PERIOD,
-         re.compile(r"^her (?:{})$".format(WEEK_EXPRESSION), re.UNICODE),
-         "week{}monday".format(SPAN_SEPARATOR)),
-
-        ("EVERY_MONTH_REGEX", TYPE_PERIOD,
-         re.compile(r"^(?:(?:her )(?:{})|(?:aylık))$".format(MONTH), re.UNICODE),
-         "month{}monday".format(SPAN_SEPARATOR)),
-
-        ("EVERY_DAY_OF_MONTH_REGEX", TYPE_PERIOD,
-         re.compile(r"^her (?:{}) ([0-3]?[0-9]){}?$".format(MONTH, CASE_SUFFIXES), re.UNICODE),
-         "month{}1".format(SPAN_SEPARATOR)),
-
-        ("EVERY_MONTH_OF_YEAR_REGEX", TYPE_PERIOD,
-         re.compile(r"^her {} ({}) {}{}?$".format(YEAR_EXPRESSION, MONTHS_EXPRESSION,
-                                                  MONTH, CASE_SUFFIXES), re.UNICODE),
-         "year{}1".format(SPAN_SEPARATOR))
-    ]
+    # Rule file of the detector, see `rule_loader` for its format
+    RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "date_rules.json")
+
+    # Fragments that rule patterns can refer to, ex: {MONTHS_EXPRESSION}
+    RULE_FRAGMENTS = dict(
+        SPAN_IMPLYING=SPAN_IMPLYING, BEFORE_EXPRESSION=BEFORE_EXPRESSION, FIRST_EXPRESSION=FIRST_EXPRESSION,
+        LATER_EXPRESSION=LATER_EXPRESSION, MINUTE_EXPRESSION=MINUTE_EXPRESSION, YEAR_EXPRESSION=YEAR_EXPRESSION,
+        PM_EXPRESSION=PM_EXPRESSION, AM_EXPRESSION=AM_EXPRESSION, DAYS_EXPRESSION=DAYS_EXPRESSION,
+        MONTHS_EXPRESSION=MONTHS_EXPRESSION, MONTHS_ABBR_EXPRESSION=MONTHS_ABBR_EXPRESSION, MONTH=MONTH,
+        WEEK_EXPRESSION=WEEK_EXPRESSION, DATE_SEPARATORS=DATE_SEPARATORS, YEAR_ONLY_EXPRESSION=YEAR_ONLY_EXPRESSION,
+        CASE_SUFFIXES=CASE_SUFFIXES, GENITIVE_SUFFIXES=GENITIVE_SUFFIXES, NATURAL_NUMBERS=NATURAL_NUMBERS,
+        CONJUNCTIONS=CONJUNCTIONS, PRONOUN_SUFFIX=PRONOUN_SUFFIX, PLURALITY_SUFFIXES=PLURALITY_SUFFIXES,
+        POSSESSIVE_SUFFIXES=POSSESSIVE_SUFFIXES
+    )
+
+    # Separators the number detector splits tokens with
+    NUMBER_SEPARATORS_REGEX = lazy_regex(NumberDetector.SEPARATORS)
+
+    # Numbers written with digits only, `normalize_numbers` leaves them as they are
+    DIGIT_NUMBER_REGEX = lazy_regex(r"[0-9_, \-.\\/+=]+")
+
+    # How long a cached parse result stays valid
+    CACHE_ALWAYS = "always"
+    CACHE_DAY = "day"
+    CACHE_SECOND = "second"
+    CACHE_EXACT = "exact"
+
+    # Largest window evaluated once the time budget runs short, most rules span up to 4 tokens
+    SHORT_WINDOW = 4
+
+    # Holidays are tabled once for the years with official religious holiday dates, see `holidays`
+    HOLIDAY_CALENDAR = HolidayCalendar()
+
+    # Rule sets loaded by this process by the digest of their rule file, their holiday calendar and regex backend
+    _rule_sets = {}
+
+    def __init__(self, max_window=None, cache_size=10000, fallback=True, fallback_cache_size=10000, rules_path=None,
+                 instrument=False, rule_order=None, prefilter=True, max_tokens=None, max_length=None,
+                 regex_backend="re"):
+        """
+        :param max_window: (int) maximum number of tokens a lookup window can span, consecutive tokens
+        that merge into a single number count as one token. Defaults to the longest span any rule in
+        `regex_list` can match, see `rule_spans`.
+        :param cache_size: (int) number of `parse_date` results to keep, 0 disables the cache
+        :param fallback: (bool or int) whether expressions no rule matches are passed to dateparser, an
+        int passes only the expressions of up to that many tokens
+        :param fallback_cache_size: (int) number of dateparser results to keep, 0 disables the cache
+        :param rules_path: (string) rule file, defaults to `RULES_PATH`
+        :param instrument: (bool) whether rule, fallback and window statistics are collected, see `stats`.
+        Without it the detector runs no instrumentation code at all.
+        :param rule_order: (string or List(string)) order the rules are tried in, a file saved by `rule_order`
+        or a list of rule names, defaults to the order of the rule file. An order that changes which of two
+        overlapping rules comes first is refused, see `RuleSet.overlaps`.
+        :param prefilter: (bool) whether sentences without the literals the rules need are skipped, see `prefilter`
+        :param max_tokens: (int) number of tokens of a text `find_all` looks at, the rest is left out
+        :param max_length: (int) number of characters of a text `find_all` looks at, a token the limit splits is
+        left out
+        :param regex_backend: (string) engine the rules are matched with, one of "re", "regex" and "re2", see
+        `regex_backend`. Rules it can not match like the standard library stay on "re", see `RuleSet.incompatible`.
+        :raises RuleFileError: when the rule order was learned for another rule file or is not valid
+        :raises ImportError: when the module of the regex backend is not installed
+        """
+        self.rules = self.load_rules(rules_path, regex_backend)
+        if rule_order is not None:
+            if isinstance(rule_order, str):
+                order = load_order(rule_order, self.rules.rule_file.digest, self.rules.names())
+            else:
+                # A list carries no overlaps, they are found to keep the precedence of overlapping rules
+                order = list(rule_order)
+                check_order(self.rules.names(), order, self.rules.overlaps())
+            self.rules = self.rules.reordered(order)
+        self.regex_list = self.rules.regex_list
+
+        if max_window is None:
+            spans = list(self.rule_spans().values())
+            max_window = None if None in spans else max(spans)
+        self.max_window = max_window
+        # Constructor arguments, used to build the same detector in pool workers
+        self.options = dict(max_window=max_window, cache_size=cache_size, fallback=fallback,
+                            fallback_cache_size=fallback_cache_size, rules_path=rules_path, instrument=instrument,
+                            rule_order=rule_order, prefilter=prefilter, max_tokens=max_tokens,
+                            max_length=max_length, regex_backend=regex_backend)
+
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self.negative_hits = 0
+
+        if isinstance(fallback, bool):
+            self.fallback_tokens = None if fallback else 0
+        else:
+            self.fallback_tokens = fallback
+        self.fallback_cache = LRUCache(fallback_cache_size) if fallback_cache_size else None
+        self.prefilter = prefilter
+        self.max_tokens = max_tokens
+        self.max_length = max_length
+
+        backend = self.rules.backend
+        if backend is not None:
+            year_regex = type(self).YEAR_ONLY_REGEX
+            if not backend.check(year_regex.pattern, year_regex.flags):
+                self.YEAR_ONLY_REGEX = LazyRegex(year_regex.pattern, year_regex.flags, backend)
+
+        self.instrumentation = instrument_detector(self) if instrument else None
+
+    @classmethod
+    def load_rules(cls, path=None, regex_backend="re"):
+        """
+        Loads a rule file, rules of a file are compiled once per process and regex backend.
+        :param path: (string) rule file, defaults to `RULES_PATH`
+        :param regex_backend: (string) name of the engine the rules are matched with, see `regex_backend`
+        :return: (RuleSet)
+        :raises RuleFileError: when the file is not valid
+        """
+        rule_file = load_rule_file(path or cls.RULES_PATH, cls.RULE_FRAGMENTS,
+                                   {cls.TYPE_DATETIME: "datetime", cls.TYPE_DATESPAN: "date-span",
+                                    cls.TYPE_PERIOD: "date-period"},
+                                   DATE_CREATOR_PARAMETERS, holidays=cls.HOLIDAY_CALENDAR.names())
+        key = (rule_file.digest, cls.HOLIDAY_CALENDAR, regex_backend)
+        if key not in cls._rule_sets:
+            # The standard library is the default of the rules
+            backend = None if regex_backend == RegexBackend.name else get_backend(regex_backend)
+            cls._rule_sets[key] = RuleSet(rule_file, cls.SPAN_SEPARATOR, cls.HOLIDAY_CALENDAR, backend)
+        return cls._rule_sets[key]
+
+    def rule_spans(self):
+        """
+        Finds the maximum number of tokens of a window each rule can match, see `rule_analysis.window_tokens`.
+        :return: (dict) rule name to its span, None for rules that can match in windows of any length
+        """
+        return self.rules.spans
 
-    @staticmethod
-    def map_month_expr(month_expr):
-        month_expression_map = {
-            "ocak": re.compile(r"^(?:(([Oo]ca(k|(ğın)))|([Oo]ca)))$", re.UNICODE),
-            "şubat": re.compile(r"^(([Şş]ubat(ın)?)|([Şş]ub))$", re.UNICODE),
-            "mart": re.compile(r"^(([Mm]art(ın)?)|([Mm]ar))$", re.UNICODE),
-            "nisan": re.compile(r"^(([Nn]isan(ın)?)|([Nn]is))$", re.UNICODE),
-            "mayıs": re.compile(r"^(([Mm]ayıs(ın)?)|([Mm]ay))$", re.UNICODE),
-            "haziran": re.compile(r"^(([Hh]aziran(ın)?)|([Hh]az))$", re.UNICODE),
-            "temmuz": re.compile(r"^(([Tt]emmuz(un)?)|([Tt]em))$", re.UNICODE),
-            "ağustos": re.compile(r"^(([Aa]ğustos(un)?)|([Aa]ğu))$", re.UNICODE),
-            "eylül": re.compile(r"^(([Ee]ylül(ün)?)|([Ee]yl))$", re.UNICODE),
-            "ekim": re.compile(r"^(([Ee]kim(in)?)|([Ee]ki))$", re.UNICODE),
-            "kasım": re.compile(r"^(([Kk]asım(ın)?)|([Kk]as))$", re.UNICODE),
-            "aralık": re.compile(r"^(([Aa]ralı(k|ğın))|([Aa]ra))$", re.UNICODE)
-        }
-
-        for month in month_expression_map:
-            month_expr = re.sub(month_expression_map[month], month, month_expr)
+    def rule_matcher(self):
+        """
+        Single pass matcher over `regex_list`, built on first use.
+        :return: (RuleMatcher)
+        """
+        return self.rules.matcher()
+
+    def sentence_filter(self):
+        """
+        Prefilter that tells sentences without any date apart, see `utils.prefilter`.
+        :return: (TemporalPrefilter)
+        """
+        return self.rules.prefilter(self.MONTH_FORMS, self.number_detector.is_number)
+
+    # Month expressions and abbreviations, an expression that is one of them as a whole is mapped to the month
+    MONTH_PATTERNS = {
+        "ocak": r"^(?:(([Oo]ca(k|(ğın)))|([Oo]ca)))$",
+        "şubat": r"^(([Şş]ubat(ın)?)|([Şş]ub))$",
+        "mart": r"^(([Mm]art(ın)?)|([Mm]ar))$",
+        "nisan": r"^(([Nn]isan(ın)?)|([Nn]is))$",
+        "mayıs": r"^(([Mm]ayıs(ın)?)|([Mm]ay))$",
+        "haziran": r"^(([Hh]aziran(ın)?)|([Hh]az))$",
+        "temmuz": r"^(([Tt]emmuz(un)?)|([Tt]em))$",
+        "ağustos": r"^(([Aa]ğustos(un)?)|([Aa]ğu))$",
+        "eylül": r"^(([Ee]ylül(ün)?)|([Ee]yl))$",
+        "ekim": r"^(([Ee]kim(in)?)|([Ee]ki))$",
+        "kasım": r"^(([Kk]asım(ın)?)|([Kk]as))$",
+        "aralık": r"^(([Aa]ralı(k|ğın))|([Aa]ra))$"
+    }
+    MONTH_EXPRESSIONS = LazyAttribute(lambda cls: {month: re.compile(pattern, re.UNICODE)
+                                                   for month, pattern in cls.MONTH_PATTERNS.items()})
+
+    # Every form of `MONTH_PATTERNS` to its month, ex: 'Oca' -> 'ocak', built on first use
+    MONTH_FORMS = LazyAttribute(lambda cls: {form: month for month, pattern in cls.MONTH_PATTERNS.items()
+                                             for form in exact_strings(parse(pattern))})
+
+    @classmethod
+    def map_month_expr(cls, month_expr):
+        month = cls.MONTH_FORMS.get(month_expr)
+        if month is not None:
+            return month
+        # `$` also matches before a trailing new line
+        if month_expr.endswith('\n') and month_expr[:-1] in cls.MONTH_FORMS:
+            return cls.MONTH_FORMS[month_expr[:-1]] + '\n'
         return month_expr
 
-    def parse_date(self, input_expr):
+    def normalize_expr(self, input_expr):
+        """
+        Brings an expression to the form the rules expect, numbers are converted, the expression is lower
+        cased and month expressions are mapped to month names, ex: 'İki Oca' -> '2 ocak'
+        :param input_expr: (String)
+        :return: (String)
+        """
+        return self.map_month_expr(turkish_lower(self.normalize_numbers(input_expr)))
+
+    def parse_date(self, input_expr, reference_time=None):
         """
         Takes an input and return the corresponding date expression.
         Expects the whole input to be a date expression.
         :param input_expr: (String)
+        :param reference_time: (datetime) time relative expressions are resolved against, defaults to now
         :return: (datetime)
         """
-        # Convert literal numbers into numbers, ex: dört -> 4
-        # Regexes above need numerical numbers in order to work
+        return self.parse_normalized(self.normalize_expr(input_expr), input_expr.count(' ') + 1, reference_time)
+
+    def normalize_numbers(self, input_expr):
+        """
+        Convert literal numbers into numbers, ex: dört -> 4
+        Regexes of the rules need numerical numbers in order to work
+        :param input_expr: (String)
+        :return: (String)
+        """
         found_numbers = self.number_detector.find_all(input_expr)
         for i in range(len(found_numbers) - 1, -1, -1):
             if not re.sub(r"(?:[_, \-.\\/+=])", '', found_numbers[i]["text"]).isdigit():
                 num_back = input_expr[found_numbers[i]["end_index"]:]
                 _num = str(int(found_numbers[i]["value"]))
                 input_expr = input_expr[:found_numbers[i]["start_index"]] + _num + num_back
+        return input_expr
 
-        # Further preprocessing
-        input_expr = turkish_lower(input_expr)
-        input_expr = self.map_month_expr(input_expr)
+    def parse_normalized(self, input_expr, window_size, reference_time=None, fallback=True):
+        """
+        Same as `parse_date` for an expression that is already normalized, see `normalize_expr`.
+        Results are cached by the expression together with the day of the reference time, or the second
+        for results that depend on the time of day. Expressions that are not dates are cached as well.
+        :param input_expr: (String) normalized expression
+        :param window_size: (int) number of tokens of the expression before normalization
+        :param reference_time: (datetime) time relative expressions are resolved against, defaults to now
+        :param fallback: (bool) False leaves dateparser out regardless of the options of the detector
+        :return: (datetime)
+        """
+        now = reference_time if reference_time is not None else datetime.now()
+        allow_fallback = fallback and (self.fallback_tokens is None or window_size <= self.fallback_tokens)
+        if self.cache is None:
+            return self._parse_date(input_expr, allow_fallback, now)[0]
+
+        key = (input_expr, allow_fallback)
+        entry = self.cache.get(key, is_valid=lambda cached: cached[1] == self._cache_stamp(cached[0], now))
+        if entry is None:
+            value, validity = self._parse_date(input_expr, allow_fallback, now)
+            entry = (validity, self._cache_stamp(validity, now), value)
+            self.cache.put(key, entry)
+        elif entry[2] is None:
+            self.negative_hits += 1
+
+        value = entry[2]
+        # Spans and periods are mutable, callers get their own copy
+        if isinstance(value, (list, dict)):
+            value = value.copy()
+        return value
+
+    def _cache_stamp(self, validity, now):
+        if validity == self.CACHE_EXACT:
+            return now
+        elif validity == self.CACHE_SECOND:
+            return now.replace(microsecond=0)
+        elif validity == self.CACHE_DAY:
+            return now.date()
+        return None
+
+    def cache_info(self):
+        """
+        Statistics of the `parse_date` cache, negative hits are hits of expressions that are not dates.
+        :return: (ParseCacheInfo)
+        """
+        if self.cache is None:
+            return ParseCacheInfo(0, 0, 0, 0, 0)
+        return ParseCacheInfo(*self.cache.info(), self.negative_hits)
 
-        # Regex matching
-        for rule in self.regex_list:
-            rule_name, rule_type, rule_regex, date_func = rule
-
-            if re.search(rule_regex, input_expr) is not None:
-                if rule_type == self.TYPE_DATETIME:
-                    assert callable(date_func)
-                    return date_func(rule_regex, input_expr)
-
-                elif rule_type == self.TYPE_DATESPAN:
-                    assert isinstance(date_func, list) and len(date_func) == 2
-                    return list(map(lambda date_func_x: date_func_x(rule_regex, input_expr), date_func))
-
-                elif rule_type == self.TYPE_PERIOD:
-                    assert isinstance(date_func, str)
-                    period_key, period_value = date_func.split(self.SPAN_SEPARATOR)
-                    if period_value.isnumeric():
-                        period_value = re.match(rule_regex, input_expr).group(int(period_value))
-                    period_dict = {period_key: period_value}
-                    return period_dict
-
-        # Some expressions can confuse the parser
-        if ((not re.search(self.YEAR_ONLY_REGEX, input_expr)) and input_expr.isdigit()) or \
-                re.findall(r"(?:[+=$])", input_expr):
+    def cache_clear(self):
+        if self.cache is not None:
+            self.cache.clear()
+        self.negative_hits = 0
+
+    def stats(self):
+        """
+        Snapshot of the instrumentation counters, see `DetectorStats.snapshot`.
+        :return: (dict) None when the detector is not instrumented
+        """
+        if self.instrumentation is None:
             return None
+        return self.instrumentation.snapshot()
+
+    def stats_clear(self):
+        if self.instrumentation is not None:
+            self.instrumentation.clear()
+
+    def _parse_date(self, input_expr, allow_fallback, reference_time):
+        """
+        Parses a normalized expression without the cache.
+        :param input_expr: (String)
+        :param allow_fallback: (bool) whether dateparser is tried when no rule matches
+        :param reference_time: (datetime)
+        :return: (tuple) the date expression and how long it stays valid, one of the CACHE_* values
+        """
+        # Regex matching
+        found = self.rule_matcher().match(input_expr)
+        if found is not None:
+            (rule_name, rule_type, rule_regex, date_func), rule_match = found
+
+            if rule_type == self.TYPE_DATETIME:
+                assert callable(date_func)
+                validity = self.CACHE_SECOND if date_func.uses_clock else self.CACHE_DAY
+                return date_func(rule_regex, input_expr, reference_time, rule_match), validity
+
+            elif rule_type == self.TYPE_DATESPAN:
+                assert isinstance(date_func, list) and len(date_func) == 2
+                validity = self.CACHE_SECOND if any(func.uses_clock for func in date_func) else self.CACHE_DAY
+                return [func(rule_regex, input_expr, reference_time, rule_match) for func in date_func], validity
+
+            elif rule_type == self.TYPE_PERIOD:
+                assert isinstance(date_func, str)
+                period_key, period_value = date_func.split(self.SPAN_SEPARATOR)
+                if period_value.isnumeric():
+                    period_value = rule_match.group(int(period_value))
+                period_dict = {period_key: period_value}
+                return period_dict, self.CACHE_ALWAYS
+
         # If none of the rules above match get help
-        return dateparser.parse(input_expr, languages=[self.lan])
+        if not allow_fallback or not self.fallback_candidate(input_expr):
+            return None, self.CACHE_ALWAYS
+        parsed = self.fallback_parse(input_expr, reference_time)
+        return parsed, self.CACHE_EXACT if parsed is not None else self.CACHE_ALWAYS
+
+    def fallback_candidate(self, input_expr):
+        """
+        Whether an expression no rule matches can be passed to dateparser, some expressions confuse it.
+        :param input_expr: (String) normalized expression
+        :return: (bool)
+        """
+        return not (((not self.YEAR_ONLY_REGEX.search(input_expr)) and input_expr.isdigit()) or
+                    re.findall(r"(?:[+=$])", input_expr))
+
+    def fallback_parse(self, input_expr, reference_time):
+        """
+        Parse an expression with dateparser. Expressions it can not parse are remembered regardless of the
+        reference time, parsed dates are only reused for the same reference time.
+        :param input_expr: (String) preprocessed expression
+        :param reference_time: (datetime)
+        :return: (datetime)
+        """
+        if self.fallback_cache is not None:
+            entry = self.fallback_cache.get(input_expr, is_valid=lambda cached: cached[1] is None or
+                                            cached[0] == reference_time)
+            if entry is not None:
+                return entry[1]
+
+        parsed = self.dateparser_parse(input_expr, reference_time)
+        if self.fallback_cache is not None:
+            self.fallback_cache.put(input_expr, (reference_time, parsed))
+        return parsed
+
+    def dateparser_parse(self, input_expr, reference_time):
+        """
+        Parse an expression with dateparser, without the fallback cache, see `fallback_parse`.
+        :param input_expr: (String) preprocessed expression
+        :param reference_time: (datetime)
+        :return: (datetime)
+        """
+        return load_dateparser().parse(input_expr, languages=[self.lan], settings={'RELATIVE_BASE': reference_time})
 
     # internal merge function
     @staticmethod
     def merge_tokens(tokens):
         return ' '.join(tokens)
 
-    def date_tagger(self, input_sentence):
+    def window_limits(self, tokens):
+        """
+        Finds the size of the longest window starting at each token.
+        Textual numbers are merged into a single token before rule matching, ex: 'iki yüz' -> '200', so
+        a token and the next one that can be a part of the same number are counted as one token. Runs of
+        digits are not merged, ex: '7 7', they count a token each. A number spelled with more tokens than
+        `max_window` is no part of any rule match, so a run counts as one token for up to that many tokens.
+        :param tokens: (List(string)) sentence tokens
+        :return: (List(int)) maximum window size for each start token
+        """
+        if self.max_window is None:
+            return [len(tokens) - i for i in range(len(tokens))]
+
+        atoms = [self.NUMBER_SEPARATORS_REGEX.split(token) for token in tokens]
+        # links[i] is set when token i and i + 1 can be a part of the same number
+        links = [self.number_detector.is_number(atoms[i][-1]) and self.number_detector.is_number(atoms[i + 1][0])
+                 for i in range(len(tokens) - 1)]
+        # A run of linked tokens is only merged when it has a number word, see `normalize_numbers`
+        start = 0
+        for end in range(len(tokens)):
+            if end == len(tokens) - 1 or not links[end]:
+                if all(self.DIGIT_NUMBER_REGEX.fullmatch(token) for token in tokens[start:end + 1]):
+                    links[start:end] = [False] * (end - start)
+                start = end + 1
+
+        limits = []
+        for i in range(len(tokens)):
+            end, size, run = i, 0, 0  # window tokens[i:end] spans `size` tokens, the last `run` of them one number
+            while end < len(tokens):
+                linked = end > i and links[end - 1] and run < self.max_window
+                step = 0 if linked else 1
+                if size + step > self.max_window:
+                    break
+                size += step
+                run = run + 1 if end > i and links[end - 1] else 1
+                end += 1
+            limits.append(end - i)
+        return limits
+
+    def window_normalizer(self, tokens):
+        """
+        Normalizes a sentence once for all of its windows, see `normalize_expr`. Tokens are lower cased
+        once and windows are joined from them. Consecutive number tokens are detected as a single number,
+        so each window converts the part of such a run that it contains and the conversions are shared
+        between windows. Windows with empty tokens or tokens that contain number separators are normalized
+        on their own.
+        :param tokens: (List(string)) sentence tokens
+        :return: (callable) normalized expression of the window tokens[i:j], ex: (0, 3) -> '250 gün'
+        """
+        # irregular[i] is the number of irregular tokens in tokens[:i]
+        irregular = [0]
+        for token in tokens:
+            irregular.append(irregular[-1] + int(not token or self.NUMBER_SEPARATORS_REGEX.search(token) is not None))
+
+        lowered = [turkish_lower(token) for token in tokens]
+        is_number = [self.number_detector.is_number(token) for token in tokens]
+        # numbers[i] is the number of number tokens in tokens[:i]
+        numbers = [0]
+        for token_is_number in is_number:
+            numbers.append(numbers[-1] + token_is_number)
+        # run_ends[i] is the end of the run of number tokens starting at token i
+        run_ends = [0] * len(tokens)
+        for i in range(len(tokens) - 1, -1, -1):
+            run_ends[i] = run_ends[i + 1] if i + 1 < len(tokens) and is_number[i + 1] else i + 1
+        runs = {}
+
+        def normalize(start, end):
+            if irregular[end] != irregular[start]:
+                return self.normalize_expr(self.merge_tokens(tokens[start:end]))
+            if numbers[end] == numbers[start]:
+                return self.map_month_expr(self.merge_tokens(lowered[start:end]))
+
+            parts = []
+            i = start
+            while i < end:
+                if not is_number[i]:
+                    parts.append(lowered[i])
+                    i += 1
+                    continue
+
+                run_end = min(run_ends[i], end)
+                run = runs.get((i, run_end))
+                if run is None:
+                    run = turkish_lower(self.normalize_numbers(self.merge_tokens(tokens[i:run_end])))
+                    runs[(i, run_end)] = run
+                parts.append(run)
+                i = run_end
+            return self.map_month_expr(self.merge_tokens(parts))
+
+        return normalize
+
+    def date_tagger(self, input_sentence, reference_time=None, spans=None, budget=None):
         """
         Tokenizes the given input and tags date expressions. This is done by sliding a lookup window.
-        Windows have sizes 1 to number of tokens.
+        Windows have sizes `max_window` down to 1, so the longest matching window tags a token first.
+        Tagged tokens are covered, shorter windows only tag the uncovered tokens they contain and
+        windows made up of covered tokens only are never evaluated.
         :param input_sentence: (string) input sentence
+        :param reference_time: (datetime) time relative expressions are resolved against, defaults to now
+        :param spans: (List(tuple)) tokens of the sentence, see `tokenize`, the sentence is tokenized when not given
+        :param budget: (Budget) time budget, windows are evaluated without dateparser, then only windows of up to
+        `SHORT_WINDOW` tokens are, and then none as it runs out. Its `truncated` is set when a window is skipped or
+        would have been passed to dateparser.
         :return:  (List(datetime)) sentence tokens that is either a datetime, datespan or None
         """
-        tokens = input_sentence.split(' ')
-        tags = list(map(lambda token: self.parse_date(token), tokens))
-
-        for window in range(2, len(tokens) + 1):
-            for i in range(0, len(tokens) - window + 1):
-                window_expr = self.merge_tokens(tokens[i:i + window])
-                window_val = self.parse_date(window_expr)
+        if reference_time is None:
+            # Every window is resolved against the same time
+            reference_time = datetime.now()
+        if spans is None:
+            spans = tokenize(input_sentence)
+
+        tokens = [token for token, _, _ in spans]
+        tags = [None] * len(tokens)
+        if self.prefilter and not self.sentence_filter().may_match(tokens, self.fallback_tokens != 0):
+            return tags
+        covered = [False] * len(tokens)
+        limits = self.window_limits(tokens)
+        normalize = self.window_normalizer(tokens)
+
+        fallback = True
+        for window in range(max(limits, default=0), 0, -1):
+            # Among windows of the same size the rightmost match wins
+            for i in range(len(tokens) - window, -1, -1):
+                if window > limits[i] or False not in covered[i:i + window]:
+                    continue
+
+                if budget is not None:
+                    stage = budget.stage()
+                    if stage == Budget.EXHAUSTED:
+                        budget.truncated = True
+                        return tags
+                    if stage == Budget.SHORT_WINDOWS and window > self.SHORT_WINDOW:
+                        budget.truncated = True
+                        break
+                    if stage != Budget.FULL:
+                        fallback = False
+
+                window_expr = normalize(i, i + window)
+                window_val = self.parse_normalized(window_expr, window, reference_time, fallback)
+                if window_val is None and not fallback and \
+                        (self.fallback_tokens is None or window <= self.fallback_tokens) and \
+                        self.fallback_candidate(window_expr):
+                    # The window would have been passed to dateparser
+                    budget.truncated = True
 
                 if window_val is not None:
-                    tags[i:i + window] = [window_val] * window
+                    for j in range(i, i + window):
+                        if not covered[j]:
+                            tags[j] = window_val
+                            covered[j] = True
 
         return tags
 
-    def find_all(self, text):
+    def guarded_tokens(self, text):
         """
-        Create tag construct from tagged tokes
-        index_offset = previous_token_lengths + white_space(#tokens -1)
-        :param text: (string) provided input sentence
-        :return: (tag construct)
+        Tokenizes the part of a text within `max_length` and `max_tokens`.
+        :param text: (string)
+        :return: (tuple) (List(tuple)) tokens, see `tokenize`, (bool) whether a part of the text was left out
         """
-        tokens = text.split(' ')
-        text_len = sum(list(map(lambda x: len(x), tokens))) + len(tokens) - 1
-        tags = self.date_tagger(text)
+        cut = False
+        if self.max_length is not None and len(text) > self.max_length:
+            spans = tokenize(text[:self.max_length])
+            # A token that goes on after the limit is left out
+            if spans and spans[-1][2] == self.max_length and not text[self.max_length].isspace():
+                spans.pop()
+            cut = True
+        else:
+            spans = tokenize(text)
+        if self.max_tokens is not None and len(spans) > self.max_tokens:
+            spans = spans[:self.max_tokens]
+            cut = True
+        return spans, cut
 
-        # Assert possible problems that can arise from tokenization
-        assert text_len == len(text), "Characters lost during tokenization"
-        assert len(tokens) == len(tags), "Number of tags and tokens do not match"
+    def find_all(self, text, reference_time=None, budget=None):
+        """
+        Create tag construct from tagged tokens, consecutive tokens with the same tag form an expression.
+        Indices are character offsets in the text, the end index is the offset of the last character.
+        :param text: (string) provided input sentence
+        :param reference_time: (datetime) time relative expressions are resolved against, defaults to now
+        :param budget: (float or Budget) seconds the call can take, the detector degrades as they run out, see
+        `date_tagger`
+        :return: (TagConstruct) `truncated` is set when the budget or `max_tokens`, `max_length` cut the search short
+        """
+        if budget is not None and not isinstance(budget, Budget):
+            budget = Budget(budget)
+        spans, cut = self.guarded_tokens(text)
+        tags = self.date_tagger(text, reference_time, spans, budget)
 
-        res = []
+        res = TagConstruct(truncated=cut or (budget is not None and budget.truncated))
         for i in range(len(tags)):
             tag = tags[i]
 
             if tag is not None:
+                _, start, end = spans[i]
                 if (i > 0) and (tags[i - 1] == tag):
-                    res[-1]["end_index"] += len(tokens[i]) + 1
-                    res[-1]["text"] = self.merge_tokens([res[-1]["text"], tokens[i]])
+                    res[-1]["end_index"] = end - 1
+                    res[-1]["text"] = text[res[-1]["start_index"]:end]
                 else:
-                    tag_offset = sum(list(map(lambda x: len(x), tokens[:i]))) + len(tokens[:i + 1]) - 1
-
                     values = {
-                        'start_index': tag_offset,
-                        'end_index': tag_offset + len(tokens[i]) - 1,
-                        'text': tokens[i]
+                        'start_index': start,
+                        'end_index': end - 1,
+                        'text': text[start:end]
                     }
 
                     if isinstance(tag, list):
@@ -770,3 +939,43 @@ class DateDetector(object):
 
                     res.append(values)
         return res
+
+    def find_all_many(self, texts, workers=None, chunksize=64, reference_time=None):
+        """
+        Runs `find_all` on many texts with a pool of worker processes, results are in the order of the texts.
+        Each worker builds its own detector once, with the options of this detector.
+        :param texts: (iterable(string)) input sentences, consumed lazily and only a few chunks ahead
+        :param workers: (int) number of worker processes, defaults to the number of CPUs, 1 runs in this process
+        :param chunksize: (int) number of texts sent to a worker at once
+        :param reference_time: (datetime) time all texts are resolved against, defaults to now
+        :return: (generator(tag construct)) `find_all` result of each text
+        """
+        if reference_time is None:
+            reference_time = datetime.now()
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers <= 1:
+            for text in texts:
+                yield self.find_all(text, reference_time)
+            return
+
+        # Imported here, multiprocessing is slow to import and most callers do not need it
+        from multiprocessing import Pool
+        with Pool(workers, initializer=_init_worker, initargs=(type(self), self.options, reference_time)) as pool:
+            yield from imap_bounded(pool, _worker_find_all, texts, chunksize)
+
+
+# Detector and reference time of a pool worker process, see `DateDetector.find_all_many`
+_worker_detector = None
+_worker_reference_time = None
+
+
+def _init_worker(detector_class, options, reference_time):
+    global _worker_detector, _worker_reference_time
+    _worker_detector = detector_class(**options)
+    _worker_reference_time = reference_time
+
+
+def _worker_find_all(text):
+    return _worker_detector.find_all(text, _worker_reference_time)
@@ -0,0 +1,155 @@
+"""
+Holiday calendar, the days of fixed and religious holidays by Gregorian year.
+
+Religious holidays follow the Hijri calendar and move about 11 days earlier every Gregorian year.
+Turkey's dates are calculated by the Presidency of Religious Affairs (Diyanet) from the astronomical
+new moon and differ from the tabular Hijri calendar, the arithmetic calendar of 30 year cycles with 11
+leap years, by up to two days. The official first days are kept in `OFFICIAL_FIRST_DAYS` for the years
+they were checked for, `OFFICIAL_YEARS`, other years are estimated with the tabular calendar. The days
+of every holiday are computed once for a range of years and looked up by holiday name and year, ex:
+    HolidayCalendar(2010, 2026).spans("KURBAN_BAYRAMI", 2024) -> ((date(2024, 6, 16), date(2024, 6, 19)),)
+"""
+from collections import namedtuple
+from datetime import date, timedelta
+
+GREGORIAN = "gregorian"
+HIJRI = "hijri"
+
+# First day of a holiday in its calendar and its number of days
+Holiday = namedtuple("Holiday", ["calendar", "month", "day", "days"])
+
+HOLIDAYS = {
+    "NEW_YEARS": Holiday(GREGORIAN, 1, 1, 1),
+    "VALENTINES_DAY": Holiday(GREGORIAN, 2, 14, 1),
+    "COCUK_BAYRAMI": Holiday(GREGORIAN, 4, 23, 1),
+    "LABOUR_DAY": Holiday(GREGORIAN, 5, 1, 1),
+    "CUMHURIYET_BAYRAMI": Holiday(GREGORIAN, 10, 29, 1),
+    # 1 Şevval
+    "RAMAZAN_BAYRAMI": Holiday(HIJRI, 10, 1, 3),
+    # 10 Zilhicce
+    "KURBAN_BAYRAMI": Holiday(HIJRI, 12, 10, 4),
+}
+
+# First and last years with official dates of the Hijri holidays
+OFFICIAL_YEARS = (2010, 2026)
+
+# First days of the Hijri holidays as announced by Diyanet
+OFFICIAL_FIRST_DAYS = {
+    "RAMAZAN_BAYRAMI": (
+        date(2010, 9, 9), date(2011, 8, 30), date(2012, 8, 19), date(2013, 8, 8), date(2014, 7, 28),
+        date(2015, 7, 17), date(2016, 7, 5), date(2017, 6, 25), date(2018, 6, 15), date(2019, 6, 4),
+        date(2020, 5, 24), date(2021, 5, 13), date(2022, 5, 2), date(2023, 4, 21), date(2024, 4, 10),
+        date(2025, 3, 30), date(2026, 3, 20),
+    ),
+    "KURBAN_BAYRAMI": (
+        date(2010, 11, 16), date(2011, 11, 6), date(2012, 10, 25), date(2013, 10, 15), date(2014, 10, 4),
+        date(2015, 9, 24), date(2016, 9, 12), date(2017, 9, 1), date(2018, 8, 21), date(2019, 8, 11),
+        date(2020, 7, 31), date(2021, 7, 20), date(2022, 7, 9), date(2023, 6, 28), date(2024, 6, 16),
+        date(2025, 6, 6), date(2026, 5, 27),
+    ),
+}
+
+# Julian day number of 1 Muharram 1, 16 July 622
+HIJRI_EPOCH = 1948440
+# Julian day number of `date.fromordinal(0)`
+ORDINAL_EPOCH = 1721425
+
+
+def hijri_to_gregorian(year, month, day):
+    """
+    Converts a date of the tabular Hijri calendar, ex: (1445, 10, 1) -> date(2024, 4, 10)
+    :param year: (int) Hijri year
+    :param month: (int) 1 to 12, months alternate between 30 and 29 days, the 12th has 30 in leap years
+    :param day: (int)
+    :return: (date)
+    """
+    julian_day = (day + (59 * (month - 1) + 1) // 2 + (year - 1) * 354 + (3 + 11 * year) // 30 +
+                  HIJRI_EPOCH - 1)
+    return date.fromordinal(julian_day - ORDINAL_EPOCH)
+
+
+def hijri_years(year):
+    """
+    :param year: (int) Gregorian year
+    :return: (range) Hijri years that overlap with it
+    """
+    first = (year - 622) * 33 // 32 - 1
+    return range(first, first + 4)
+
+
+def holiday_spans(holiday, year, first_days=None):
+    """
+    Computes the days of a holiday in a Gregorian year.
+    :param holiday: (Holiday)
+    :param year: (int) Gregorian year
+    :param first_days: (tuple) official first days of the holiday, the tabular calendar is used for a
+    Hijri holiday without one in the year
+    :return: (tuple) first and last days of each occurrence starting in the year, in order, a Hijri
+    holiday can start twice in a year
+    """
+    starts = [first_day for first_day in first_days or () if first_day.year == year]
+    if not starts and holiday.calendar == GREGORIAN:
+        starts = [date(year, holiday.month, holiday.day)]
+    elif not starts:
+        starts = [start for start in (hijri_to_gregorian(hijri_year, holiday.month, holiday.day)
+                                      for hijri_year in hijri_years(year)) if start.year == year]
+    return tuple((start, start + timedelta(days=holiday.days - 1)) for start in starts)
+
+
+class HolidayCalendar(object):
+    """
+    Days of holidays for a range of Gregorian years, computed on first use. The default range is the one
+    with official dates for every holiday.
+    """
+
+    def __init__(self, first_year=OFFICIAL_YEARS[0], last_year=OFFICIAL_YEARS[1], holidays=None, first_days=None):
+        """
+        :param first_year: (int) first Gregorian year of the table
+        :param last_year: (int) last Gregorian year of the table, years out of the range are computed on each lookup
+        :param holidays: (dict) holiday name to its `Holiday`, defaults to `HOLIDAYS`
+        :param first_days: (dict) holiday name to its official first days, defaults to `OFFICIAL_FIRST_DAYS`
+        """
+        self.first_year = first_year
+        self.last_year = last_year
+        self.holidays = HOLIDAYS if holidays is None else holidays
+        self.first_days = OFFICIAL_FIRST_DAYS if first_days is None else first_days
+        self._table = None
+
+    def names(self):
+        return sorted(self.holidays)
+
+    def table(self):
+        """
+        :return: (dict) (holiday name, year) to the spans of the holiday in the year, see `holiday_spans`
+        """
+        if self._table is None:
+            self._table = {(name, year): holiday_spans(holiday, year, self.first_days.get(name))
+                           for name, holiday in self.holidays.items()
+                           for year in range(self.first_year, self.last_year + 1)}
+        return self._table
+
+    def spans(self, name, year):
+        """
+        :param name: (string) holiday name, ex: 'RAMAZAN_BAYRAMI'
+        :param year: (int) Gregorian year
+        :return: (tuple) first and last days of the occurrences of the holiday starting in the year
+        :raises KeyError: for unknown holidays
+        """
+        spans = self.table().get((name, year))
+        if spans is None:
+            spans = holiday_spans(self.holidays[name], year, self.first_days.get(name))
+        return spans
+
+    def latest(self, name, year, month):
+        """
+        The last occurrence of a holiday starting in or before a month, ex: in March the last Kurban
+        Bayramı is the one of the previous year.
+        :param name: (string) holiday name
+        :param year: (int) Gregorian year
+        :param month: (int) month of the year
+        :return: (tuple) first and last days of the occurrence
+        """
+        for span in reversed(self.spans(name, year)):
+            if span[0].month <= month:
+                return span
+        return self.spans(name, year - 1)[-1]
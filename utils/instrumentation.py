@@ -0,0 +1,145 @@
+"""
+Optional instrumentation of `DateDetector`, enabled with `DateDetector(instrument=True)`.
+
+The instrumented detector counts the attempts, hits and time of each rule, the calls and time of the
+dateparser fallback and the windows evaluated for each sentence. Instrumentation replaces methods of
+the detector instance when it is built, a detector without it runs the plain methods.
+"""
+from time import perf_counter
+
+
+class DetectorStats(object):
+    """
+    Counters of an instrumented detector, see `snapshot` for their meaning.
+    """
+
+    def __init__(self, rule_names):
+        """
+        :param rule_names: (List(string)) names of the rules in rule order
+        """
+        self.rule_names = rule_names
+        self.clear()
+
+    def clear(self):
+        # Rule index to [attempts, hits, seconds of hits, seconds of rejections]
+        self.rules = [[0, 0, 0.0, 0.0] for _ in self.rule_names]
+        self.matches = 0
+        self.candidates = 0
+        self.parses = 0
+        self.fallback_calls = 0
+        self.fallback_parsed = 0
+        self.fallback_seconds = 0.0
+        self.sentences = 0
+        self.windows = 0
+        self.max_windows = 0
+        # Power of two bucket of the windows evaluated for a sentence to the number of such sentences
+        self.window_counts = {}
+
+    def snapshot(self):
+        """
+        :return: (dict) a copy of the counters, made of plain values that can be serialized as JSON:
+            rules: rule name to its attempts, hits, seconds spent and seconds spent rejecting inputs,
+                rules are only attempted on inputs that contain their trigger literals, see `RuleMatcher`
+            matches: inputs matched against the rules, candidates: rules attempted over all of them
+            parses: expressions parsed, including the ones answered by the cache
+            fallback: calls of dateparser, the ones that found a date and their seconds, expressions answered
+                by the fallback cache are not counted
+            sentences: sentences tagged, windows: windows evaluated over all of them, max_windows: most
+                windows of a sentence and windows_per_sentence: histogram of the windows of a sentence,
+                the upper bound of a power of two bucket to the number of sentences in it
+        """
+        return {
+            "rules": {name: {"attempts": attempts, "hits": hits, "seconds": hit_seconds + reject_seconds,
+                             "reject_seconds": reject_seconds}
+                      for name, (attempts, hits, hit_seconds, reject_seconds) in zip(self.rule_names, self.rules)},
+            "matches": self.matches,
+            "candidates": self.candidates,
+            "parses": self.parses,
+            "fallback": {"calls": self.fallback_calls, "parsed": self.fallback_parsed,
+                         "seconds": self.fallback_seconds},
+            "sentences": self.sentences,
+            "windows": self.windows,
+            "max_windows": self.max_windows,
+            "windows_per_sentence": dict(sorted(self.window_counts.items())),
+        }
+
+
+class InstrumentedMatcher(object):
+    """
+    Matches like `RuleMatcher.match`, trying the candidate rules one by one to time each of them.
+    """
+
+    def __init__(self, rule_set, stats):
+        """
+        :param rule_set: (RuleSet) rules of the detector, their matcher is built on first use
+        :param stats: (DetectorStats)
+        """
+        self.rule_set = rule_set
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.rule_set.matcher(), name)
+
+    def match(self, input_expr):
+        matcher = self.rule_set.matcher()
+        indices = matcher.candidates(input_expr)
+        self.stats.matches += 1
+        self.stats.candidates += len(indices)
+
+        for index in indices:
+            counters = self.stats.rules[index]
+            # Looked up before the timer, a rule is compiled on first use
+            search = matcher.rules[index][2].search
+            start = perf_counter()
+            rule_match = search(input_expr)
+            elapsed = perf_counter() - start
+            counters[0] += 1
+            if rule_match is not None:
+                counters[1] += 1
+                counters[2] += elapsed
+                return matcher.rules[index], rule_match
+            counters[3] += elapsed
+        return None
+
+
+def instrument(detector):
+    """
+    Replaces the rule matching, parsing, fallback and tagging methods of a detector with counting ones.
+    :param detector: (DateDetector)
+    :return: (DetectorStats) counters of the detector
+    """
+    stats = DetectorStats([rule[0] for rule in detector.regex_list])
+    matcher = InstrumentedMatcher(detector.rules, stats)
+    parse_normalized = detector.parse_normalized
+    dateparser_parse = detector.dateparser_parse
+    date_tagger = detector.date_tagger
+
+    def counted_parse_normalized(input_expr, window_size, reference_time=None, fallback=True):
+        stats.parses += 1
+        return parse_normalized(input_expr, window_size, reference_time, fallback)
+
+    # Below the fallback cache, only the calls that reach dateparser are counted
+    def timed_dateparser_parse(input_expr, reference_time):
+        start = perf_counter()
+        parsed = dateparser_parse(input_expr, reference_time)
+        stats.fallback_seconds += perf_counter() - start
+        stats.fallback_calls += 1
+        stats.fallback_parsed += parsed is not None
+        return parsed
+
+    def counted_date_tagger(input_sentence, reference_time=None, spans=None, budget=None):
+        parses = stats.parses
+        tags = date_tagger(input_sentence, reference_time, spans, budget)
+        windows = stats.parses - parses
+        stats.sentences += 1
+        stats.windows += windows
+        stats.max_windows = max(stats.max_windows, windows)
+        bucket = 1 << max(windows - 1, 0).bit_length()
+        stats.window_counts[bucket] = stats.window_counts.get(bucket, 0) + 1
+        return tags
+
+    detector.rule_matcher = lambda: matcher
+    detector.parse_normalized = counted_parse_normalized
+    detector.dateparser_parse = timed_dateparser_parse
+    detector.date_tagger = counted_date_tagger
+    return stats
@@ -0,0 +1,84 @@
+import re
+
+# Attributes of a compiled regex that `LazyRegex` copies once it is compiled
+REGEX_ATTRIBUTES = ("search", "match", "fullmatch", "sub", "subn", "split", "findall", "finditer", "scanner",
+                    "groups", "groupindex", "flags")
+
+
+class LazyAttribute(object):
+    """
+    A class attribute that is computed on first access and then stored on the class in its place, ex:
+        NUMBER_REGEX = LazyAttribute(lambda cls: re.compile(ALL_NUMBERS, re.IGNORECASE))
+    """
+
+    def __init__(self, factory):
+        """
+        :param factory: (callable) takes the class the attribute is accessed on and returns the value
+        """
+        self.factory = factory
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        value = self.factory(owner)
+        setattr(owner, self.name, value)
+        return value
+
+
+def lazy_regex(pattern, flags=0):
+    """
+    A class attribute that is compiled on first access, see `LazyAttribute`.
+    """
+    return LazyAttribute(lambda cls: re.compile(pattern, flags))
+
+
+class LazyRegex(object):
+    """
+    A regex that is compiled the first time it is used. It has the pattern and flags of the regex before
+    that, so it can be analysed without compiling it, see `rule_analysis`. Once compiled, the methods of
+    the compiled regex are used directly. A regex backend compiles it with another engine, see
+    `regex_backend`, its flags stay the ones of the standard library.
+    """
+
+    def __init__(self, pattern, flags=0, backend=None):
+        """
+        :param pattern: (string)
+        :param flags: (int) flags of the standard library
+        :param backend: (RegexBackend) engine the regex is compiled with, the standard library by default
+        """
+        self.pattern = pattern
+        self.flags = flags
+        self.backend = backend
+        self.regex = None
+
+    def compile(self):
+        """
+        Compiles the regex if it is not compiled yet.
+        :return: (re.Pattern) or the compiled regex of the backend
+        """
+        if self.regex is None:
+            if self.backend is None:
+                self.regex = re.compile(self.pattern, self.flags)
+            else:
+                self.regex = self.backend.compile(self.pattern, self.flags)
+            for name in REGEX_ATTRIBUTES:
+                # Not every engine has them all, ex: RE2 has no scanner, nor the flags of the standard library
+                if hasattr(self.regex, name) and (name != "flags" or self.backend is None):
+                    setattr(self, name, getattr(self.regex, name))
+        return self.regex
+
+    def __getattr__(self, name):
+        # Only called for attributes that are not set, the regex is compiled on first use
+        if name.startswith("__") or name in ("pattern", "flags", "backend", "regex"):
+            raise AttributeError(name)
+        return getattr(self.compile(), name)
+
+    def __reduce__(self):
+        return LazyRegex, (self.pattern, self.flags, self.backend)
+
+    def __repr__(self):
+        if self.backend is None:
+            return "LazyRegex({!r}, {})".format(self.pattern, self.flags)
+        return "LazyRegex({!r}, {}, {!r})".format(self.pattern, self.flags, self.backend)
@@ -2,21 +2,33 @@ import math
 import re
 
 from utils.common_regexes import (ALL_NUMBERS, INTEGER_NUMBERS)
+from utils.lazy import LazyAttribute, lazy_regex
+from utils.number_scanner import NumberScanner
 from utils.pre_processing import turkish_lower
 
 
 class NumberDetector(object):
     SEPARATORS = r"[ ;:]"
 
-    NUMBER_SEARCH_REGEX = re.compile(r'(^|{}+)({}(?: {})*)(?:{}+|$)'
+    # Regexes are compiled on first use, numbers are found with `SCANNER`, which finds the same spans in
+    # linear time, the regexes backtrack exponentially on texts like '1111111111111111x'
+    NUMBER_SEARCH_REGEX = lazy_regex(r'(^|{}+)({}(?: {})*)(?:{}+|$)'
                                      .format(SEPARATORS, ALL_NUMBERS, ALL_NUMBERS, SEPARATORS), re.IGNORECASE)
 
-    INT_NUMBERS_REGEX = re.compile(INTEGER_NUMBERS)
+    NUMBER_REGEX = lazy_regex(ALL_NUMBERS, re.IGNORECASE)
+
+    INT_NUMBERS_REGEX = lazy_regex(INTEGER_NUMBERS)
 
     TEXT_NUMBER_MAP = {'sıfır': 0, 'bir': 1, 'iki': 2, 'üç': 3, 'dört': 4, 'beş': 5, 'altı': 6, 'yedi': 7, 'sekiz': 8,
                        'dokuz': 9, 'on': 10, 'yirmi': 20, 'otuz': 30, 'kırk': 40, 'elli': 50, 'altmış': 60,
                        'yetmiş': 70, 'seksen': 80, 'doksan': 90, 'yüz': 100, 'bin': 1000, 'milyon': 1000000,
-                       'milyar': 1000000000, 'trilyon': 1000000000000, 'katrilyon': 1e15}
+                       'milyar': 1000000000, 'trilyon': 1000000000000, 'katrilyon': 1000000000000000}
+
+    # Prefixes of the number words that a pending token can still grow into, a leading minus can start a digit run
+    NUMBER_WORD_PREFIXES = {word[:i] for word in TEXT_NUMBER_MAP for i in range(1, len(word))} | {'-'}
+
+    # Separators are the characters of `SEPARATORS`
+    SCANNER = LazyAttribute(lambda cls: NumberScanner(cls.TEXT_NUMBER_MAP, " ;:"))
 
     @staticmethod
     def _get_value(numbers):
@@ -52,10 +64,10 @@ class NumberDetector(object):
             elif numbers[i] % 100 == 0:
                 # Find the value associated with 100 (its either in front with value [1-9] or there is none)
                 if i > 0 and numbers[i - 1] % 100 != 0:
-                    res += numbers[i - 1] * 100 * math.pow(10, current_bin)
+                    res += numbers[i - 1] * 100 * 10 ** current_bin
                     i -= 1
                 else:
-                    res += numbers[i] * math.pow(10, current_bin)
+                    res += numbers[i] * 10 ** current_bin
             else:
                 res += numbers[i]
 
@@ -74,38 +86,74 @@ class NumberDetector(object):
             fraction = float(self.convert2number(''.join(splits[1:]))) / math.pow(10, len(''.join(splits[1:])))
             return float(self.convert2number(splits[0])) + fraction
 
+        return self._get_value(self._scan_numbers(text))
+
+    def convert2number_many(self, texts):
+        """ Extract the numerical values of many texts, each distinct text is converted once.
+        :param texts: (List(string))
+        :return: (List(number)) values in the order of the texts
+        """
+        values = {}
+        for text in texts:
+            if text not in values:
+                values[text] = self.convert2number(text)
+        return [values[text] for text in texts]
+
+    def _scan_numbers(self, text):
+        """ Split a lower case text into the values of its number words and digit runs in a single pass,
+        ex: "iki yüz 50" -> [2, 100, 50]
+
+        Characters are read into a pending token that is consumed as soon as it is a number word or a
+        digit run ends. A character that ends a digit run is dropped and once the pending token can not
+        become a number word nothing after it is read, ex: "5bin" -> [5], "x bir" -> [].
+        """
         number_list = []
-        int_number_cache = ''
-        token = ''
+        digits = ''  # digit run, possibly with a leading minus
+        prefix = ''  # pending token without surrounding spaces, a prefix of a number word or '-'
+        spaced = False  # whether spaces followed the pending token
         for ch in text:
-            token += ch
-
-            if self.INT_NUMBERS_REGEX.match(token.strip()):
-                int_number_cache += token.strip()
-                token = ''
-            elif token.strip() in self.TEXT_NUMBER_MAP:
-                number_list.append(self.TEXT_NUMBER_MAP[token.strip()])
-                token = ''
-            elif len(int_number_cache) > 0:
-                number_list.append(int(int_number_cache))
-                int_number_cache = ''
-                token = ''
-
-        if len(int_number_cache) > 0:
-            number_list.append(int(int_number_cache))
-
-        return self._get_value(number_list)
+            if digits:
+                if '0' <= ch <= '9':
+                    digits += ch
+                else:
+                    number_list.append(int(digits))
+                    digits = ''
+            elif ch.isspace():
+                spaced = bool(prefix)
+            elif spaced:
+                break
+            elif '0' <= ch <= '9' and prefix in ('', '-'):
+                digits = prefix + ch
+                prefix = ''
+            else:
+                prefix += ch
+                if prefix in self.TEXT_NUMBER_MAP:
+                    number_list.append(self.TEXT_NUMBER_MAP[prefix])
+                    prefix = ''
+                elif prefix not in self.NUMBER_WORD_PREFIXES:
+                    break
+
+        if digits:
+            number_list.append(int(digits))
+        return number_list
+
+    def is_number(self, text):
+        """ Check whether the whole text is a single number, ex: "3", "3,5", "ikiyüz".
+        """
+        return self.SCANNER.is_number(text)
 
     def find_all(self, text):
         found_numbers = []
-        for match in re.finditer(self.NUMBER_SEARCH_REGEX, text):
-            offset_ = match.start() + len(match.group(1))
-            match_text = match.group(2)  # Group 2 doesn't include separators surrounding the expression
+        # Spans don't include separators surrounding the expression
+        for start, end in self.SCANNER.spans(text):
             found_numbers.append({
                 'type': 'number',
-                'start_index': + offset_,
-                'end_index': offset_ + len(match_text),
-                'text': match_text,
-                'value': self.convert2number(match_text)
+                'start_index': start,
+                'end_index': end,
+                'text': text[start:end]
             })
+
+        values = self.convert2number_many([found['text'] for found in found_numbers])
+        for found, value in zip(found_numbers, values):
+            found['value'] = value
         return found_numbers
@@ -0,0 +1,194 @@
+"""
+Linear time scanner for the numbers of `NumberDetector`, it finds the spans `NUMBER_SEARCH_REGEX` finds.
+
+A number is one or more pieces written without spaces between them, ex: '12', '3,5', '1/4', '1.000',
+'iki', 'ikiyüz', 'bir5'. The regex tries every way of splitting a text into pieces before it gives up,
+so a text that is not a number at its end takes exponential time, ex: '1111111111111111x' takes seconds.
+
+The scanner runs an automaton of all the pieces instead, whose states are the sets of positions the
+pieces can be in, see `common_regexes.NUMBERS`. States are built the first time a character reaches
+them, so every character of a text is read a constant number of times. The regex finds the longest
+run of numbers joined by single spaces that is followed by a separator or the end of the text, the
+scanner reads those runs number by number, ex:
+    NumberScanner(["bir", "iki"], " ;:").spans("saat 3 1 iki;4 x") -> [(5, 12)]
+"""
+import re
+
+DIGITS = "0123456789"
+NON_ZERO_DIGITS = "123456789"
+DECIMAL_POINTS = ",."
+
+# Automata of the pieces of `common_regexes.NUMBERS`, each piece has its edges, (state, characters, next
+# state), and its accepting states, a piece starts at its 'start' state
+PIECES = {
+    # -?[0-9]+
+    "integer": ((("start", "-", "sign"), ("start", DIGITS, "digits"), ("sign", DIGITS, "digits"),
+                 ("digits", DIGITS, "digits")),
+                {"digits"}),
+    # -?[0-9]*[,.][0-9]+
+    "double": ((("start", "-", "sign"), ("start", DIGITS, "digits"), ("sign", DIGITS, "digits"),
+                ("digits", DIGITS, "digits"), ("start", DECIMAL_POINTS, "point"), ("sign", DECIMAL_POINTS, "point"),
+                ("digits", DECIMAL_POINTS, "point"), ("point", DIGITS, "decimals"), ("decimals", DIGITS, "decimals")),
+               {"decimals"}),
+    # -?[0-9]+[,.][0-9]*
+    "trailing_point": ((("start", "-", "sign"), ("start", DIGITS, "digits"), ("sign", DIGITS, "digits"),
+                        ("digits", DIGITS, "digits"), ("digits", DECIMAL_POINTS, "point"), ("point", DIGITS, "point")),
+                       {"point"}),
+    # -?[0-9]+/[1-9][0-9]*
+    "fraction": ((("start", "-", "sign"), ("start", DIGITS, "digits"), ("sign", DIGITS, "digits"),
+                  ("digits", DIGITS, "digits"), ("digits", "/", "slash"), ("slash", NON_ZERO_DIGITS, "denominator"),
+                  ("denominator", DIGITS, "denominator")),
+                 {"denominator"}),
+    # [1-9]{1,2}(?:\.[0-9]{3})*
+    "dot_separated": ((("start", NON_ZERO_DIGITS, "one"), ("one", NON_ZERO_DIGITS, "two"), ("one", ".", "point"),
+                       ("two", ".", "point"), ("point", DIGITS, "first"), ("first", DIGITS, "second"),
+                       ("second", DIGITS, "group"), ("group", ".", "point")),
+                      {"one", "two", "group"}),
+}
+
+# Piece of the number words, its states are the prefixes of the words
+WORD = "word"
+
+
+class NumberScanner(object):
+    """
+    Finds numbers with a deterministic automaton, in time linear in the length of the text.
+    """
+
+    def __init__(self, words, separators):
+        """
+        :param words: (iterable(string)) lower case number words, matched ignoring case like the regex
+        :param separators: (string) characters numbers are separated from the text with
+        """
+        self.words = frozenset(words)
+        self.word_prefixes = {word[:end] for word in self.words for end in range(len(word) + 1)}
+        self.separators = frozenset(separators)
+        separator_class = "[{}]".format(re.escape(separators))
+        self.separator_regex = re.compile(separator_class + "+")
+        # Where a number can start, at the start of the text or after separators, before a number word or a
+        # character a piece starts with. Separators are only read from their first one, so a long run of
+        # them is read once.
+        self.start_regex = re.compile(r"(?:^|(?<!{0}){0}+)(?=[-,.0-9]|{1})".format(
+            separator_class, "|".join(map(re.escape, sorted(self.words)))), re.IGNORECASE)
+        letters = sorted({letter for word in self.words for letter in word})
+        # Characters can match more than one letter when case is ignored, ex: 'I' matches 'i' and 'ı'
+        self.letter_regexes = [(letter, re.compile(re.escape(letter), re.IGNORECASE)) for letter in letters]
+
+        self.edges = {}
+        for piece, (edges, _) in PIECES.items():
+            for state, characters, next_state in edges:
+                self.edges.setdefault((piece, state), []).append((characters, (piece, next_state)))
+        self.starts = frozenset([(piece, "start") for piece in PIECES] + [(WORD, "")])
+
+        # Automaton states, the first one has no positions and can not match anything
+        self.states = [frozenset(), self.starts]
+        self.state_index = {state: index for index, state in enumerate(self.states)}
+        self.accepting = [False, False]
+        # For each state, character to the next state, filled on first use
+        self.transitions = [{}, {}]
+
+    def _is_accepting(self, position):
+        piece, state = position
+        if piece == WORD:
+            return state in self.words
+        return state in PIECES[piece][1]
+
+    def _add_transition(self, index, char):
+        """
+        Builds the state a character leads to from a state.
+        :param index: (int) index of the state
+        :param char: (string)
+        :return: (int) index of the next state, 0 when the character can not continue a number
+        """
+        letters = [letter for letter, regex in self.letter_regexes if regex.fullmatch(char)]
+        positions = set()
+        for position in self.states[index]:
+            piece, state = position
+            if piece == WORD:
+                positions.update((WORD, state + letter) for letter in letters
+                                 if state + letter in self.word_prefixes)
+            else:
+                positions.update(next_position for characters, next_position in self.edges.get(position, ())
+                                 if char in characters)
+        accepting = any(self._is_accepting(position) for position in positions)
+        # A piece can follow the one that ends
+        next_state = frozenset(positions | self.starts if accepting else positions)
+
+        next_index = self.state_index.get(next_state)
+        if next_index is None:
+            next_index = len(self.states)
+            self.states.append(next_state)
+            self.state_index[next_state] = next_index
+            self.accepting.append(accepting)
+            self.transitions.append({})
+        self.transitions[index][char] = next_index
+        return next_index
+
+    def _read(self, text, start):
+        """
+        Reads the characters of a text from a position for as long as they can continue a number.
+        :return: (tuple) (int) position of the first character that can not, (bool) whether the characters
+        read are a number
+        """
+        transitions = self.transitions
+        index = 1
+        position = start
+        length = len(text)
+        while position < length:
+            char = text[position]
+            next_index = transitions[index].get(char)
+            if next_index is None:
+                next_index = self._add_transition(index, char)
+            if not next_index:
+                break
+            index = next_index
+            position += 1
+        return position, self.accepting[index]
+
+    def is_number(self, text):
+        """
+        Whether the whole text is a single number, like `NumberDetector.NUMBER_REGEX.fullmatch`.
+        """
+        end, number = self._read(text, 0)
+        return number and end == len(text)
+
+    def _run_end(self, text, start):
+        """
+        :return: (int) end of the longest run of numbers joined by single spaces from a position that is
+        followed by a separator or the end of the text, None when there is no such run
+        """
+        run_end = None
+        length = len(text)
+        while True:
+            end, number = self._read(text, start)
+            # `$` also matches before a newline at the end of the text
+            if not number or end < length and text[end] not in self.separators and \
+                    not (end == length - 1 and text[end] == '\n'):
+                return run_end
+            run_end = end
+            if end == length or text[end] != ' ':
+                return run_end
+            start = end + 1
+
+    def spans(self, text):
+        """
+        Finds the numbers of a text, like the second group of each match of `NUMBER_SEARCH_REGEX`.
+        :param text: (string)
+        :return: (List(tuple)) start and end of each number, in order
+        """
+        spans = []
+        position = 0
+        while True:
+            candidate = self.start_regex.search(text, position)
+            if candidate is None:
+                break
+            start = candidate.end()
+            end = self._run_end(text, start)
+            if end is None:
+                position = max(start, 1)
+                continue
+            spans.append((start, end))
+            # Separators after a number belong to its match, the next number needs its own
+            separators = self.separator_regex.match(text, end)
+            position = end if separators is None else separators.end()
+        return spans
@@ -0,0 +1,33 @@
+from collections import deque
+from itertools import islice
+
+
+def _map_chunk(func, chunk):
+    return [func(item) for item in chunk]
+
+
+def imap_bounded(pool, func, items, chunksize=64, max_pending=None):
+    """
+    Like `Pool.imap`, but only reads as many items ahead as there are pending chunks. `Pool.imap` reads
+    the whole input up front, which does not fit in memory for large streams.
+    :param pool: (multiprocessing.Pool)
+    :param func: module level function applied to each item
+    :param items: (iterable) input items, consumed lazily
+    :param chunksize: (int) number of items sent to a worker at once
+    :param max_pending: (int) maximum number of chunks in flight, defaults to two per worker
+    :return: (generator) results in the order of the items
+    """
+    if max_pending is None:
+        max_pending = 2 * pool._processes
+    items = iter(items)
+    pending = deque()
+    while True:
+        while len(pending) < max_pending:
+            chunk = list(islice(items, chunksize))
+            if not chunk:
+                break
+            pending.append(pool.apply_async(_map_chunk, (func, chunk)))
+
+        if not pending:
+            return
+        yield from pending.popleft().get()
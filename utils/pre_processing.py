@@ -1,6 +1,14 @@
+import re
+
 lower_map = {ord("I"): "ı", ord("İ"): "i"}
 upper_map = {ord("i"): "İ", ord("ı"): "I"}
 
+TOKEN_REGEX = re.compile(r"\S+")
+# Punctuation that is left out of a token when it is at one of its edges, ex: '(yarın),' -> 'yarın'
+EDGE_PUNCTUATION = ",;!?()[]{}\"“”‘’«»…"
+# What follows a full stop that ends a sentence: the end of the text, a new line or a capitalized word
+SENTENCE_END_REGEX = re.compile(r"[^\S\n]*(?:$|\n|[\"“«(]?[A-ZÇĞİÖŞÜ])")
+
 
 def turkish_lower(s: str):
     return s.translate(lower_map).lower()
@@ -8,3 +16,30 @@ def turkish_lower(s: str):
 
 def turkish_upper(s: str):
     return s.translate(upper_map).upper()
+
+
+def tokenize(text):
+    """
+    Splits a text into tokens at any whitespace in a single pass. Punctuation at the edges of a token
+    is left out, so are an ellipsis and a full stop that ends a sentence, ex: '3 gün sonra.' but not the
+    full stop of an ordinal, ex: '1. hafta'. Tokens made of punctuation only are dropped.
+    :param text: (string)
+    :return: (List(tuple)) (token, start, end) of each token, where token == text[start:end]
+    """
+    spans = []
+    for match in TOKEN_REGEX.finditer(text):
+        start, end = match.span()
+        while start < end and text[start] in EDGE_PUNCTUATION:
+            start += 1
+        while end > start and text[end - 1] in EDGE_PUNCTUATION:
+            end -= 1
+
+        stops = end
+        while stops > start and text[stops - 1] == ".":
+            stops -= 1
+        if stops < end - 1 or (stops < end and SENTENCE_END_REGEX.match(text, match.end()) is not None):
+            end = stops
+
+        if end > start:
+            spans.append((text[start:end], start, end))
+    return spans
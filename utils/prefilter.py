@@ -0,0 +1,201 @@
+"""
+Sentence level prefilter of `DateDetector`, it finds out whether any window of a sentence can be a date.
+
+Every rule needs a few literals in its match, ex: a month name and one of 've', 'ile' for a span
+between two months, see `rule_analysis.required_literal_sets`. The literals of all rules are searched
+for in a single scan of the lower cased sentence. A sentence where no rule finds its literals, and no
+number for the rules that need digits, can not have a date, so its windows are never evaluated.
+
+Windows are normalized before matching, ex: 'iki' -> '2', 'Oca' -> 'ocak'. Number words count as digits
+and month abbreviations as their months, so the prefilter never drops a sentence the rules would tag.
+Expressions no rule matches go to dateparser, which is given a sentence with a number or one of
+`FALLBACK_WORDS`. Words of `MIN_STEM_LENGTH` letters or more are stems and match at the start of a word,
+ex: 'haziran' in 'haziranda'. Shorter words and abbreviations only match as whole words or with one of
+their `FALLBACK_SUFFIXES`, so 'haz' does not keep 'hazır' and 'gün' does not keep 'gündem'.
+"""
+import re
+
+from utils.pre_processing import tokenize, turkish_lower, turkish_upper
+
+# Turkish date vocabulary of dateparser: months, days, their abbreviations, units and relative words
+FALLBACK_WORDS = ("ocak", "oca", "şubat", "şub", "mart", "mar", "nisan", "nis", "mayıs", "may", "haziran", "haz",
+                  "temmuz", "tem", "ağustos", "ağu", "eylül", "eyl", "ekim", "eki", "kasım", "kas", "aralık", "ara",
+                  "pazartesi", "pzt", "salı", "sal", "çarşamba", "çar", "perşembe", "per", "cuma", "cum",
+                  "cumartesi", "cmt", "pazar", "paz", "yıl", "sene", "ay", "hafta", "gün", "saat", "dakika", "dk",
+                  "saniye", "sn", "bugün", "dün", "yarın", "şimdi", "önce", "sonra", "geçen", "gelecek", "evvel",
+                  "öbür", "öö", "ös", "öğle", "sabah", "akşam", "gece")
+
+# Fallback words shorter than this match as whole words, longer ones as the start of a word
+MIN_STEM_LENGTH = 4
+
+# Inflections of the short fallback words that are kept, ex: 'yılı', 'günden'
+FALLBACK_SUFFIXES = {
+    "yıl": ("ı", "a", "da", "dan", "ın", "lar", "lık"),
+    "ay": ("ı", "a", "da", "dan", "ın", "lar", "lık"),
+    "gün": ("ü", "e", "de", "den", "ün", "ler", "lük"),
+    "dün": ("kü", "den"),
+}
+
+# Words that start like a short fallback word but are not dates, see `check_words`
+NON_DATE_WORDS = ("ayrıca", "araba", "arkadaş", "hazır", "hazırla", "ekip", "temiz", "perde", "kasa", "gündem",
+                  "dünya", "yıldız", "salon", "marka", "nisbeten", "kasap", "çarşı", "peynir", "tembel", "eylem")
+
+DIGIT_REGEX = re.compile(r"[0-9]")
+
+# Characters a number can be separated from the rest of a token with, see `NumberDetector.SEPARATORS`
+NUMBER_SEPARATORS_REGEX = re.compile(r"[;:]")
+
+
+def trie_pattern(words):
+    """
+    A regex of the words that branches on one character at a time, so a position is rejected after a
+    few comparisons instead of one for each word, ex: ['gün', 'gece', 'geçen'] -> 'g(?:e(?:ce|çen)|ün)'.
+    The longest word at a position matches.
+    :param words: (iterable(string)) non empty words
+    :return: (string)
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def pattern(node):
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:{})'.format('|'.join(branches))
+        return '(?:{})?'.format(body) if '' in node else body
+
+    return pattern(trie)
+
+
+def fallback_pattern(fallback_words, suffixes=FALLBACK_SUFFIXES):
+    """
+    A regex of the fallback words at the start of a word. Stems may be followed by any letters, short words
+    only by one of their suffixes, ex: with ['ekim', 'ay'] 'ekimde', 'ay' and 'ayda' match but 'ayrıca' does not.
+    :param fallback_words: (iterable(string)) non empty words
+    :param suffixes: (dict) short word to its suffixes
+    :return: (string)
+    """
+    stems = [word for word in fallback_words if len(word) >= MIN_STEM_LENGTH]
+    words = [word + suffix for word in fallback_words if len(word) < MIN_STEM_LENGTH
+             for suffix in ("",) + suffixes.get(word, ())]
+    branches = ([trie_pattern(stems)] if stems else []) + \
+               (["{}(?![^\\W\\d_])".format(trie_pattern(words))] if words else [])
+    return r"(?<![^\W\d_])(?:{})".format("|".join(branches))
+
+
+class TemporalPrefilter(object):
+    """
+    Decides whether a sentence can contain a date with a single scan for the literals the rules need.
+    """
+    # Number of tokens whose number check is remembered
+    MAX_NUMBER_TOKENS = 100000
+
+    def __init__(self, requirements, month_forms, is_number, fallback_words=FALLBACK_WORDS):
+        """
+        :param requirements: (List) for each rule its literal sets or None when it has none, see
+        `rule_analysis.required_literal_sets`
+        :param month_forms: (dict) lower cased month expression to its month name, ex: 'oca' -> 'ocak'
+        :param is_number: (callable) whether a text is a single number, see `NumberDetector.is_number`
+        :param fallback_words: (iterable(string)) words the dateparser fallback knows
+        """
+        self.requirements = [None if sets is None else [frozenset(literals) for literals in sets]
+                             for sets in requirements]
+        # A rule without required literals can match any sentence
+        self.always = None in self.requirements
+        self.month_forms = {turkish_lower(form): month for form, month in month_forms.items()}
+        self.is_number = is_number
+        # Token to whether it has a number
+        self.number_tokens = {}
+
+        literals = {literal for sets in self.requirements if sets for literals in sets for literal in literals}
+        # Literals with digits are satisfied by any number, numbers of a window are normalized on their own
+        self.digit_literals = frozenset(literal for literal in literals if DIGIT_REGEX.search(literal))
+        words = sorted(literals - self.digit_literals)
+        # Searched at every position, the longest literal found at a position implies its prefixes
+        self.literal_regex = re.compile("(?=({}))".format(trie_pattern(words))) if words else None
+        self.implied = {word: frozenset(word[:end] for end in range(1, len(word) + 1)).intersection(words)
+                        for word in words}
+        self.fallback_regex = re.compile(fallback_pattern(fallback_words))
+
+        # Literal to the rules it is a key literal of, a rule is only checked once one of its key literals,
+        # the ones of its most selective set, is found
+        self.keyed = {}
+        for index, sets in enumerate(self.requirements):
+            if sets:
+                for literal in max(sets, key=lambda literals: min(map(len, literals))):
+                    self.keyed.setdefault(literal, []).append(index)
+        self.key_literals = frozenset(self.keyed)
+
+    def has_number(self, text, tokens):
+        """
+        Whether the text has a digit or one of its tokens has a number word, which becomes digits when a
+        window is normalized. Number words are whole tokens or parts of a token between number separators.
+        """
+        if DIGIT_REGEX.search(text) is not None:
+            return True
+        for token in tokens:
+            found = self.number_tokens.get(token)
+            if found is None:
+                if len(self.number_tokens) >= self.MAX_NUMBER_TOKENS:
+                    self.number_tokens.clear()
+                found = any(self.is_number(part) for part in NUMBER_SEPARATORS_REGEX.split(token))
+                self.number_tokens[token] = found
+            if found:
+                return True
+        return False
+
+    def may_match(self, tokens, fallback=False):
+        """
+        :param tokens: (List(string)) sentence tokens, see `tokenize`
+        :param fallback: (bool) whether the expressions no rule matches are passed to dateparser
+        :return: (bool) False when no window of the sentence can be a date
+        """
+        if self.always or not tokens:
+            return bool(tokens)
+        text = turkish_lower(' '.join(tokens))
+        months = [self.month_forms[token] for token in text.split(' ') if token in self.month_forms]
+        if months:
+            text += ' ' + ' '.join(months)
+        has_number = self.has_number(text, tokens)
+        if fallback and (has_number or self.fallback_regex.search(text) is not None):
+            return True
+
+        found = set(self.digit_literals) if has_number else set()
+        if self.literal_regex is not None:
+            for match in self.literal_regex.finditer(text):
+                found |= self.implied[match.group(1)]
+        checked = set()
+        for literal in found & self.key_literals:
+            for index in self.keyed[literal]:
+                if index not in checked:
+                    checked.add(index)
+                    if all(not found.isdisjoint(literals) for literals in self.requirements[index]):
+                        return True
+        return False
+
+
+def check_words(prefilter, fallback_words=FALLBACK_WORDS, suffixes=FALLBACK_SUFFIXES, non_date_words=NON_DATE_WORDS):
+    """
+    Checks how conservative the fallback words of a prefilter are. A sentence with a fallback word has to be
+    kept however it is written, ex: 'EKİM', 'ekimde', "eki'de", 'ayda', 'dk.', and the fallback words must
+    not keep a sentence with one of the non date words, the literals of the rules still can.
+    :param prefilter: (TemporalPrefilter)
+    :param fallback_words: (iterable(string)) words the dateparser fallback knows
+    :param suffixes: (dict) short fallback word to its suffixes
+    :param non_date_words: (iterable(string))
+    :return: (tuple) forms of fallback words that are skipped and non date words the fallback words keep
+    """
+    def kept(word, fallback=True):
+        return prefilter.may_match([token for token, _, _ in tokenize("lütfen {} gönder".format(word))], fallback)
+
+    forms = []
+    for word in fallback_words:
+        forms += [word, turkish_upper(word), word + ".", word + "'de"]
+        stem_suffixes = ("de", "ki") if len(word) >= MIN_STEM_LENGTH else suffixes.get(word, ())
+        forms += [word + suffix for suffix in stem_suffixes]
+    return ([form for form in forms if not kept(form)],
+            [word for word in non_date_words if kept(word) and not kept(word, False)])
@@ -0,0 +1,343 @@
+"""
+Regex engines the rules of `DateDetector` can be matched with, ex:
+    DateDetector(regex_backend="re2")
+
+"re" is the standard library and the reference, "regex" is the third party `regex` module and "re2" is
+Google's RE2 through the `google-re2` package, which matches in time linear in the length of the text.
+The optional modules are imported when a backend is first used.
+
+The engines do not support the same constructs, ex: RE2 has no lookarounds and its `\\d` only matches
+ASCII digits. `RegexBackend.check` walks the syntax tree of a pattern and lists what the backend can
+not compile or would match differently, a rule with any such construct stays on the standard library,
+so every backend finds the same dates. `python -m benchmarks.regex_backends` compares them on the rules.
+"""
+import importlib
+import re
+from collections import namedtuple
+
+from utils.rule_analysis import REPEATS, parse, sre_constants
+
+# Kinds of incompatibility
+UNSUPPORTED = "unsupported"
+DIFFERS = "differs"
+
+# A construct of a pattern a backend can not compile, or compiles but matches differently, ex:
+# Incompatibility("lookaround", UNSUPPORTED, "(?=...)")
+Incompatibility = namedtuple("Incompatibility", ["construct", "kind", "detail"])
+
+# Flags of the standard library by name, the other engines have their own values
+FLAG_NAMES = ((re.IGNORECASE, "IGNORECASE"), (re.MULTILINE, "MULTILINE"), (re.DOTALL, "DOTALL"),
+              (re.VERBOSE, "VERBOSE"), (re.ASCII, "ASCII"), (re.UNICODE, "UNICODE"))
+
+# Letters the standard library folds together when case is ignored, ex: 'I' matches 'ı' as well
+TURKISH_I = frozenset(map(ord, "iIıİ"))
+
+LOOKAROUNDS = (sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+GROUP_REFERENCES = (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS)
+# Added in Python 3.11
+ATOMIC = (getattr(sre_constants, "ATOMIC_GROUP", None), getattr(sre_constants, "POSSESSIVE_REPEAT", None))
+# Categories whose meaning depends on the engine, ex: \d, \w and \s
+CATEGORIES = {sre_constants.CATEGORY_DIGIT: r"\d", sre_constants.CATEGORY_NOT_DIGIT: r"\D",
+              sre_constants.CATEGORY_WORD: r"\w", sre_constants.CATEGORY_NOT_WORD: r"\W",
+              sre_constants.CATEGORY_SPACE: r"\s", sre_constants.CATEGORY_NOT_SPACE: r"\S"}
+BOUNDARIES = {sre_constants.AT_BOUNDARY: r"\b", sre_constants.AT_NON_BOUNDARY: r"\B"}
+
+
+def walk(tree, flags):
+    """
+    Visits every node of a syntax tree with the flags in effect at it, ex: the ones of a (?i:...) group.
+    :param tree: (SubPattern) see `rule_analysis.parse`
+    :param flags: (int) flags of the pattern
+    :return: (generator(tuple)) op, its argument and flags
+    """
+    for op, av in tree:
+        yield op, av, flags
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, subtree = av
+            yield from walk(subtree, (flags | add_flags) & ~del_flags)
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                yield from walk(branch, flags)
+        elif op in REPEATS or op in LOOKAROUNDS:
+            yield from walk(av[-1], flags)
+        elif op is sre_constants.GROUPREF_EXISTS:
+            for branch in av[1:]:
+                if branch is not None:
+                    yield from walk(branch, flags)
+        elif op is ATOMIC[0]:
+            yield from walk(av, flags)
+
+
+def _matches_turkish_i(op, av):
+    if op is sre_constants.LITERAL or op is sre_constants.NOT_LITERAL:
+        return av in TURKISH_I
+    if op is sre_constants.IN:
+        return any(_matches_turkish_i(item_op, item_av) for item_op, item_av in av)
+    if op is sre_constants.RANGE:
+        return any(av[0] <= code <= av[1] for code in TURKISH_I)
+    return False
+
+
+class RegexBackend(object):
+    """
+    The regex module of the standard library, every rule is compatible with it.
+    """
+    name = "re"
+    # Module the backend is built on, imported on first use
+    module_name = "re"
+
+    def __init__(self):
+        self.module = None
+        # Patterns compiled by `check`, by pattern and flags, until they are compiled for use
+        self.checked = {}
+
+    def load(self):
+        """
+        Imports the module of the backend.
+        :return: (module)
+        :raises ImportError: when the module is not installed
+        """
+        if self.module is None:
+            self.module = importlib.import_module(self.module_name)
+        return self.module
+
+    def available(self):
+        try:
+            self.load()
+        except ImportError:
+            return False
+        return True
+
+    def compile(self, pattern, flags=0):
+        """
+        :param pattern: (string)
+        :param flags: (int) flags of the standard library
+        :return: (compiled regex) an object with the methods of `re.Pattern`
+        """
+        compiled = self.checked.pop((pattern, flags), None)
+        if compiled is None:
+            compiled = self.compile_pattern(pattern, flags)
+        return compiled
+
+    def compile_pattern(self, pattern, flags):
+        return re.compile(pattern, flags)
+
+    def tree_issues(self, tree, flags):
+        """
+        :return: (List(Incompatibility)) constructs of a parsed pattern the backend does not support
+        """
+        return []
+
+    def check(self, pattern, flags=0):
+        """
+        Finds the constructs of a pattern that the backend can not compile or would match differently
+        than the standard library. A pattern whose constructs are all supported is also compiled once,
+        for the syntax the standard library parses and the backend does not, ex: (?#comments).
+        :param pattern: (string)
+        :param flags: (int) flags of the standard library
+        :return: (List(Incompatibility)) empty when the backend matches the pattern like `re`
+        """
+        if self.name == RegexBackend.name:
+            return []
+        tree = parse(pattern, flags)
+        issues = self.tree_issues(tree, tree.state.flags)
+        if not any(issue.kind == UNSUPPORTED for issue in issues):
+            try:
+                compiled = self.compile_pattern(pattern, flags)
+            except Exception as e:
+                # RE2 errors are bytes
+                detail = e.args[0] if e.args else str(e)
+                if isinstance(detail, bytes):
+                    detail = detail.decode("utf8", "replace")
+                issues.append(Incompatibility("syntax", UNSUPPORTED, str(detail)))
+            else:
+                if not issues:
+                    self.checked[(pattern, flags)] = compiled
+        return issues
+
+    def __reduce__(self):
+        return get_backend, (self.name,)
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self.name)
+
+
+class RegexModuleBackend(RegexBackend):
+    """
+    The third party `regex` module, a backtracking engine like the standard library.
+    """
+    name = "regex"
+    module_name = "regex"
+
+    def compile_pattern(self, pattern, flags):
+        module = self.load()
+        module_flags = 0
+        for value, flag_name in FLAG_NAMES:
+            if flags & value:
+                module_flags |= getattr(module, flag_name)
+        return module.compile(pattern, module_flags)
+
+    def tree_issues(self, tree, flags):
+        issues = []
+        for op, av, node_flags in walk(tree, flags):
+            # 'ı' and 'İ' are only folded with some of 'i' and 'I'
+            if node_flags & re.IGNORECASE and not node_flags & re.ASCII and _matches_turkish_i(op, av):
+                issues.append(Incompatibility("ignore case", DIFFERS, "dotted and dotless i"))
+                break
+        return issues
+
+
+class RE2Backend(RegexBackend):
+    """
+    Google's RE2, it matches in linear time and has no backtracking constructs. Texts with a newline are
+    matched with the standard library, see `NewlineGuardedRegex`.
+    """
+    name = "re2"
+    module_name = "re2"
+    # Largest repeat count RE2 compiles
+    MAX_REPEAT = 1000
+
+    def compile_pattern(self, pattern, flags):
+        module = self.load()
+        if flags & (re.VERBOSE | re.LOCALE):
+            raise ValueError("RE2 does not support verbose or locale patterns")
+        options = module.Options()
+        options.log_errors = False
+        inline = "".join(flag for value, flag in ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+                         if flags & value)
+        regex = module.compile("(?{}){}".format(inline, pattern) if inline else pattern, options)
+        return NewlineGuardedRegex(regex, pattern, flags)
+
+    def tree_issues(self, tree, flags):
+        issues = []
+        if flags & re.VERBOSE:
+            issues.append(Incompatibility("verbose", UNSUPPORTED, "(?x)"))
+        for op, av, node_flags in walk(tree, flags):
+            unicode = not node_flags & re.ASCII
+            if op in LOOKAROUNDS:
+                issues.append(Incompatibility("lookaround", UNSUPPORTED, "(?=...), (?!...), (?<=...), (?<!...)"))
+            elif op in GROUP_REFERENCES:
+                issues.append(Incompatibility("group reference", UNSUPPORTED, "\\1, (?P=name), (?(1)...)"))
+            elif op is not None and op in ATOMIC:
+                issues.append(Incompatibility("atomic", UNSUPPORTED, "(?>...), possessive repeats"))
+            elif op in REPEATS and max(av[0], av[1] if av[1] != sre_constants.MAXREPEAT else 0) > self.MAX_REPEAT:
+                issues.append(Incompatibility("repeat", UNSUPPORTED, "more than {} repeats".format(self.MAX_REPEAT)))
+            elif op is sre_constants.AT and av is sre_constants.AT_END_STRING:
+                issues.append(Incompatibility("anchor", UNSUPPORTED, "\\Z"))
+            elif op is sre_constants.AT and av in BOUNDARIES and unicode:
+                issues.append(Incompatibility("ascii class", DIFFERS, BOUNDARIES[av]))
+            elif op is sre_constants.IN and unicode:
+                for item_op, item_av in av:
+                    if item_op is sre_constants.CATEGORY and item_av in CATEGORIES:
+                        issues.append(Incompatibility("ascii class", DIFFERS, CATEGORIES[item_av]))
+            if node_flags & re.IGNORECASE and unicode and _matches_turkish_i(op, av):
+                issues.append(Incompatibility("ignore case", DIFFERS, "dotted and dotless i"))
+        # One of each
+        return list(dict.fromkeys(issues))
+
+
+class NewlineGuardedRegex(object):
+    """
+    A RE2 regex with the methods of `re.Pattern`. `$` of the standard library also matches before a
+    newline at the end of a text and RE2 does not, so texts with a newline, and ones RE2 can not encode,
+    ex: lone surrogates, are matched with the standard library instead.
+    """
+
+    def __init__(self, regex, pattern, flags):
+        """
+        :param regex: (re2._Regexp) compiled regex
+        :param pattern: (string) pattern without the inline flags
+        :param flags: (int) flags of the standard library
+        """
+        self.regex = regex
+        self.pattern = pattern
+        self.flags = flags
+        self.groups = regex.groups
+        self.groupindex = regex.groupindex
+        self._stdlib = None
+
+    def stdlib(self):
+        if self._stdlib is None:
+            self._stdlib = re.compile(self.pattern, self.flags)
+        return self._stdlib
+
+    def _call(self, method, string, args):
+        """
+        :param method: (string) name of the method
+        :param string: (string) text the method is called on
+        :param args: (tuple) every argument of the method, in order
+        """
+        if "\n" not in string:
+            try:
+                return getattr(self.regex, method)(*args)
+            except UnicodeEncodeError:
+                pass
+        return getattr(self.stdlib(), method)(*args)
+
+    def search(self, string, *args):
+        return self._call("search", string, (string,) + args)
+
+    def match(self, string, *args):
+        return self._call("match", string, (string,) + args)
+
+    def fullmatch(self, string, *args):
+        return self._call("fullmatch", string, (string,) + args)
+
+    def findall(self, string, *args):
+        return self._call("findall", string, (string,) + args)
+
+    def split(self, string, *args):
+        return self._call("split", string, (string,) + args)
+
+    def sub(self, repl, string, *args):
+        return self._call("sub", string, (repl, string) + args)
+
+    def subn(self, repl, string, *args):
+        return self._call("subn", string, (repl, string) + args)
+
+    def finditer(self, string, *args):
+        # Matches are found lazily, a text that can not be encoded is only found out while iterating
+        if "\n" in string or not _encodable(string):
+            return self.stdlib().finditer(string, *args)
+        return self.regex.finditer(string, *args)
+
+    def __repr__(self):
+        return "NewlineGuardedRegex({!r}, {})".format(self.pattern, self.flags)
+
+
+def _encodable(string):
+    try:
+        string.encode("utf8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+BACKENDS = {backend.name: backend for backend in (RegexBackend, RegexModuleBackend, RE2Backend)}
+
+# Backends of this process by name
+_backends = {}
+
+
+def get_backend(name):
+    """
+    :param name: (string) one of `BACKENDS`
+    :return: (RegexBackend) the backend, its module imported
+    :raises ValueError: when there is no such backend
+    :raises ImportError: when its module is not installed
+    """
+    backend = _backends.get(name)
+    if backend is None:
+        if name not in BACKENDS:
+            raise ValueError("Unknown regex backend: {}, one of {}".format(name, ", ".join(BACKENDS)))
+        backend = BACKENDS[name]()
+        backend.load()
+        _backends[name] = backend
+    return backend
+
+
+def available_backends():
+    """
+    :return: (List(string)) names of the backends whose module is installed
+    """
+    return [name for name, backend in BACKENDS.items() if backend().available()]
@@ -0,0 +1,437 @@
+"""
+Static analysis helpers for the regex rules.
+
+The rules are parsed with the regex parser of the standard library and the resulting syntax trees
+are inspected to find out properties of the rules that are otherwise only known by trying them on
+an input.
+"""
+try:
+    from re import _parser as sre_parse, _constants as sre_constants, _compiler as sre_compile
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+    import sre_compile
+
+SPACE = ord(' ')
+
+SPACE_CATEGORIES = {sre_constants.CATEGORY_SPACE, sre_constants.CATEGORY_NOT_DIGIT,
+                    sre_constants.CATEGORY_NOT_WORD, sre_constants.CATEGORY_UNI_SPACE,
+                    sre_constants.CATEGORY_UNI_NOT_DIGIT, sre_constants.CATEGORY_UNI_NOT_WORD,
+                    sre_constants.CATEGORY_NOT_LINEBREAK, sre_constants.CATEGORY_UNI_NOT_LINEBREAK}
+
+REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, 'POSSESSIVE_REPEAT', None)}
+
+
+def parse(pattern, flags=0):
+    """
+    Parse a pattern, either a string or a compiled regex, into its syntax tree.
+    """
+    if hasattr(pattern, 'pattern'):
+        return sre_parse.parse(pattern.pattern, pattern.flags)
+    return sre_parse.parse(pattern, flags)
+
+
+def _class_matches(items, code):
+    """
+    Check whether a character class, the argument of an IN node, matches the given character code.
+    """
+    negate = False
+    found = False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            found = found or av == code
+        elif op is sre_constants.RANGE:
+            found = found or av[0] <= code <= av[1]
+        elif op is sre_constants.CATEGORY:
+            found = found or (code == SPACE and av in SPACE_CATEGORIES)
+        else:
+            # Unknown class items are assumed to match
+            found = True
+    return found != negate
+
+
+def max_spaces(tree):
+    """
+    Find the maximum number of spaces a match of the given syntax tree can contain.
+    :param tree: syntax tree of a pattern, see `parse`
+    :return: (int) number of spaces or None if it is unbounded
+    """
+    total = 0
+    for op, av in tree:
+        if op is sre_constants.LITERAL:
+            count = int(av == SPACE)
+        elif op is sre_constants.NOT_LITERAL:
+            count = int(av != SPACE)
+        elif op is sre_constants.ANY:
+            count = 1
+        elif op is sre_constants.IN:
+            count = int(_class_matches(av, SPACE))
+        elif op is sre_constants.CATEGORY:
+            count = int(av in SPACE_CATEGORIES)
+        elif op is sre_constants.BRANCH:
+            counts = [max_spaces(branch) for branch in av[1]]
+            count = None if None in counts else max(counts)
+        elif op is sre_constants.SUBPATTERN:
+            count = max_spaces(av[-1])
+        elif op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+            count = max_spaces(av)
+        elif op in REPEATS:
+            low, high, item = av
+            count = max_spaces(item)
+            if count:
+                count = None if high == sre_constants.MAXREPEAT else count * high
+        elif op is sre_constants.GROUPREF_EXISTS:
+            counts = [max_spaces(branch) for branch in av[1:] if branch is not None]
+            count = None if None in counts else max(counts + [0])
+        elif op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            count = 0
+        else:
+            # Back references and anything not handled above can not be bounded
+            count = None
+
+        if count is None:
+            return None
+        total += count
+    return total
+
+
+def max_tokens(pattern):
+    """
+    Find the maximum number of space separated tokens a match of the pattern can span.
+    :param pattern: (string or compiled regex)
+    :return: (int) number of tokens or None if it is unbounded
+    """
+    spaces = max_spaces(parse(pattern))
+    return None if spaces is None else spaces + 1
+
+
+def window_tokens(pattern):
+    """
+    Find the maximum number of tokens a window the pattern is searched in can have for it to match. A pattern
+    that is not anchored at both ends, or that is MULTILINE, also matches inside longer windows.
+    :param pattern: (string or compiled regex)
+    :return: (int) number of tokens or None if it is unbounded
+    """
+    tree = parse(pattern)
+    if tree.state.flags & sre_constants.SRE_FLAG_MULTILINE or not (is_anchored(tree) and is_end_anchored(tree)):
+        return None
+    return max_tokens(pattern)
+
+
+def is_anchored(tree):
+    """
+    Check whether every match of the syntax tree has to start at the beginning of the input.
+    """
+    for op, av in tree:
+        if op is sre_constants.AT:
+            return av in (sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING)
+        elif op is sre_constants.SUBPATTERN:
+            return is_anchored(av[-1])
+        elif op is sre_constants.BRANCH:
+            return all(is_anchored(branch) for branch in av[1])
+        else:
+            return False
+    return False
+
+
+def is_end_anchored(tree):
+    """
+    Check whether every match of the syntax tree has to end at the end of the input.
+    """
+    for op, av in reversed(tree):
+        if op is sre_constants.AT:
+            return av in (sre_constants.AT_END, sre_constants.AT_END_STRING)
+        elif op is sre_constants.SUBPATTERN:
+            return is_end_anchored(av[-1])
+        elif op is sre_constants.BRANCH:
+            return all(is_end_anchored(branch) for branch in av[1])
+        else:
+            return False
+    return False
+
+
+def has_back_references(tree):
+    """
+    Check whether the syntax tree refers to one of its groups, ex: (a)\\1
+    """
+    for op, av in tree:
+        if op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            return True
+        elif op is sre_constants.SUBPATTERN:
+            if has_back_references(av[-1]):
+                return True
+        elif op is sre_constants.BRANCH:
+            if any(has_back_references(branch) for branch in av[1]):
+                return True
+        elif op in REPEATS or op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if has_back_references(av[-1]):
+                return True
+        elif op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+            if has_back_references(av):
+                return True
+    return False
+
+
+# Largest number of strings an exactly known part of a pattern is expanded to
+MAX_EXACT_STRINGS = 64
+
+
+def _product(prefixes, suffixes):
+    if prefixes is None or suffixes is None or len(prefixes) * len(suffixes) > MAX_EXACT_STRINGS:
+        return None
+    return {prefix + suffix for prefix in prefixes for suffix in suffixes}
+
+
+def _union(sets):
+    result = set()
+    for strings in sets:
+        if strings is None:
+            return None
+        result |= strings
+    return result if len(result) <= MAX_EXACT_STRINGS else None
+
+
+def _min_width(tree, item):
+    return sre_parse.SubPattern(tree.state, [item]).getwidth()[0]
+
+
+def exact_strings(tree):
+    """
+    Expand the syntax tree into the complete set of strings it matches, if the set is small.
+    :return: (set) matched strings or None if the set is too large or not known
+    """
+    result = {''}
+    for item in tree:
+        result = _product(result, _exact_item(item))
+        if result is None:
+            return None
+    return result
+
+
+def _exact_item(item):
+    op, av = item
+    if op is sre_constants.LITERAL:
+        return {chr(av)}
+    elif op is sre_constants.IN:
+        chars = set()
+        for class_op, class_av in av:
+            if class_op is sre_constants.LITERAL:
+                chars.add(chr(class_av))
+            elif class_op is sre_constants.RANGE and class_av[1] - class_av[0] < MAX_EXACT_STRINGS:
+                chars.update(chr(code) for code in range(class_av[0], class_av[1] + 1))
+            else:
+                return None
+        return chars if len(chars) <= MAX_EXACT_STRINGS else None
+    elif op is sre_constants.BRANCH:
+        return _union(exact_strings(branch) for branch in av[1])
+    elif op is sre_constants.SUBPATTERN:
+        return None if av[1] & sre_constants.SRE_FLAG_IGNORECASE else exact_strings(av[-1])
+    elif op in REPEATS:
+        low, high, repeated = av
+        if high == sre_constants.MAXREPEAT:
+            return None
+        strings = exact_strings(repeated)
+        result, repeats = {''}, []
+        for count in range(high + 1):
+            if count >= low:
+                repeats.append(result)
+            result = _product(result, strings)
+        return _union(repeats)
+    elif op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return {''}
+    return None
+
+
+def _relax(literals):
+    """
+    Replace literals with shorter ones that are still required, surrounding spaces are dropped and a
+    literal is dropped when it contains another one, ex: {'ay ', 'ayın'} -> {'ay'}
+    """
+    stripped = {literal.strip(' ') for literal in literals}
+    return {literal for literal in stripped if not any(other != literal and other in literal for other in stripped)}
+
+
+def _best(candidates):
+    """
+    Pick the most selective requirement, preferring few literals that are not single letters.
+    """
+    best, best_score = None, None
+    for literals in candidates:
+        if not literals:
+            continue
+        literals = _relax(literals)
+        if '' in literals:
+            continue
+
+        strong = all(len(literal) > 1 or literal.isdigit() for literal in literals)
+        score = (strong, -len(literals), min(map(len, literals)))
+        if best is None or score > best_score:
+            best, best_score = literals, score
+    return best
+
+
+def _candidates(tree):
+    """
+    Literal sets such that every match of the tree contains one literal of each set, None for unknown ones.
+    """
+    candidates = []
+    run = {''}
+    for item in tree:
+        strings = _exact_item(item)
+        candidates.append(strings)
+        joined = _product(run, strings)
+        if joined is not None:
+            run = joined
+            continue
+
+        candidates.append(run)
+        if strings is not None:
+            run = strings
+        else:
+            run = {''}
+            candidates.append(_required_item(item))
+    candidates.append(run)
+    return candidates
+
+
+def _required(tree):
+    return _best(_candidates(tree))
+
+
+def _required_item(item):
+    op, av = item
+    if op is sre_constants.SUBPATTERN:
+        return None if av[1] & sre_constants.SRE_FLAG_IGNORECASE else _required(av[-1])
+    elif op is sre_constants.BRANCH:
+        return _union(_required(branch) for branch in av[1])
+    elif op in REPEATS:
+        return _required(av[-1]) if av[0] > 0 else None
+    return _best([_exact_item(item)])
+
+
+def _required_nonempty(tree):
+    if any(_min_width(tree, item) > 0 for item in tree):
+        return _required(tree)
+    # Every part can be empty, so one of them matched something
+    return _union(_required_nonempty_item(item) for item in tree
+                  if item[0] not in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT))
+
+
+def _required_nonempty_item(item):
+    op, av = item
+    if op is sre_constants.SUBPATTERN:
+        return None if av[1] & sre_constants.SRE_FLAG_IGNORECASE else _required_nonempty(av[-1])
+    elif op is sre_constants.BRANCH:
+        return _union(_required_nonempty(branch) for branch in av[1])
+    elif op in REPEATS:
+        return _required_nonempty(av[-1])
+    return None
+
+
+def required_literals(pattern):
+    """
+    Find literals such that every non empty match of the pattern contains at least one of them.
+    ex: r"^(?:bu )?hafta ?sonu$" -> {'sonu'}
+    :param pattern: (string or compiled regex)
+    :return: (frozenset) literals or None if the pattern has no such literals
+    """
+    if getattr(pattern, 'flags', 0) & sre_constants.SRE_FLAG_IGNORECASE:
+        return None
+    literals = _required_nonempty(parse(pattern))
+    return frozenset(literals) if literals else None
+
+
+def _all_required(tree):
+    requirements = _candidates(tree)
+    for op, av in tree:
+        if op is sre_constants.SUBPATTERN and not av[1] & sre_constants.SRE_FLAG_IGNORECASE:
+            requirements.extend(_all_required(av[-1]))
+        elif op in REPEATS and av[0] > 0:
+            requirements.extend(_all_required(av[-1]))
+    return requirements
+
+
+def required_literal_sets(pattern):
+    """
+    Find every literal set such that each non empty match of the pattern contains a literal of the set,
+    a string has to contain a literal of all of them to match, ex: r"^(ocak|mart) (ile|ve) (ocak|mart)$"
+    -> [{'ocak', 'mart'}, {'ile', 've'}]. See `required_literals` for the most selective one.
+    :param pattern: (string or compiled regex)
+    :return: (List(frozenset)) literal sets or None if the pattern has no such literals
+    """
+    if getattr(pattern, 'flags', 0) & sre_constants.SRE_FLAG_IGNORECASE:
+        return None
+    tree = parse(pattern)
+    if not any(_min_width(tree, item) > 0 for item in tree):
+        literals = required_literals(pattern)
+        return None if literals is None else [literals]
+
+    requirements = []
+    for literals in _all_required(tree):
+        literals = frozenset(_relax(literals)) if literals else None
+        if literals and '' not in literals and literals not in requirements:
+            requirements.append(literals)
+    # A set is left out when each literal of another set contains one of its literals, ex: {'a'} and {'ay'}
+    requirements = [literals for literals in requirements
+                    if not any(other is not literals and all(any(literal in longer for literal in literals)
+                                                             for longer in other) for other in requirements)]
+    return requirements or None
+
+
+# Characters that samples of character classes are picked from, besides the ones a class names
+SAMPLE_ALPHABET = "abcçdefgğhıijklmnoöprsştuüvyzABCÇDEFGĞHIİJKLMNOÖPRSŞTUÜVYZ0123456789 .,:;-/'\"+=$_\\"
+# Most repetitions a sample adds to the minimum of an open ended repeat
+MAX_SAMPLE_REPEAT = 3
+
+_sample_chars_cache = {}
+
+
+def sample_string(tree, rng, max_repeat=MAX_SAMPLE_REPEAT):
+    """
+    Build a random string that the syntax tree is likely to match. Anchors and lookarounds are ignored,
+    so a sample should be checked with the regex before it is used.
+    :param tree: syntax tree of a pattern, see `parse`
+    :param rng: (random.Random)
+    :param max_repeat: (int) most repetitions added to the minimum of a repeat
+    :return: (string)
+    """
+    return ''.join(_sample_item(tree, item, rng, max_repeat) for item in tree)
+
+
+def _sample_item(tree, item, rng, max_repeat):
+    op, av = item
+    if op is sre_constants.LITERAL:
+        return chr(av)
+    elif op is sre_constants.BRANCH:
+        return sample_string(rng.choice(av[1]), rng, max_repeat)
+    elif op is sre_constants.SUBPATTERN:
+        return sample_string(av[-1], rng, max_repeat)
+    elif op in REPEATS:
+        low, high, repeated = av
+        count = rng.randint(low, min(high, low + max_repeat))
+        return ''.join(sample_string(repeated, rng, max_repeat) for _ in range(count))
+    elif op in (sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN, sre_constants.CATEGORY):
+        chars = _sample_chars(tree, item)
+        return rng.choice(chars) if chars else ''
+    # Anchors, lookarounds and group references
+    return ''
+
+
+def _sample_chars(tree, item):
+    """
+    Find the characters a single character item matches, among the sample alphabet and the characters it names.
+    """
+    key = (item[0], repr(item[1]), tree.state.flags)
+    if key not in _sample_chars_cache:
+        candidates = set(SAMPLE_ALPHABET)
+        if item[0] is sre_constants.IN:
+            for class_op, class_av in item[1]:
+                if class_op is sre_constants.LITERAL:
+                    candidates.add(chr(class_av))
+                elif class_op is sre_constants.RANGE:
+                    candidates.update(chr(code) for code in (class_av[0], (class_av[0] + class_av[1]) // 2, class_av[1]))
+        regex = sre_compile.compile(sre_parse.SubPattern(tree.state, [item]), tree.state.flags)
+        _sample_chars_cache[key] = sorted(char for char in candidates if regex.fullmatch(char))
+    return _sample_chars_cache[key]
@@ -0,0 +1,251 @@
+"""
+Loads date rules from a declarative JSON file.
+
+A rule file has the format:
+    {
+      "fragments": {"SEASON": "(?:yaz|kış)"},
+      "rules": [
+        {"name": "BEFORE_DAY_REGEX", "type": "datetime", "description": "n days before; ex: 4 gün önce",
+         "pattern": "^([0-9]+) gün {BEFORE_EXPRESSION}$", "resolve": {"dday": "-\\1"}},
+        ...
+      ]
+    }
+Patterns refer to fragments with `{NAME}`, either ones defined in the file or the ones given by the
+caller. `resolve` holds the `date_creator` arguments of a datetime rule, a list of two of them for the
+start and end of a date-span rule, and the unit with a group or a fixed value of a date-period rule, ex:
+{"unit": "week", "group": 1}. A date-span rule can instead name a holiday of the holiday calendar,
+ex: {"holiday": "KURBAN_BAYRAMI", "round_year": true}, see `holidays`. `flags` is an optional list of
+`re` flag names.
+
+Loading validates the file and analyses the rules, see `rule_analysis`. The result is kept in a snapshot
+next to the file, keyed by the hash of its content, so that later loads skip the validation and analysis.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+
+from utils.rule_analysis import (has_back_references, is_anchored, parse, required_literal_sets, required_literals,
+                                 window_tokens)
+
+# Bumped when the snapshot content changes
+SNAPSHOT_VERSION = 3
+
+FRAGMENT_REGEX = re.compile(r"\{([A-Z][A-Z0-9_]*)\}")
+
+FLAGS = {"IGNORECASE": re.IGNORECASE, "MULTILINE": re.MULTILINE, "DOTALL": re.DOTALL, "UNICODE": re.UNICODE,
+         "VERBOSE": re.VERBOSE}
+
+GROUP_REFERENCE_REGEX = re.compile(r"\\([0-9]+)")
+
+# Rule files loaded by this process by their digest
+_loaded = {}
+
+
+class RuleFileError(ValueError):
+    pass
+
+
+class RuleFile(object):
+    """
+    Validated rules of a rule file, with fragments expanded, and their analysis.
+    """
+
+    def __init__(self, path, digest, rules, analysis):
+        """
+        :param path: (string) path of the rule file
+        :param digest: (string) hash of the file content and everything else the rules depend on
+        :param rules: (List(dict)) rules with the keys name, type, pattern, flags and resolve
+        :param analysis: (List(dict)) for each rule the longest window in tokens it can match, whether it is
+        anchored and the literals it requires, see `analyse`
+        """
+        self.path = path
+        self.digest = digest
+        self.rules = rules
+        self.analysis = analysis
+
+
+def analyse(pattern, flags=0):
+    """
+    Static analysis of a rule pattern.
+    :return: (dict) span, anchored, literals and requirements of the pattern, requirements are the literal sets
+    a match needs one literal of each of
+    """
+    regex = re.compile(pattern, flags)
+    return {"span": window_tokens(regex), "anchored": is_anchored(parse(regex)), "literals": required_literals(regex),
+            "requirements": required_literal_sets(regex)}
+
+
+def expand_fragments(pattern, fragments, context):
+    def replace(match):
+        if match.group(1) not in fragments:
+            raise RuleFileError("{}: unknown fragment {}".format(context, match.group(0)))
+        return str(fragments[match.group(1)])
+
+    return FRAGMENT_REGEX.sub(replace, pattern)
+
+
+def _check_keys(value, required, optional, context):
+    if not isinstance(value, dict):
+        raise RuleFileError("{}: expected an object".format(context))
+    missing = [key for key in required if key not in value]
+    unknown = [key for key in value if key not in required and key not in optional]
+    if missing:
+        raise RuleFileError("{}: missing {}".format(context, ", ".join(missing)))
+    if unknown:
+        raise RuleFileError("{}: unknown {}".format(context, ", ".join(unknown)))
+
+
+def _check_resolution(resolution, regex, parameters, context):
+    _check_keys(resolution, (), parameters, context)
+    for key, value in resolution.items():
+        if isinstance(value, str):
+            for group in GROUP_REFERENCE_REGEX.findall(value):
+                if int(group) > regex.groups:
+                    raise RuleFileError("{}: {} refers to missing group {}".format(context, key, group))
+        elif not isinstance(value, (int, bool)):
+            raise RuleFileError("{}: {} should be a number, a boolean or a string".format(context, key))
+
+
+def validate_rules(content, fragments, types, parameters, holidays=()):
+    """
+    Validates the decoded content of a rule file.
+    :param content: (dict) decoded JSON
+    :param fragments: (dict) fragments the patterns can refer to, the fragments of the file are added to them
+    :param types: (dict) rule type to the kind of its resolution, one of "datetime", "date-span" or "date-period"
+    :param parameters: (iterable(string)) names of the resolution parameters
+    :param holidays: (iterable(string)) names of the holidays date-span rules can resolve to
+    :return: (List(dict)) rules with expanded patterns and flag values
+    """
+    _check_keys(content, ("rules",), ("fragments",), "rule file")
+    fragments = dict(fragments)
+    file_fragments = content.get("fragments", {})
+    if not isinstance(file_fragments, dict):
+        raise RuleFileError("fragments: expected an object")
+    for name, fragment in file_fragments.items():
+        if not FRAGMENT_REGEX.fullmatch("{" + name + "}") or not isinstance(fragment, str):
+            raise RuleFileError("fragment {}: expected an upper case name and a string pattern".format(name))
+        fragments[name] = expand_fragments(fragment, fragments, "fragment " + name)
+
+    if not isinstance(content["rules"], list):
+        raise RuleFileError("rules: expected a list")
+
+    rules, names = [], set()
+    for index, rule in enumerate(content["rules"]):
+        context = "rule {}".format(rule.get("name", index) if isinstance(rule, dict) else index)
+        _check_keys(rule, ("name", "type", "pattern", "resolve"), ("description", "flags"), context)
+        if not isinstance(rule["name"], str) or rule["name"] in names:
+            raise RuleFileError("{}: names should be unique strings".format(context))
+        names.add(rule["name"])
+        if rule["type"] not in types:
+            raise RuleFileError("{}: unknown type {}".format(context, rule["type"]))
+
+        flags = 0
+        for flag in rule.get("flags", []):
+            if flag not in FLAGS:
+                raise RuleFileError("{}: unknown flag {}".format(context, flag))
+            flags |= FLAGS[flag]
+
+        if not isinstance(rule["pattern"], str):
+            raise RuleFileError("{}: pattern should be a string".format(context))
+        pattern = expand_fragments(rule["pattern"], fragments, context)
+        try:
+            regex = re.compile(pattern, flags)
+        except re.error as e:
+            raise RuleFileError("{}: invalid pattern, {}".format(context, e))
+        if has_back_references(parse(regex)):
+            raise RuleFileError("{}: patterns can not refer to their own groups".format(context))
+
+        resolution = rule["resolve"]
+        kind = types[rule["type"]]
+        if kind == "date-span" and isinstance(resolution, dict):
+            _check_keys(resolution, ("holiday",), ("round_year",), context)
+            if resolution["holiday"] not in holidays:
+                raise RuleFileError("{}: unknown holiday {}".format(context, resolution["holiday"]))
+            if not isinstance(resolution.get("round_year", False), bool):
+                raise RuleFileError("{}: round_year should be a boolean".format(context))
+        elif kind == "date-span":
+            if not isinstance(resolution, list) or len(resolution) != 2:
+                raise RuleFileError("{}: expected the resolutions of the start and the end".format(context))
+            for end in resolution:
+                _check_resolution(end, regex, parameters, context)
+        elif kind == "date-period":
+            _check_keys(resolution, ("unit",), ("group", "value"), context)
+            if ("group" in resolution) == ("value" in resolution):
+                raise RuleFileError("{}: expected either a group or a value".format(context))
+            if "group" in resolution and not (isinstance(resolution["group"], int) and
+                                              0 <= resolution["group"] <= regex.groups):
+                raise RuleFileError("{}: group should be a group of the pattern".format(context))
+            if "value" in resolution and (not isinstance(resolution["value"], str) or resolution["value"].isnumeric()):
+                raise RuleFileError("{}: value should be a string that is not a number".format(context))
+        else:
+            _check_resolution(resolution, regex, parameters, context)
+
+        rules.append({"name": rule["name"], "type": rule["type"], "pattern": pattern, "flags": flags,
+                      "resolve": resolution})
+    return rules
+
+
+def snapshot_path(path, digest):
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, "__pycache__", "{}.{}.pickle".format(name, digest[:16]))
+
+
+def load_rule_file(path, fragments=None, types=None, parameters=(), snapshot=True, holidays=()):
+    """
+    Loads a rule file, from its snapshot when there is one for the current content.
+    :param path: (string) path of the rule file
+    :param fragments: (dict) fragments the patterns can refer to
+    :param types: (dict) rule type to the kind of its resolution, see `validate_rules`
+    :param parameters: (iterable(string)) names of the resolution parameters
+    :param holidays: (iterable(string)) names of the holidays date-span rules can resolve to
+    :param snapshot: (bool) whether the snapshot is read and written
+    :return: (RuleFile)
+    :raises RuleFileError: when the file is not valid
+    """
+    fragments = fragments or {}
+    types = types or {"datetime": "datetime", "date-span": "date-span", "date-period": "date-period"}
+    parameters = sorted(parameters)
+    holidays = sorted(holidays)
+    with open(path, "rb") as rule_file:
+        data = rule_file.read()
+
+    # Rules also depend on the fragments, parameters and holidays of the code and on the regex parser
+    digest = hashlib.sha256(data + repr((SNAPSHOT_VERSION, sys.version_info[:2], sorted(fragments.items()),
+                                         sorted(types.items()), parameters, holidays)).encode("utf8")).hexdigest()
+    if digest in _loaded:
+        return _loaded[digest]
+
+    cache_path = snapshot_path(path, digest)
+    if snapshot:
+        try:
+            with open(cache_path, "rb") as cache_file:
+                cached = pickle.load(cache_file)
+            if cached.digest == digest:
+                cached.path = path
+                _loaded[digest] = cached
+                return cached
+        except Exception:
+            # A missing, corrupt or stale snapshot, ex: of another version of the code, is rebuilt
+            pass
+
+    try:
+        content = json.loads(data.decode("utf8"))
+    except ValueError as e:
+        raise RuleFileError("{}: invalid JSON, {}".format(path, e))
+    rules = validate_rules(content, fragments, types, parameters, holidays)
+    loaded = RuleFile(path, digest, rules, [analyse(rule["pattern"], rule["flags"]) for rule in rules])
+    _loaded[digest] = loaded
+
+    if snapshot:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temporary_path = "{}.{}.tmp".format(cache_path, os.getpid())
+            with open(temporary_path, "wb") as cache_file:
+                pickle.dump(loaded, cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            pass
+    return loaded
@@ -0,0 +1,184 @@
+import re
+
+from utils.lazy import LazyRegex
+from utils.rule_analysis import has_back_references, is_anchored, parse, required_literals
+
+# Flags that can be scoped to a part of a pattern, ex: (?i:...)
+INLINE_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+
+
+class RuleMatcher(object):
+    """
+    Finds the first rule of a rule list that matches an input with a single regex scan.
+
+    All rules are merged into one alternation where each rule is a named group, in rule order.
+    Alternatives are tried in order at the start of the input, rules that are not anchored to the
+    start get a lazy prefix so that they still match wherever `re.search` would find them.
+
+    Most rules need a literal to be present in the input, ex: 'hafta', 'bayramı' or a digit. These
+    trigger literals are indexed by the tokens they can appear in and only the rules triggered by the
+    tokens of an input are tried. A few triggered rules are tried one by one, the merged regex is used
+    when many rules are triggered, once it has been needed often enough to pay for its compilation.
+    """
+    # Largest number of triggered rules that are tried one by one
+    MAX_SEQUENTIAL = 24
+    # Number of inputs that trigger many rules before the merged regex is compiled, until then they are tried
+    # one rule at a time, so a short lived matcher only compiles the rules it tries
+    MERGE_AFTER = 32
+    # Number of tokens whose triggered rules are remembered
+    MAX_INDEXED_TOKENS = 100000
+
+    def __init__(self, rules, analysis=None, backend=None):
+        """
+        :param rules: (List(tuple)) rules in the format of `DateDetector.regex_list`
+        :param analysis: (List(dict)) optional analysis of each rule with the keys anchored and literals, see
+        `rule_loader.analyse`, the rules are analysed when it is not given
+        :param backend: (RegexBackend) engine of the merged regex, it stays on the standard library when the
+        backend can not match it the same way, see `regex_backend`
+        """
+        self.rules = rules
+        self.alternatives = []
+        # Rules matched at the start of the input by their merged alternative, their groups are read from it
+        self.unprefixed = set()
+        # Trigger literal to the indices of rules it triggers
+        self.triggers = {}
+        # Rules without a trigger literal, they are always tried
+        self.untriggered = []
+
+        for index, (rule_name, _, rule_regex, _) in enumerate(rules):
+            if analysis is None:
+                tree = parse(rule_regex)
+                if has_back_references(tree):
+                    raise ValueError("Rule {} refers to its own groups and can not be merged".format(rule_name))
+                anchored, literals = is_anchored(tree), required_literals(rule_regex)
+            else:
+                anchored, literals = analysis[index]["anchored"], analysis[index]["literals"]
+
+            pattern = "(?:{})".format(rule_regex.pattern)
+            if rule_regex.flags & re.MULTILINE or not anchored:
+                pattern = "(?s:.*?)" + pattern
+            else:
+                self.unprefixed.add(index)
+
+            flags = ''.join(flag for value, flag in INLINE_FLAGS if rule_regex.flags & value)
+            if flags:
+                pattern = "(?{}:{})".format(flags, pattern)
+
+            self.alternatives.append("(?P<{}>{})".format(self.group_name(index), pattern))
+
+            if literals is None:
+                self.untriggered.append(index)
+            else:
+                for literal in literals:
+                    # A literal is looked up within a single token, so its longest word is required instead
+                    word = max(literal.split(' '), key=len)
+                    self.triggers.setdefault(word, set()).add(index)
+
+        self.all_rules = tuple(range(len(rules)))
+        self.token_rules = {}
+        # Inputs that triggered many rules so far, see `MERGE_AFTER`
+        self.merge_demand = 0
+        pattern = '|'.join(self.alternatives)
+        if backend is not None and backend.check(pattern, re.UNICODE):
+            backend = None
+        self.regex = LazyRegex(pattern, re.UNICODE, backend)
+
+    def compile(self):
+        """
+        Compiles the rules and the merged regex now instead of on first use, ex: before serving requests.
+        """
+        for rule in self.rules:
+            if isinstance(rule[2], LazyRegex):
+                rule[2].compile()
+        self.regex.compile()
+        self.merge_demand = self.MERGE_AFTER
+
+    @staticmethod
+    def group_name(index):
+        return "rule{}".format(index)
+
+    def triggered_rules(self, token):
+        """
+        Finds the rules triggered by the literals in a token.
+        :param token: (String) a token without spaces
+        :return: (frozenset) rule indices
+        """
+        indices = self.token_rules.get(token)
+        if indices is None:
+            if len(self.token_rules) >= self.MAX_INDEXED_TOKENS:
+                self.token_rules.clear()
+            indices = frozenset(index for literal, literal_indices in self.triggers.items()
+                                if literal in token for index in literal_indices)
+            self.token_rules[token] = indices
+        return indices
+
+    def candidates(self, input_expr):
+        """
+        Finds the rules that can match the input, the ones triggered by a literal in the input.
+        :param input_expr: (String)
+        :return: (List(int)) sorted rule indices
+        """
+        if not input_expr:
+            # Trigger literals are only required by non empty matches
+            return self.all_rules
+
+        found = set(self.untriggered)
+        for token in input_expr.split(' '):
+            found |= self.triggered_rules(token)
+        return sorted(found)
+
+    def match(self, input_expr):
+        """
+        Finds the rule that the first successful `re.search` would find when the rules are tried in order.
+        :param input_expr: (String)
+        :return: (tuple) the rule and the match of its own regex, a `RuleMatch` when it is read from the
+        merged regex, None if no rule matches
+        """
+        indices = self.candidates(input_expr)
+        if len(indices) > self.MAX_SEQUENTIAL and self.merge_demand < self.MERGE_AFTER:
+            self.merge_demand += 1
+        if len(indices) <= self.MAX_SEQUENTIAL or self.merge_demand < self.MERGE_AFTER:
+            for index in indices:
+                rule_match = self.rules[index][2].search(input_expr)
+                if rule_match is not None:
+                    return self.rules[index], rule_match
+            return None
+
+        # Rules that are not triggered can not match, so the first match of all rules is the same
+        combined_match = self.regex.match(input_expr)
+        if combined_match is None:
+            return None
+
+        index = int(combined_match.lastgroup[len("rule"):])
+        if index in self.unprefixed:
+            return self.rules[index], RuleMatch(combined_match, self.regex.groupindex[combined_match.lastgroup])
+        # The lazy prefix is a part of the alternative, the rule is run again for its own match
+        return self.rules[index], self.rules[index][2].search(input_expr)
+
+
+class RuleMatch(object):
+    """
+    The match of a rule read from a match of the merged regex, groups are numbered as in the rule.
+    An unprefixed alternative matches the same text as the rule would, see `RuleMatcher.match`.
+    """
+    __slots__ = ("combined_match", "offset")
+
+    def __init__(self, combined_match, offset):
+        """
+        :param combined_match: (match object) match of the merged regex
+        :param offset: (int) number of the named group of the rule in the merged regex
+        """
+        self.combined_match = combined_match
+        self.offset = offset
+
+    def group(self, index=0):
+        return self.combined_match.group(self.offset + index)
+
+    def start(self, index=0):
+        return self.combined_match.start(self.offset + index)
+
+    def end(self, index=0):
+        return self.combined_match.end(self.offset + index)
+
+    def span(self, index=0):
+        return self.combined_match.span(self.offset + index)
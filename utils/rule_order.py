@@ -0,0 +1,212 @@
+"""
+Orders the rules of a detector by how often they hit, without changing which rule wins an input.
+
+The first rule that matches an input wins, so two rules that can match the same string, overlapping
+rules, keep their relative order. Overlaps are found by cross-testing every rule on random strings
+that the rules match, see `rule_analysis.sample_string`, on pairs of them and on a corpus. A rule that
+is not anchored at both ends can match inside the strings of any rule, so it overlaps with all of them.
+Rules that never matched a common string are ordered by their observed hits. An order is saved as JSON together
+with the rule file it was learned for, ex:
+    python -m utils.rule_order traffic.txt -o rule_order.json
+and is used with `DateDetector(rule_order="rule_order.json")`.
+"""
+import argparse
+import heapq
+import itertools
+import json
+import random
+import sys
+
+from utils.rule_analysis import is_anchored, is_end_anchored, parse, sample_string
+from utils.pre_processing import tokenize
+from utils.rule_loader import RuleFileError
+
+
+def rule_samples(rules, count, rng):
+    """
+    Random strings each rule matches.
+    :param rules: (List(tuple)) rules in the format of `DateDetector.regex_list`
+    :param count: (int) number of samples tried for each rule
+    :param rng: (random.Random)
+    :return: (List(List(string))) samples of each rule, only the ones its regex matches
+    """
+    samples = []
+    for rule in rules:
+        tree = parse(rule[2])
+        candidates = (sample_string(tree, rng) for _ in range(count))
+        samples.append(sorted({sample for sample in candidates if rule[2].search(sample) is not None}))
+    return samples
+
+
+def find_overlaps(rules, samples_per_rule=50, texts=(), seed=0):
+    """
+    Finds the pairs of rules that match a common string. Each rule is tried on the samples of every
+    rule, on a sample of each other rule joined to one of its own with a space and on the given texts.
+    Rules that are not anchored at both ends overlap with every rule.
+    :param rules: (List(tuple)) rules in the format of `DateDetector.regex_list`
+    :param samples_per_rule: (int) number of samples generated for each rule
+    :param texts: (iterable(string)) more strings to cross-test on, ex: normalized windows of real inputs
+    :param seed: (int) seed of the sampler
+    :return: (set) pairs of rule names, each pair is a sorted tuple
+    """
+    rng = random.Random(seed)
+    samples = rule_samples(rules, samples_per_rule, rng)
+
+    strings = set(texts)
+    for own in samples:
+        strings.update(own)
+    for first, second in itertools.permutations(range(len(rules)), 2):
+        if samples[first] and samples[second]:
+            strings.add(rng.choice(samples[first]) + " " + rng.choice(samples[second]))
+
+    overlaps = set()
+    for rule in rules:
+        tree = parse(rule[2])
+        if not (is_anchored(tree) and is_end_anchored(tree)):
+            overlaps.update(tuple(sorted((rule[0], other[0]))) for other in rules if other is not rule)
+    for string in sorted(strings):
+        matched = [rule[0] for rule in rules if rule[2].search(string) is not None]
+        for pair in itertools.combinations(matched, 2):
+            overlaps.add(tuple(sorted(pair)))
+    return overlaps
+
+
+def precedence_order(names, overlaps, hits):
+    """
+    Orders the rules by their hits, an overlapping pair keeps its order in `names`.
+    :param names: (List(string)) rule names in their current order
+    :param overlaps: (iterable(tuple)) pairs of overlapping rule names
+    :param hits: (dict) rule name to its number of hits, missing rules have none
+    :return: (List(string)) rule names, rules with the same hits keep their current order
+    """
+    position = {name: index for index, name in enumerate(names)}
+    # Rule to the rules that have to come after it
+    successors = {name: [] for name in names}
+    blockers = dict.fromkeys(names, 0)
+    for pair in overlaps:
+        first, second = sorted(pair, key=position.__getitem__)
+        successors[first].append(second)
+        blockers[second] += 1
+
+    ready = [(-hits.get(name, 0), position[name], name) for name in names if not blockers[name]]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        _, _, name = heapq.heappop(ready)
+        order.append(name)
+        for successor in successors[name]:
+            blockers[successor] -= 1
+            if not blockers[successor]:
+                heapq.heappush(ready, (-hits.get(successor, 0), position[successor], successor))
+    return order
+
+
+def check_order(names, order, overlaps):
+    """
+    :param names: (List(string)) rule names in their current order
+    :param order: (List(string)) a new order of the rules
+    :param overlaps: (iterable(tuple)) pairs of overlapping rule names
+    :raises RuleFileError: when the order is not an order of the rules or changes the order of an overlapping pair
+    """
+    if sorted(order) != sorted(names):
+        raise RuleFileError("rule order does not list the rules of the rule file")
+    old, new = ({name: index for index, name in enumerate(ranking)} for ranking in (names, order))
+    for first, second in overlaps:
+        if (old[first] < old[second]) != (new[first] < new[second]):
+            raise RuleFileError("rule order changes the precedence of overlapping rules {} and {}".format(first, second))
+
+
+def save_order(path, digest, order, overlaps):
+    """
+    :param path: (string) JSON file to write
+    :param digest: (string) digest of the rule file the order was learned for, see `RuleFile`
+    """
+    with open(path, "w", encoding="utf8") as order_file:
+        json.dump({"rules_digest": digest, "order": order, "overlaps": sorted(map(list, overlaps))},
+                  order_file, ensure_ascii=False, indent=1)
+
+
+def load_order(path, digest, names):
+    """
+    Loads a saved order and checks it against the current rules.
+    :param path: (string) JSON file written by `save_order`
+    :param digest: (string) digest of the current rule file
+    :param names: (List(string)) rule names in the order of the rule file
+    :return: (List(string)) rule names
+    :raises RuleFileError: when the order was learned for another rule file or is not valid
+    """
+    with open(path, encoding="utf8") as order_file:
+        saved = json.load(order_file)
+    if saved.get("rules_digest") != digest:
+        raise RuleFileError("{}: rule order was learned for another rule file".format(path))
+    check_order(names, saved["order"], [tuple(pair) for pair in saved["overlaps"]])
+    return saved["order"]
+
+
+def learn_order(detector, texts, samples_per_rule=50, seed=0):
+    """
+    Counts the rule hits of a detector on texts and orders its rules by them.
+    :param detector: (DateDetector) an instrumented detector, see `DateDetector(instrument=True)`
+    :param texts: (List(string)) sentences, ex: a sample of real traffic
+    :param samples_per_rule: (int) see `find_overlaps`
+    :param seed: (int) seed of the sampler
+    :return: (tuple) the order and the overlapping pairs
+    """
+    names = [rule[0] for rule in detector.regex_list]
+    hits = {name: stats["hits"] for name, stats in detector.stats()["rules"].items()}
+    windows = set()
+    for text in texts:
+        try:
+            detector.find_all(text)
+        except ValueError:
+            pass
+        tokens = [token for token, _, _ in tokenize(text)]
+        normalize = detector.window_normalizer(tokens)
+        for window in range(1, min(len(tokens), detector.max_window or len(tokens)) + 1):
+            windows.update(normalize(i, i + window) for i in range(len(tokens) - window + 1))
+    for name, stats in detector.stats()["rules"].items():
+        hits[name] = stats["hits"] - hits[name]
+
+    overlaps = find_overlaps(detector.regex_list, samples_per_rule, windows, seed)
+    return precedence_order(names, overlaps, hits), overlaps
+
+
+def main(argv=None):
+    from utils.date_detector import DateDetector
+
+    parser = argparse.ArgumentParser(description="Learn a rule order from the rule hits on a corpus.")
+    parser.add_argument("corpus", help="text file with a sentence per line")
+    parser.add_argument("-o", "--output", required=True, help="JSON file to save the order to")
+    parser.add_argument("--rules", help="rule file, the rules of the detector by default")
+    parser.add_argument("--samples", type=int, default=50, help="number of samples generated for each rule")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with open(args.corpus, encoding="utf8") as corpus:
+        texts = [line.rstrip("\r\n") for line in corpus if line.strip()]
+    detector = DateDetector(fallback=False, cache_size=0, rules_path=args.rules, instrument=True)
+    order, overlaps = learn_order(detector, texts, args.samples, args.seed)
+    save_order(args.output, detector.rules.rule_file.digest, order, overlaps)
+
+    # Rules attempted for each matched input, with the rule file order and with the learned order
+    attempts = []
+    for candidate in (detector, DateDetector(fallback=False, cache_size=0, rules_path=args.rules, instrument=True,
+                                             rule_order=args.output)):
+        candidate.stats_clear()
+        for text in texts:
+            try:
+                candidate.find_all(text)
+            except ValueError:
+                pass
+        stats = candidate.stats()
+        attempts.append(sum(rule["attempts"] for rule in stats["rules"].values()) / max(stats["matches"], 1))
+
+    names = [rule[0] for rule in detector.regex_list]
+    moved = sum(old != new for old, new in zip(names, order))
+    sys.stderr.write("{} rules, {} overlapping pairs, {} rules moved, {:.2f} -> {:.2f} rules attempted per input\n"
+                     .format(len(names), len(overlaps), moved, *attempts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
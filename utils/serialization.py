@@ -0,0 +1,15 @@
+import json
+from datetime import date, datetime
+
+
+def json_default(value):
+    """
+    Serializes the values `json` does not know about, dates are written in ISO format.
+    """
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError("{} is not JSON serializable".format(type(value).__name__))
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False, default=json_default)
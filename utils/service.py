@@ -0,0 +1,379 @@
+"""
+An asyncio detection service that speaks line delimited JSON over a local socket.
+
+Each request is a JSON object on a line, ex: {"id": 1, "text": "yarın sabah 9da"}, and is answered
+with the same id and the found dates, ex: {"id": 1, "dates": [...]}. Concurrent requests are collected
+into small batches that run on a pool of worker processes holding warm detectors. Workers degrade the
+detection of a request as its latency budget runs out, see `utils.budget`, and the response then has
+"truncated": true. A request that is still not answered within its budget gets
+{"id": 1, "error": "timeout"}. The request {"id": 2, "op": "stats"} returns request counts and p50, p99
+latencies in milliseconds. Every request line is answered once, a request that is not valid gets an
+error, ex: {"id": null, "error": "not a JSON object"}.
+
+Run with `python -m utils.service --port 8765`, see `ServiceClient` for a client.
+"""
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import math
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from utils.budget import Budget
+from utils.date_detector import DateDetector
+from utils.regex_backend import BACKENDS
+from utils.serialization import dumps
+
+# Detector of a worker process, see `_init_worker`
+_detector = None
+
+
+def _init_worker(detector_options):
+    global _detector
+    _detector = DateDetector(**detector_options)
+
+
+def _warm_up():
+    _detector.rule_matcher().compile()
+    return True
+
+
+def _detect_batch(texts, reference_time, budgets):
+    """
+    Runs `find_all` on a batch of texts in a worker process.
+    :param budgets: (List(float)) seconds each text has from the start of the batch
+    :return: (List(tuple)) ("dates", tag construct) or ("error", message) for each text
+    """
+    start = time.perf_counter()
+    results = []
+    for text, budget in zip(texts, budgets):
+        try:
+            results.append(("dates", _detector.find_all(text, reference_time, Budget.until(start + budget))))
+        except ValueError as e:
+            results.append(("error", str(e)))
+    return results
+
+
+def percentile(values, fraction):
+    """
+    Nearest rank percentile of the values, ex: fraction=0.99
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class DetectionService(object):
+    """
+    Answers detection requests, batching concurrent ones.
+    """
+    # Number of latencies kept for the percentiles
+    LATENCY_WINDOW = 10000
+    # Share of the remaining budget of a request its detection can take, the rest is left for sending
+    # the batch and its results between the processes
+    DETECTION_SHARE = 0.8
+
+    def __init__(self, workers=2, max_batch=32, max_delay=0.002, budget=1.0, detector_options=None):
+        """
+        :param workers: (int) number of worker processes
+        :param max_batch: (int) maximum number of texts in a batch
+        :param max_delay: (float) seconds a request waits for more requests to join its batch
+        :param budget: (float) default latency budget of a request in seconds
+        :param detector_options: (dict) `DateDetector` arguments
+        """
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.budget = budget
+        self.detector_options = detector_options or {}
+
+        self.executor = None
+        self.queue = None
+        self.slots = None
+        self.batcher = None
+        self.latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.counts = {"requests": 0, "batches": 0, "timeouts": 0, "errors": 0, "truncated": 0}
+
+    async def start(self):
+        """
+        Starts the worker processes and waits until each of them has built its detector.
+        """
+        loop = asyncio.get_running_loop()
+        self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                            initargs=(self.detector_options,))
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _warm_up) for _ in range(self.workers)))
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.workers)
+        self.batcher = asyncio.ensure_future(self._run_batches())
+
+    async def stop(self):
+        if self.batcher is not None:
+            self.batcher.cancel()
+            try:
+                await self.batcher
+            except asyncio.CancelledError:
+                pass
+        if self.executor is not None:
+            # Waiting for the workers to exit blocks, it is done off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(self.executor.shutdown, cancel_futures=True))
+            self.executor = None
+
+    async def find_all(self, text, budget=None):
+        """
+        Detects the dates in a text within the latency budget.
+        :param text: (string)
+        :param budget: (float) seconds, defaults to the budget of the service
+        :return: (TagConstruct)
+        :raises asyncio.TimeoutError: when the budget runs out
+        """
+        start = time.perf_counter()
+        deadline = start + (budget if budget is not None else self.budget)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, deadline, future))
+        self.counts["requests"] += 1
+        try:
+            kind, value = await asyncio.wait_for(future, max(0.0, deadline - time.perf_counter()))
+        except asyncio.TimeoutError:
+            self.counts["timeouts"] += 1
+            raise
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+        if kind == "error":
+            self.counts["errors"] += 1
+            raise ValueError(value)
+        if value.truncated:
+            self.counts["truncated"] += 1
+        return value
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Requests queue up while every worker is busy, so the next batch is fuller
+            await self.slots.acquire()
+            batch = [await self.queue.get()]
+            batch_deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = batch_deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests that already gave up are not sent to the workers
+            now = time.perf_counter()
+            batch = [item for item in batch if not item[2].done() and item[1] > now]
+            if batch:
+                self.counts["batches"] += 1
+                asyncio.ensure_future(self._dispatch(batch))
+            else:
+                self.slots.release()
+
+    async def _dispatch(self, batch):
+        texts = [text for text, _, _ in batch]
+        now = time.perf_counter()
+        budgets = [(deadline - now) * self.DETECTION_SHARE for _, deadline, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _detect_batch, texts, datetime.now(), budgets)
+        except Exception as e:
+            results = [("error", "{}: {}".format(type(e).__name__, e))] * len(batch)
+        finally:
+            self.slots.release()
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        latencies = list(self.latencies)
+        stats = dict(self.counts)
+        for name, fraction in (("p50_ms", 0.5), ("p99_ms", 0.99)):
+            value = percentile(latencies, fraction)
+            stats[name] = None if value is None else round(value * 1000, 3)
+        return stats
+
+    async def handle_request(self, request):
+        """
+        Answers a single decoded request.
+        :param request: (dict)
+        :return: (dict)
+        """
+        if not isinstance(request, dict):
+            return {"id": None, "error": "not a JSON object"}
+        response = {"id": request.get("id")}
+        if request.get("op") == "stats":
+            response["stats"] = self.stats()
+            return response
+
+        text = request.get("text")
+        if not isinstance(text, str):
+            response["error"] = "missing text"
+            return response
+        budget = request.get("budget")
+        if budget is not None and (isinstance(budget, bool) or not isinstance(budget, (int, float)) or
+                                   not 0 < budget < math.inf):
+            response["error"] = "budget must be a positive number of seconds"
+            return response
+        try:
+            response["dates"] = await self.find_all(text, budget)
+            if response["dates"].truncated:
+                response["truncated"] = True
+        except asyncio.TimeoutError:
+            response["error"] = "timeout"
+        except ValueError as e:
+            response["error"] = str(e)
+        return response
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves the requests of a connection, requests are answered concurrently and possibly out of order.
+        """
+        lock = asyncio.Lock()
+        pending = set()
+
+        async def answer(line):
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"id": None, "error": "invalid JSON: {}".format(e)}
+            else:
+                try:
+                    response = await self.handle_request(request)
+                except Exception as e:
+                    # Every request line is answered, also when it fails in an unexpected way
+                    response = {"id": request.get("id") if isinstance(request, dict) else None,
+                                "error": "{}: {}".format(type(e).__name__, e)}
+            async with lock:
+                writer.write((dumps(response) + "\n").encode("utf8"))
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(answer(line))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, path=None):
+        """
+        Starts the service and serves on a TCP port or, when a path is given, on a unix socket.
+        :return: (asyncio.AbstractServer)
+        """
+        await self.start()
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+class ServiceClient(object):
+    """
+    Client of `DetectionService`, requests can be sent concurrently over a single connection.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.waiting = {}
+        self.receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.waiting.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+
+        for future in self.waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionError("connection closed"))
+
+    async def request(self, **request):
+        """
+        Sends a request and waits for its response.
+        :return: (dict) the response, dates are ISO formatted strings
+        """
+        request["id"] = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request["id"]] = future
+        self.writer.write((dumps(request) + "\n").encode("utf8"))
+        await self.writer.drain()
+        return await future
+
+    async def find_all(self, text, budget=None):
+        request = {"text": text}
+        if budget is not None:
+            request["budget"] = budget
+        return await self.request(**request)
+
+    async def stats(self):
+        return (await self.request(op="stats"))["stats"]
+
+    async def close(self):
+        self.writer.close()
+        self.receiver.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve date detection over line delimited JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="serve on a unix socket at this path instead of a TCP port")
+    parser.add_argument("--workers", type=int, default=2, help="number of worker processes")
+    parser.add_argument("--max-batch", type=int, default=32, help="maximum number of texts in a batch")
+    parser.add_argument("--max-delay", type=float, default=0.002,
+                        help="seconds a request waits for others to join its batch")
+    parser.add_argument("--budget", type=float, default=1.0, help="default latency budget of a request in seconds")
+    parser.add_argument("--max-tokens", type=int, default=1000, help="number of tokens of a text that are searched")
+    parser.add_argument("--max-length", type=int, default=10000,
+                        help="number of characters of a text that are searched")
+    parser.add_argument("--regex-backend", choices=list(BACKENDS), default="re",
+                        help="engine the date rules are matched with, see utils/regex_backend.py")
+    args = parser.parse_args(argv)
+
+    async def run():
+        service = DetectionService(args.workers, args.max_batch, args.max_delay, args.budget,
+                                   {"max_tokens": args.max_tokens, "max_length": args.max_length,
+                                    "regex_backend": args.regex_backend})
+        server = await service.serve(args.host, args.port, args.unix)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()